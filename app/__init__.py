@@ -1,44 +1,234 @@
-from flask import Flask
+import time
+
+_IMPORT_STARTED = time.perf_counter()  # Taken before the imports below, so startup timings include them
+
+import importlib
+import importlib.util
+import json
+import os
+import threading
+
+import click
+from flask import Blueprint, Flask, current_app, jsonify, redirect, render_template, url_for
+from flask.cli import with_appcontext
 from flask_cors import CORS
-from flasgger import Swagger
+from app.utils.cache import init_cache
+from app.utils.encoding import ApiJSONProvider, ApiRequest
+from app.utils.metrics import init_metrics
+from app.utils.tracing import init_tracing
+
+_IMPORT_FINISHED = time.perf_counter()
+_first_app = True  # Only the first app of a process counts the package imports
+_swagger_lock = threading.Lock()
+
+# Route modules, in registration order; BLUEPRINTS selects a subset by name
+BLUEPRINTS = ("kinematics", "projectile", "work_energy", "electricity", "forces", "simulation", "equations", "solve", "expressions", "jobs", "admin", "metrics")
+SWAGGER_MODES = ("lazy", "cached", "off")
 
-def create_app():
+# Defaults, overridable with PHYSICALC_* environment variables or the config argument
+DEFAULT_CONFIG = dict(
+    FORMULA_CACHE_ENABLED=False,
+    FORMULA_CACHE_SIZE=1024,
+    FORMULA_CACHE_TTL=None,  # Seconds; None keeps entries until evicted
+    SHARED_CACHE_PATH=None,  # e.g. /dev/shm/physicalc-cache to share results across workers
+    SHARED_CACHE_SLOTS=65536,
+    ADMIN_TOKEN=None,  # Required by /api/admin/* and /metrics, which are disabled (404) until it is set
+    SWAGGER_MODE="lazy",  # lazy: import Flasgger and build the spec on the first docs request; cached: serve SWAGGER_SPEC_FILE; off: no docs
+    SWAGGER_SPEC_FILE=None,  # Written by `flask --app run build-apispec`
+    BLUEPRINTS=None,  # e.g. "kinematics,forces" to serve only some groups; None serves all
+    JSON_BACKEND="auto",  # auto: orjson when installed, else the stdlib json module; or force "orjson" / "json"
+    ASGI_THREADS=32,  # Threads running non-inline requests under app.asgi (at most this many at once)
+    ASGI_STREAM_THREADS=16,  # Threads producing the rest of streamed responses (job events, simulations, files) under app.asgi
+    JOBS_DIR=None,  # Job state and results; None uses <tmp>/physicalc-jobs. Share it between workers
+    JOBS_MAX_CONCURRENT=2,  # Jobs computing at once across all workers; the rest wait queued
+    JOBS_MAX_PENDING=32,  # Queued plus running jobs before submissions get 429
+    JOBS_CPU_LIMIT=300,  # CPU seconds per job
+    JOBS_NICE=10,  # Priority offset for job processes, so interactive requests stay fast
+    JOBS_TTL=3600,  # Seconds finished jobs and their results are kept
+    SIMULATION_MAX_WORK=50_000_000,  # Particle pairs × steps per /api/simulation/run request (about 10 s); None lifts it. Jobs are bounded by JOBS_CPU_LIMIT instead
+    METRICS_ENABLED=True,  # Per-route latency, phase, CPU and error counters, served at /metrics
+    METRICS_DIR=None,  # Shared by all workers so /metrics covers them all; None counts this process only
+    METRICS_FLUSH_INTERVAL=1.0,  # Seconds between a worker's writes to METRICS_DIR
+    TRACE_ENABLED=False,  # Server-Timing headers with per-phase times on every response
+    TRACE_SAMPLE_EVERY=100,  # Write every Nth traced request to TRACE_DIR; 0 sends headers only
+    TRACE_DIR=None,  # Chrome trace files, one per worker; None uses <tmp>/physicalc-traces
+    TRACE_MAX_BYTES=16 * 1024 * 1024,  # A worker's trace file is rotated to trace-<pid>.1.json past this size; None never rotates
+    TRACE_TTL=86400,  # Seconds trace files are kept after their last write (e.g. those of stopped workers); None keeps them
+    PROFILE_DIR=None,  # Profiles taken by /api/admin/profile; None uses <tmp>/physicalc-profiles. Share it between workers
+    PROFILE_MAX_SECONDS=60,  # Longest profile allowed
+    PROFILE_COOLDOWN=60,  # Seconds between profiles started in the same worker
+    PROFILE_MAX_STACKS=10000,  # Distinct stacks kept per profile; the rest are counted as [truncated]
+    PROFILE_TTL=86400,  # Seconds profiles are kept; older ones are deleted when the next one starts
+    EXPRESSIONS_DIR=None,  # Formulas defined at /api/expressions; None uses <tmp>/physicalc-expressions. Share it between workers
+    EXPRESSIONS_MAX=10_000,  # Formulas that can be defined; new ones get 507 after that
+    EXPRESSIONS_CACHE_SIZE=256,  # Compiled formulas kept per worker; the least recently used are recompiled when needed
+)
+
+
+def create_app(config=None):
+    global _first_app
+    started = phase = time.perf_counter()
+    timings = {}
+    if _first_app:
+        _first_app = False
+        started = _IMPORT_STARTED
+        timings["imports"] = _IMPORT_FINISHED - _IMPORT_STARTED
     app = Flask(__name__)
+
+    app.config.update(DEFAULT_CONFIG)
+    app.config.from_prefixed_env("PHYSICALC")
+    if config:
+        app.config.update(config)
+
+    # Content negotiation for /api/*: JSON, MessagePack or raw float64, optionally without the input echo
+    app.request_class = ApiRequest
+    app.json = ApiJSONProvider(app, backend=app.config['JSON_BACKEND'])
+
     CORS(app)  # Optional: for Cross-Origin Resource Sharing if needed
-    
-    # Initialize Swagger
-    swagger_config = {
-        "headers": [],
-        "specs": [
-            {
-                "endpoint": 'apispec',
-                "route": '/apispec.json',
-                "rule_filter": lambda rule: True,  # all in
-                "model_filter": lambda tag: True,  # all in
-            }
-        ],
-        "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
-        "specs_route": "/apidocs/"
-    }
-    
-    template = {
-        "swagger": "2.0",
-        "info": {
-            "title": "PhysiCalc API",
-            "description": "A modular physics calculation engine for Kinematics, Forces, Electricity, and more.",
-            "version": "1.0.0"
+    timings["config"] = time.perf_counter() - phase
+
+    # Opt-in memoization of formula results, optionally shared across worker processes
+    init_cache(app)
+
+    # Import blueprints (only the selected ones, so a trimmed worker never imports the rest)
+    phase = time.perf_counter()
+    for name in _selected_blueprints(app.config['BLUEPRINTS']):
+        app.register_blueprint(importlib.import_module(f"app.routes.{name}").bp)
+    timings["blueprints"] = time.perf_counter() - phase
+
+    init_metrics(app)
+    init_tracing(app)
+
+    phase = time.perf_counter()
+    init_swagger(app)
+    timings["swagger"] = time.perf_counter() - phase
+
+    app.cli.add_command(build_apispec)
+
+    timings["total"] = time.perf_counter() - started
+    app.config['STARTUP_TIMINGS'] = {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
+    app.logger.info(
+        "PhysiCalc ready in %.1f ms (%s)", timings["total"] * 1000,
+        ", ".join(f"{name} {ms} ms" for name, ms in app.config['STARTUP_TIMINGS'].items() if name != "total"),
+    )
+    return app
+
+
+def _selected_blueprints(selected):
+    if not selected:
+        return BLUEPRINTS
+    if isinstance(selected, str):
+        selected = [name.strip() for name in selected.split(",") if name.strip()]
+    unknown = set(selected) - set(BLUEPRINTS)
+    if unknown:
+        raise ValueError(f"Unknown blueprints: {', '.join(sorted(unknown))}")
+    return [name for name in BLUEPRINTS if name in selected]
+
+
+SWAGGER_CONFIG = {
+    "headers": [],
+    "specs": [
+        {
+            "endpoint": 'apispec',
+            "route": '/apispec.json',
+            "rule_filter": lambda rule: True,  # all in
+            "model_filter": lambda tag: True,  # all in
         }
+    ],
+    "static_url_path": "/flasgger_static",
+    "swagger_ui": True,
+    "specs_route": "/apidocs/"
+}
+
+SWAGGER_TEMPLATE = {
+    "swagger": "2.0",
+    "info": {
+        "title": "PhysiCalc API",
+        "description": "A modular physics calculation engine for Kinematics, Forces, Electricity, and more.",
+        "version": "1.0.0"
     }
+}
+
+
+def init_swagger(app):
+    """
+    Sets up the API docs according to SWAGGER_MODE. Importing Flasgger takes
+    longer than the rest of startup, so only a "flasgger" blueprint with the
+    docs routes is registered here; the first request to one of them imports
+    Flasgger and builds the spec ("lazy") or loads SWAGGER_SPEC_FILE ("cached").
+    "off" registers nothing.
+    """
+    mode = app.config['SWAGGER_MODE']
+    if mode not in SWAGGER_MODES:
+        raise ValueError(f"SWAGGER_MODE must be one of {', '.join(SWAGGER_MODES)}")
+    if mode == "off":
+        return None
+
+    spec_file = app.config['SWAGGER_SPEC_FILE']
+    if mode == "cached" and not (spec_file and os.path.exists(spec_file)):
+        app.logger.warning("Swagger spec file %r not found; building the spec on first request", spec_file)
+
+    package = importlib.util.find_spec("flasgger")  # Locates the UI files without importing Flasgger
+    if package is None:
+        raise ValueError(f"SWAGGER_MODE={mode} needs the flasgger package; set SWAGGER_MODE=off")
+    ui = os.path.join(package.submodule_search_locations[0], "ui3")
+    # Same routes and endpoint names as Flasgger's own blueprint, whose views these call
+    docs = Blueprint(
+        "flasgger", __name__, static_folder=os.path.join(ui, "static"),
+        static_url_path=SWAGGER_CONFIG["static_url_path"], template_folder=os.path.join(ui, "templates"),
+    )
+    docs.add_url_rule(SWAGGER_CONFIG["specs_route"], "apidocs", _apidocs)
+    docs.add_url_rule("/apidocs/index.html", "apidocs_index", lambda: redirect(url_for("flasgger.apidocs")))
+    docs.add_url_rule("/oauth2-redirect.html", "oauth_redirect", _oauth_redirect)
+    docs.add_url_rule("/apispec.json", "apispec", _apispec)
+    app.register_blueprint(docs)
+    return docs
+
+
+def _swagger():
+    """The app's Flasgger instance, created on the first docs request."""
+    app = current_app._get_current_object()
+    with _swagger_lock:
+        swagger = app.extensions.get('physicalc_swagger')
+        if swagger is None:
+            from flasgger import Swagger
+
+            # Not bound to the app: the docs blueprint of init_swagger() serves its views
+            swagger = Swagger(config=dict(SWAGGER_CONFIG), template=SWAGGER_TEMPLATE)
+            swagger.app = app
+            spec_file = app.config['SWAGGER_SPEC_FILE']
+            if app.config['SWAGGER_MODE'] == "cached" and spec_file and os.path.exists(spec_file):
+                with open(spec_file, encoding="utf-8") as f:
+                    swagger.apispecs['apispec'] = json.load(f)
+            app.extensions['physicalc_swagger'] = swagger
+    return swagger
+
+
+def _apispec():
+    return jsonify(_swagger().get_apispecs('apispec'))
+
+
+def _apidocs():
+    from flasgger.base import APIDocsView
+
+    return APIDocsView(view_args=dict(config=_swagger().config)).get()
+
+
+def _oauth_redirect():
+    return render_template(['flasgger/oauth2-redirect.html', 'flasgger/o2c.html'])
+
 
-    Swagger(app, config=swagger_config, template=template)
-
-    # Import blueprints
-    from app.routes import kinematics, projectile, work_energy, electricity, forces
-    app.register_blueprint(kinematics.bp)
-    app.register_blueprint(projectile.bp)
-    app.register_blueprint(work_energy.bp)
-    app.register_blueprint(electricity.bp)
-    app.register_blueprint(forces.bp)
-    
-    return app
\ No newline at end of file
+@click.command("build-apispec")
+@click.argument("path", required=False)
+@with_appcontext
+def build_apispec(path):
+    """Writes /apispec.json to PATH (default: SWAGGER_SPEC_FILE) for SWAGGER_MODE=cached."""
+    path = path or current_app.config['SWAGGER_SPEC_FILE']
+    if not path:
+        raise click.UsageError("Give a path or set PHYSICALC_SWAGGER_SPEC_FILE")
+    if current_app.config['SWAGGER_MODE'] == "off":
+        raise click.UsageError("Swagger is off; unset PHYSICALC_SWAGGER_MODE to build the spec")
+    spec = current_app.test_client().get('/apispec.json').get_json()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spec, f)
+    click.echo(f"Wrote {len(spec.get('paths', {}))} paths to {path}")
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+ASGI serving for PhysiCalc.
+
+Runs the same Flask app (every blueprint, the formula registry and its
+content negotiation) under an ASGI server such as uvicorn, where idle
+keep-alive connections cost a coroutine instead of a worker:
+
+    gunicorn -k uvicorn_worker.UvicornWorker --workers 4 asgi:app
+
+Scalar formula routes take microseconds, so they are served inline on the
+event loop (unless they would wait on the shared cache's file lock). Every
+other request (batch, file, simulation, jobs, ...) runs in a bounded thread
+pool up to its first chunk. The rest of a streamed response is pulled one chunk
+at a time from a second pool, so a long stream never blocks the loop, and
+long-lived streams (job events, simulations) never hold the threads that
+serve ordinary requests.
+"""
+import asyncio
+import contextvars
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.formulas.registry import FORMULAS
+
+SPOOL_SIZE = 1 << 20  # Request bodies larger than this are buffered on disk, keeping memory flat for uploads
+_DONE = object()
+
+
+def create_asgi_app(config=None):
+    """
+    Builds the Flask app with create_app(config) and wraps it; ASGI_THREADS and
+    ASGI_STREAM_THREADS size the thread pools.
+    """
+    app = create_app(config)
+    inline = {f"/api/{formula.group}/{formula.name}" for formula in FORMULAS}
+    if app.extensions['physicalc_formula_cache'].shared is not None:
+        inline = set()  # Lookups flock() the shared cache file, which must not block the event loop
+    return AsgiBridge(app, inline_paths=inline, threads=app.config['ASGI_THREADS'],
+                      stream_threads=app.config['ASGI_STREAM_THREADS'])
+
+
+class AsgiBridge:
+    """
+    An ASGI application serving a WSGI app. POST requests to `inline_paths`
+    are dispatched on the event loop; all other requests in a pool of
+    `threads` threads, which bounds how many run at once. Chunks after the
+    first come from a separate pool of `stream_threads` threads.
+    """
+
+    def __init__(self, wsgi_app, inline_paths=(), threads=32, stream_threads=16):
+        self.wsgi_app = wsgi_app
+        self.inline_paths = frozenset(inline_paths)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="physicalc-asgi")
+        self.stream_executor = ThreadPoolExecutor(max_workers=stream_threads, thread_name_prefix="physicalc-asgi-stream")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.stream_executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return
+            body.write(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        size = body.tell()
+        body.seek(0)
+        environ = wsgi_environ(scope, body, size)
+
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        loop = asyncio.get_running_loop()
+        if scope["method"] == "POST" and scope["path"] in self.inline_paths:
+            # Small, pure computations: cheaper than a thread hop
+            iterable = self.wsgi_app(environ, start_response)
+            try:
+                chunks = list(iterable)
+            finally:
+                _close(iterable)
+                body.close()
+            await _start(send, started)
+            await send({"type": "http.response.body", "body": b"".join(chunks)})
+            return
+
+        # One context for the whole response: stream_with_context() keeps the request context in it across chunks
+        context = contextvars.copy_context()
+
+        def run(func, *args):
+            return loop.run_in_executor(self.executor, context.run, func, *args)
+
+        def stream(func, *args):
+            return loop.run_in_executor(self.stream_executor, context.run, func, *args)
+
+        disconnected = asyncio.Event()
+        watcher = asyncio.create_task(_watch_disconnect(receive, disconnected))
+        iterable = await run(self.wsgi_app, environ, start_response)
+        chunks = iter(iterable)
+        try:
+            chunk = await run(next, chunks, _DONE)
+            await _start(send, started)
+            # A client that goes away stops the stream (and the computation behind it) at the next chunk
+            while chunk is not _DONE and not disconnected.is_set():
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                chunk = await stream(next, chunks, _DONE)
+            await send({"type": "http.response.body", "body": b""})
+        except OSError:
+            pass  # The connection failed mid-stream
+        finally:
+            watcher.cancel()
+            await stream(_close, iterable)
+            body.close()
+
+
+async def _watch_disconnect(receive, disconnected):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    disconnected.set()
+
+
+async def _start(send, started):
+    status, headers = started
+    await send({
+        "type": "http.response.start",
+        "status": int(status.split(" ", 1)[0]),
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+    })
+
+
+def _close(iterable):
+    if hasattr(iterable, "close"):
+        iterable.close()
+
+
+def wsgi_environ(scope, body, size):
+    """The PEP 3333 environ for an ASGI HTTP scope, with the request body already read into `body`."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(size),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", ()):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue  # The body has been read; its real size is set above
+        if name != "CONTENT_TYPE":
+            name = f"HTTP_{name}"
+        if name in environ:
+            value = environ[name] + ("; " if name == "HTTP_COOKIE" else ",") + value
+        environ[name] = value
+    return environ
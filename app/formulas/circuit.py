@@ -0,0 +1,157 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Netlist elements. Nodes are given as [n1, n2]:
+#   resistor:       value in ohms; current flows from n1 to n2 when V(n1) > V(n2)
+#   voltage_source: value in volts, V(n1) - V(n2) = value
+#   current_source: value in amperes, driven through the source from n1 to n2
+ELEMENT_TYPES = ("resistor", "voltage_source", "current_source")
+GROUND_NODES = ("0", "gnd")
+_PREFIXES = {"resistor": "R", "voltage_source": "V", "current_source": "I"}
+
+Netlist = namedtuple("Netlist", "names types nodes values node_names")
+
+
+def parse_netlist(elements):
+    """
+    Checks a list of element objects ({"type", "nodes", "value", "name"?}) and
+    converts it to arrays: node indices (-1 for ground) and float values.
+    Raises ValueError describing the first bad element.
+    """
+    if not isinstance(elements, list) or not elements:
+        raise ValueError("Netlist must be a non-empty list of elements")
+
+    index = {}
+    names, types, nodes, values = [], [], [], []
+    counts = dict.fromkeys(ELEMENT_TYPES, 0)
+    for position, element in enumerate(elements):
+        if not isinstance(element, dict):
+            raise ValueError(f"Element {position} must be an object")
+        kind = element.get("type")
+        if kind not in ELEMENT_TYPES:
+            raise ValueError(f"Element {position}: type must be one of {', '.join(ELEMENT_TYPES)}")
+        counts[kind] += 1
+
+        terminals = element.get("nodes")
+        if type(terminals) is not list or len(terminals) != 2:
+            raise ValueError(f"Element {position}: nodes must be a list of two node names")
+        pair = []
+        for node in terminals:
+            if type(node) is not str:
+                if type(node) is not int:
+                    raise ValueError(f"Element {position}: nodes must be a list of two node names")
+                node = str(node)
+            if node in GROUND_NODES or node.lower() in GROUND_NODES:
+                pair.append(-1)
+            else:
+                node_index = index.get(node)
+                if node_index is None:
+                    node_index = index[node] = len(index)
+                pair.append(node_index)
+
+        value = element.get("value")
+        if (type(value) is not float and type(value) is not int) or not math.isfinite(value):
+            raise ValueError(f"Element {position}: value must be a finite number")
+        if kind == "resistor" and value <= 0:
+            raise ValueError(f"Element {position}: resistance must be positive")
+
+        names.append(str(element.get("name") or f"{_PREFIXES[kind]}{counts[kind]}"))
+        types.append(kind)
+        nodes.append(pair)
+        values.append(float(value))
+
+    if len(set(names)) != len(names):
+        raise ValueError("Element names must be unique")
+    nodes = np.array(nodes, dtype=np.int64)
+    if not (nodes == -1).any():
+        raise ValueError(f"Circuit needs a ground node ({' or '.join(GROUND_NODES)})")
+    return Netlist(names, np.array(types), nodes, np.array(values), list(index))
+
+
+def solve_circuit(elements):
+    """
+    Solve a DC circuit with modified nodal analysis.
+
+    Builds the sparse MNA system G·x = b (one row per node plus one per voltage
+    source), factorizes it once with SuperLU, and derives every branch current
+    and absorbed power (passive sign convention, so sources delivering power are
+    negative and the total is zero) from the solution in the same pass.
+    """
+    # Imported here so only workers that solve circuits pay for SciPy
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.linalg import splu
+
+    netlist = parse_netlist(elements)
+    n = len(netlist.node_names)
+    a, b = netlist.nodes[:, 0], netlist.nodes[:, 1]
+    values = netlist.values
+
+    resistor = netlist.types == "resistor"
+    source = np.flatnonzero(netlist.types == "voltage_source")
+    current = netlist.types == "current_source"
+    size = n + source.size
+
+    rows, cols, data = [], [], []
+
+    def stamp(r, c, v):
+        keep = (r >= 0) & (c >= 0)
+        rows.append(r[keep])
+        cols.append(c[keep])
+        data.append(np.broadcast_to(v, keep.shape)[keep])
+
+    # Resistors: conductance g between their two nodes
+    g = 1.0 / values[resistor]
+    ra, rb = a[resistor], b[resistor]
+    stamp(ra, ra, g)
+    stamp(rb, rb, g)
+    stamp(ra, rb, -g)
+    stamp(rb, ra, -g)
+
+    # Voltage sources: an extra unknown (the source current) and constraint row each
+    branch = n + np.arange(source.size)
+    sa, sb = a[source], b[source]
+    stamp(sa, branch, 1.0)
+    stamp(branch, sa, 1.0)
+    stamp(sb, branch, -1.0)
+    stamp(branch, sb, -1.0)
+
+    rhs = np.zeros(size)
+    rhs[n:] = values[source]
+    # Current sources: current leaves n1 and enters n2
+    ia, ib, iv = a[current], b[current], values[current]
+    np.add.at(rhs, ia[ia >= 0], -iv[ia >= 0])
+    np.add.at(rhs, ib[ib >= 0], iv[ib >= 0])
+
+    matrix = coo_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape=(size, size)
+    ).tocsc()
+    try:
+        # MNA matrices are structurally symmetric, so order on A + A^T
+        solution = splu(matrix, permc_spec="MMD_AT_PLUS_A").solve(rhs)
+    except RuntimeError:
+        solution = None
+    if solution is None or not np.isfinite(solution).all():
+        raise ValueError(
+            "Circuit has no unique solution; check for floating nodes or loops of voltage sources"
+        )
+
+    potentials = np.append(solution[:n], 0.0)  # Index -1 reads ground
+    voltage = potentials[a] - potentials[b]
+    currents = np.empty(len(netlist.names))
+    currents[resistor] = voltage[resistor] / values[resistor]
+    currents[source] = solution[n:]
+    currents[current] = values[current]
+    power = voltage * currents
+
+    return {
+        "node_voltages": dict(zip(netlist.node_names, solution[:n].tolist())),
+        "elements": [
+            {"name": name, "type": kind, "voltage": v, "current": i, "power": p}
+            for name, kind, v, i, p in zip(
+                netlist.names, netlist.types.tolist(), voltage.tolist(), currents.tolist(), power.tolist()
+            )
+        ],
+        "total_power": float(power.sum()),
+    }
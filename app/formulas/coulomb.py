@@ -0,0 +1,98 @@
+import numpy as np
+
+K_E = 8.9875e9  # Coulomb's constant
+EXACT_MAX_CHARGES = 5000  # Without a cutoff every pair is summed (O(N²)); refused above this
+MAX_CHARGES = 100_000  # Largest system with a cutoff
+MAX_PAIRS = 2_000_000  # Interacting pairs allowed within a cutoff; all of them are held in memory at once
+_PAIR_BUDGET = 1 << 16  # Pairs evaluated per vectorized block in exact mode
+_COINCIDENT = "Two charges share a position; give a softening length"
+
+
+def _check(charges, positions, cutoff, softening):
+    charges = np.asarray(charges, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    if charges.ndim != 1 or charges.size == 0:
+        raise ValueError("charges must be a non-empty list of numbers")
+    if positions.shape not in ((charges.size, 2), (charges.size, 3)):
+        raise ValueError("positions must be one [x, y] or [x, y, z] point per charge")
+    if not (np.isfinite(charges).all() and np.isfinite(positions).all()):
+        raise ValueError("charges and positions must be finite numbers")
+    if cutoff is not None and not (cutoff > 0 and np.isfinite(cutoff)):
+        raise ValueError("Cutoff must be a positive distance")
+    if not (softening >= 0 and np.isfinite(softening)):
+        raise ValueError("Softening cannot be negative")
+    return charges, positions
+
+
+def _exact(charges, positions, softening):
+    """Every pair, in blocks of target charges: Σ_j q_j (r_i - r_j) / s^3 and Σ_j q_j / s per charge."""
+    n = charges.size
+    field = np.empty_like(positions)
+    potential = np.empty(n)
+    coordinates = [np.ascontiguousarray(axis) for axis in positions.T]
+    block = max(1, _PAIR_BUDGET // n)
+    for begin in range(0, n, block):
+        rows = np.arange(begin, min(begin + block, n))
+        deltas = [axis[rows, None] - axis for axis in coordinates]
+        r2 = sum(delta * delta for delta in deltas) + softening * softening
+        r2[np.arange(rows.size), rows] = np.inf  # No self-interaction
+        if not r2.all():
+            raise ValueError(_COINCIDENT)
+        inverse = 1.0 / np.sqrt(r2)
+        weighted = charges * inverse
+        potential[rows] = weighted.sum(axis=1)
+        weighted *= inverse * inverse
+        for axis, delta in enumerate(deltas):
+            field[rows, axis] = (delta * weighted).sum(axis=1)
+    return charges[:, None] * field, 0.5 * float(charges @ potential), n * (n - 1) // 2
+
+
+def _within_cutoff(charges, positions, cutoff, softening):
+    """Only pairs closer than the cutoff, found with a k-d tree (O(N log N) for a fixed density)."""
+    # Imported here so only workers that use cutoffs pay for SciPy
+    from scipy.spatial import cKDTree
+
+    tree = cKDTree(positions)
+    # Counted first (without building them) so a cutoff covering everything cannot exhaust memory
+    count = (int(tree.count_neighbors(tree, cutoff)) - charges.size) // 2
+    if count > MAX_PAIRS:
+        raise ValueError(f"The cutoff takes in {count} pairs; at most {MAX_PAIRS} are allowed, so give a smaller cutoff")
+    pairs = tree.query_pairs(cutoff, output_type="ndarray")
+    i, j = pairs[:, 0], pairs[:, 1]
+    deltas = positions[j] - positions[i]
+    r2 = np.einsum("ij,ij->i", deltas, deltas) + softening * softening
+    if not r2.all():
+        raise ValueError(_COINCIDENT)
+    inverse = 1.0 / np.sqrt(r2)
+    energy = charges[i] * charges[j] * inverse
+    # Push on j from i (and the opposite on i): q_i q_j (r_j - r_i) / s^3
+    push = deltas * (energy * inverse * inverse)[:, None]
+    n = charges.size
+    forces = np.column_stack([
+        np.bincount(j, push[:, axis], minlength=n) - np.bincount(i, push[:, axis], minlength=n)
+        for axis in range(positions.shape[1])
+    ])
+    return forces, float(energy.sum()), int(i.size)
+
+
+def compute_coulomb_forces(charges, positions, cutoff=None, softening=0.0, k_e=K_E):
+    """
+    Net electrostatic force on every charge and the total potential energy:
+    F_i = k_e * q_i * Σ_j q_j * (r_i - r_j) / s^3,  U = k_e * Σ_{i<j} q_i * q_j / s,
+    with s = sqrt(|r_i - r_j|^2 + ε^2).
+
+    Without a cutoff every pair is summed (vectorized, O(N²)). With a cutoff only
+    pairs closer than it interact (a truncated Coulomb potential), found with a
+    k-d tree. Positions may be 2D or 3D; forces come back with the same shape.
+    Returns a dict with forces, energy and the number of interacting pairs.
+    """
+    charges, positions = _check(charges, positions, cutoff, softening)
+    if charges.size > MAX_CHARGES:
+        raise ValueError(f"Too many charges: at most {MAX_CHARGES}")
+    if cutoff is None and charges.size > EXACT_MAX_CHARGES:
+        raise ValueError(f"Without a cutoff at most {EXACT_MAX_CHARGES} charges are allowed; give a cutoff")
+    if cutoff is None:
+        forces, energy, pairs = _exact(charges, positions, softening)
+    else:
+        forces, energy, pairs = _within_cutoff(charges, positions, cutoff, softening)
+    return {"forces": k_e * forces, "energy": k_e * energy, "pairs": pairs}
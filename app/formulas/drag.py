@@ -0,0 +1,193 @@
+import numpy as np
+from app.formulas.numeric import radians
+
+# Drag models, written as acceleration a = -k * f(|v|) * v - g * ŷ
+#   linear:    f(|v|) = 1    (k in 1/s, Stokes drag b/m)
+#   quadratic: f(|v|) = |v|  (k in 1/m, i.e. 1/2 * ρ * C_d * A / m)
+DRAG_MODELS = ("linear", "quadratic")
+
+# Dormand–Prince 5(4) coefficients (the tableau behind RK45 / ode45)
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+_B = _A[6]
+# Difference between the 5th and 4th order solutions, used as the error estimate
+_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+# Dense output weights (Shampine), one row per stage, columns for θ^1..θ^4
+_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+
+MAX_STEPS = 20_000  # Steps per launch; a landing needs a few hundred even at the tightest tolerance
+MAX_WORK = 20_000_000  # Steps summed over every launch of one call, about 10 s of CPU
+MIN_TOL = 1e-12  # Tighter tolerances only burn CPU: float64 rounding dominates the error well before this
+MAX_BATCH = 10_000  # Launch conditions per batch request; each one is a full adaptive integration
+MAX_SPEED = 1e4  # m/s, beyond orbital speed; faster launches only overflow the state
+MAX_DRAG = 10.0  # Drag coefficient (1/s or 1/m); stiffer drag needs ever smaller explicit steps
+
+
+def _derivative(state, k, model, g):
+    """d/dt of (x, y, vx, vy) for every row of state."""
+    vx = state[:, 2]
+    vy = state[:, 3]
+    drag = k if model == "linear" else k * np.hypot(vx, vy)
+    slope = np.empty_like(state)
+    slope[:, 0] = vx
+    slope[:, 1] = vy
+    slope[:, 2] = -drag * vx
+    slope[:, 3] = -g - drag * vy
+    return slope
+
+
+def _dense(stages, h):
+    """
+    Coefficients of the 4th order continuous extension of a Dormand–Prince step:
+    y(θ) = y0 + Σ_p coefficients[..., p] * θ^(p+1), for θ in [0, 1].
+    """
+    k = np.stack(stages)  # (stage, row, component)
+    return h[:, None, None] * np.einsum("srj,sp->rjp", k, _P)
+
+
+def _interpolate(y0, coefficients, theta):
+    """Evaluate one component of the dense output at fraction theta of the step."""
+    value = coefficients[:, 3]
+    for p in (2, 1, 0):
+        value = value * theta + coefficients[:, p]
+    return y0 + value * theta
+
+
+def _crossing(y0, coefficients, iterations=40):
+    """Fraction of the step where a decreasing component crosses zero (vectorized bisection)."""
+    lo = np.zeros_like(y0)
+    hi = np.ones_like(y0)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        above = _interpolate(y0, coefficients, mid) > 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def simulate_drag(u, angle_deg, k, model="quadratic", tol=1e-6, g=9.8):
+    """
+    Integrate projectile motion with air drag using adaptive Dormand–Prince RK45.
+    Launches from the ground and stops when the projectile lands.
+
+    u, angle_deg and k broadcast against each other, so thousands of launch
+    conditions are integrated at once, each with its own step size.
+    Returns a dict with range, max_height and time_of_flight (floats for scalar
+    inputs, arrays otherwise). A launch whose integration fails (the state
+    overflows, or it has not landed after MAX_STEPS steps) gives NaN in every
+    field; for scalar inputs that raises ValueError instead.
+    """
+    if model not in DRAG_MODELS:
+        raise ValueError(f"Drag model must be one of {', '.join(DRAG_MODELS)}")
+    if not MIN_TOL <= tol < 1:
+        raise ValueError(f"Tolerance must be at least {MIN_TOL:g} and less than 1")
+
+    u, angle_deg, k = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (u, angle_deg, k)))
+    shape = u.shape
+    u, angle_deg, k = u.ravel(), angle_deg.ravel(), k.ravel()
+    if (k < 0).any():
+        raise ValueError("Drag coefficient cannot be negative")
+    if (u < 0).any():
+        raise ValueError("Initial velocity cannot be negative")
+    if (u > MAX_SPEED).any() or (k > MAX_DRAG).any():
+        raise ValueError(f"Initial velocity can be at most {MAX_SPEED:g} m/s and the drag coefficient at most {MAX_DRAG:g}")
+
+    n = u.size
+    angle_rad = radians(angle_deg)
+    state = np.column_stack((np.zeros(n), np.zeros(n), u * np.cos(angle_rad), u * np.sin(angle_rad)))
+    with np.errstate(over="ignore", invalid="ignore"):
+        slope = _derivative(state, k, model, g)  # Non-finite for absurd launches, which then fail below
+    t = np.zeros(n)
+    # Start from 1% of the drag-free flight time and let the controller adapt
+    h = np.maximum(0.02 * state[:, 3] / g, 1e-6)
+
+    flight_range = np.zeros(n)
+    flight_time = np.zeros(n)
+    max_height = np.zeros(n)
+    active = state[:, 3] > 0  # Anything not launched upwards lands immediately
+    failed = np.zeros(n, dtype=bool)
+
+    steps = work = 0
+    # Overflowing trial steps are expected (they are rejected below), so they stay quiet
+    with np.errstate(over="ignore", invalid="ignore"):
+        while active.any():
+            steps += 1
+            work += np.count_nonzero(active)
+            if steps > MAX_STEPS or work > MAX_WORK:
+                failed |= active
+                break
+
+            rows = np.flatnonzero(active)
+            y0, f0, hh, kk = state[rows], slope[rows], h[rows], k[rows]
+            step = hh[:, None]
+
+            stages = [f0]
+            for coefficients in _A[1:]:
+                increment = sum(a * stage for a, stage in zip(coefficients, stages) if a)
+                stages.append(_derivative(y0 + step * increment, kk, model, g))
+            y1 = y0 + step * sum(b * stage for b, stage in zip(_B, stages) if b)
+            f1 = stages[6]  # FSAL: the last stage is the derivative at the new point
+
+            error = step * sum(e * stage for e, stage in zip(_E, stages) if e)
+            scale = tol + tol * np.maximum(np.abs(y0), np.abs(y1))
+            norm = np.sqrt(np.mean((error / scale) ** 2, axis=1))
+            # A step that overflows is rejected like any other too-large step
+            norm = np.where(np.isfinite(y1).all(axis=1), norm, np.inf)
+            with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+                factor = np.clip(0.9 * norm ** -0.2, 0.2, 5.0)
+            h[rows] = hh * factor
+            # A non-finite derivative, or a step shrunk to nothing, never recovers: stop those rows at once
+            broken = ~(np.isfinite(f0).all(axis=1) & np.isfinite(h[rows]) & (h[rows] > 0))
+            if broken.any():
+                failed[rows[broken]] = True
+                active[rows[broken]] = False
+            accepted = (norm <= 1.0) & ~broken
+
+            if not accepted.any():
+                continue
+            rows, y0, y1, f1, hh = rows[accepted], y0[accepted], y1[accepted], f1[accepted], hh[accepted]
+
+            # Apex: vertical velocity changes sign within the step
+            apex = (y0[:, 3] > 0) & (y1[:, 3] <= 0)
+            # Landing: height returns to the ground within the step
+            landed = y1[:, 1] <= 0
+            if apex.any() or landed.any():
+                dense = _dense([stage[accepted] for stage in stages], hh)
+            if apex.any():
+                a = np.flatnonzero(apex)
+                theta = _crossing(y0[a, 3], dense[a, 3])
+                max_height[rows[a]] = _interpolate(y0[a, 1], dense[a, 1], theta)
+            if landed.any():
+                a = np.flatnonzero(landed)
+                theta = _crossing(y0[a, 1], dense[a, 1])
+                flight_time[rows[a]] = t[rows[a]] + theta * hh[a]
+                flight_range[rows[a]] = _interpolate(y0[a, 0], dense[a, 0], theta)
+                active[rows[a]] = False
+
+            state[rows] = y1
+            slope[rows] = f1
+            t[rows] += hh
+
+    if shape == () and failed.any():
+        raise ValueError("Integration did not converge; try a looser tolerance or smaller inputs")
+    result = {"range": flight_range, "max_height": max_height, "time_of_flight": flight_time}
+    for values in result.values():
+        values[failed] = np.nan
+    if shape == ():
+        return {name: float(values[0]) for name, values in result.items()}
+    return {name: values.reshape(shape) for name, values in result.items()}
@@ -1,8 +1,9 @@
-def compute_current(voltage, resistance):
+from app.formulas.numeric import divide
+
+
+def compute_current(voltage, resistance, on_zero="raise"):
     """Compute current I = V / R"""
-    if resistance == 0:
-        raise ValueError("Resistance cannot be zero")
-    return voltage / resistance
+    return divide(voltage, resistance, "Resistance cannot be zero", on_zero)
 
 
 def compute_voltage(current, resistance):
@@ -10,14 +11,12 @@ def compute_voltage(current, resistance):
     return current * resistance
 
 
-def compute_resistance(voltage, current):
+def compute_resistance(voltage, current, on_zero="raise"):
     """Compute resistance R = V / I"""
-    if current == 0:
-        raise ValueError("Current cannot be zero")
-    return voltage / current
+    return divide(voltage, current, "Current cannot be zero", on_zero)
 
 
-def compute_power(voltage=None, current=None, resistance=None):
+def compute_power(voltage=None, current=None, resistance=None, on_zero="raise"):
     """
     Compute power using available variables:
     P = V * I
@@ -30,8 +29,6 @@ def compute_power(voltage=None, current=None, resistance=None):
     elif current is not None and resistance is not None:
         return current ** 2 * resistance
     elif voltage is not None and resistance is not None:
-        if resistance == 0:
-            raise ValueError("Resistance cannot be zero")
-        return voltage ** 2 / resistance
+        return divide(voltage ** 2, resistance, "Resistance cannot be zero", on_zero)
     else:
-        raise ValueError("Not enough values to compute power")
\ No newline at end of file
+        raise ValueError("Not enough values to compute power")
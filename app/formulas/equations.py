@@ -0,0 +1,168 @@
+"""
+Equations the symbolic solver can rearrange (see app/formulas/symbolic.py).
+
+Each equation is declared once, in SymPy syntax over its variables and named
+constants. A client gives every variable but one, and the solver derives and
+compiles the closed form for the missing one on first use, so one entry
+replaces a hand-written function per rearrangement (v = u + a*t also serves
+t = (v - u) / a and a = (v - u) / t). Variables marked positive (times,
+masses, resistances, distances) only take non-negative solutions.
+
+`quantities` names what a variable stands for across equations when its
+local name is ambiguous (the "force" in W = F * d is the net force, the
+"power" of Ohm's law is electric power); app/formulas/planner.py chains
+equations through these shared quantities.
+"""
+import inspect
+from collections import namedtuple
+
+from app.formulas.registry import get_formula
+
+Variable = namedtuple("Variable", ["name", "description", "unit", "example", "positive"], defaults=[None, False])
+Equation = namedtuple(
+    "Equation",
+    ["group", "name", "title", "expression", "variables", "constants", "description", "quantities"],
+    defaults=[{}, None, {}],
+)
+
+# Gravitational acceleration: the default g of the registry's formulas (N = mg), so both solvers agree
+GRAVITY = inspect.signature(get_formula("forces", "normal").func).parameters["g"].default
+
+EQUATIONS = [
+    # ------------------------
+    # Kinematics
+    # ------------------------
+    Equation(
+        "kinematics", "velocity", "First equation of motion", "v = u + a*t",
+        (Variable("v", "Final Velocity", "m/s", 98), Variable("u", "Initial Velocity", "m/s", 0),
+         Variable("a", "Acceleration", "m/s^2", 9.8), Variable("t", "Time", "s", 10, positive=True)),
+    ),
+    Equation(
+        "kinematics", "displacement", "Second equation of motion", "s = u*t + a*t**2/2",
+        (Variable("s", "Displacement", "m", 490), Variable("u", "Initial Velocity", "m/s", 0),
+         Variable("a", "Acceleration", "m/s^2", 9.8), Variable("t", "Time", "s", 10, positive=True)),
+        description="Solving for t gives the first time the displacement is reached (s/u when a = 0).",
+    ),
+    Equation(
+        "kinematics", "velocity_squared", "Third equation of motion", "v**2 = u**2 + 2*a*s",
+        (Variable("v", "Final Velocity", "m/s", 14), Variable("u", "Initial Velocity", "m/s", 0),
+         Variable("a", "Acceleration", "m/s^2", 9.8), Variable("s", "Displacement", "m", 10)),
+        description="Solving for v gives the non-negative root; both roots are listed in solutions.",
+    ),
+
+    # ------------------------
+    # Projectile Motion
+    # ------------------------
+    Equation(
+        "projectile", "range", "Horizontal range", "range = u**2 * sin(2*angle*pi/180) / g",
+        (Variable("range", "Range", "m", 35.3), Variable("u", "Initial Velocity", "m/s", 20, positive=True),
+         Variable("angle", "Angle of projection", "degrees", 30)),
+        constants={"g": GRAVITY},
+        description="Solving for the angle gives the lower trajectory; the higher one is in solutions.",
+        quantities={"range": "projectile_range"},
+    ),
+
+    # ------------------------
+    # Work & Energy
+    # ------------------------
+    Equation(
+        "work_energy", "work", "Work done by a force", "work = force * distance",
+        (Variable("work", "Work", "J", 500), Variable("force", "Force", "N", 50), Variable("distance", "Distance", "m", 10)),
+        quantities={"force": "net_force", "distance": "s"},
+    ),
+    Equation(
+        "work_energy", "power", "Mechanical power", "power = work / time",
+        (Variable("power", "Power", "W", 50), Variable("work", "Work", "J", 500),
+         Variable("time", "Time", "s", 10, positive=True)),
+        quantities={"time": "t"},
+    ),
+    Equation(
+        "work_energy", "kinetic", "Kinetic energy", "kinetic_energy = mass * velocity**2 / 2",
+        (Variable("kinetic_energy", "Kinetic Energy", "J", 100, positive=True),
+         Variable("mass", "Mass", "kg", 2, positive=True), Variable("velocity", "Velocity", "m/s", 10)),
+        description="Solving for velocity gives the speed (the non-negative root).",
+        quantities={"velocity": "v"},
+    ),
+    Equation(
+        "work_energy", "potential", "Gravitational potential energy", "potential_energy = mass * g * height",
+        (Variable("potential_energy", "Potential Energy", "J", 490), Variable("mass", "Mass", "kg", 10, positive=True),
+         Variable("height", "Height", "m", 5)),
+        constants={"g": GRAVITY},
+    ),
+
+    # ------------------------
+    # Electricity
+    # ------------------------
+    Equation(
+        "electricity", "ohms_law", "Ohm's law", "voltage = current * resistance",
+        (Variable("voltage", "Voltage", "V", 12), Variable("current", "Current", "A", 3),
+         Variable("resistance", "Resistance", "Ω", 4, positive=True)),
+    ),
+    Equation(
+        "electricity", "power", "Electric power", "power = voltage * current",
+        (Variable("power", "Power", "W", 20), Variable("voltage", "Voltage", "V", 10), Variable("current", "Current", "A", 2)),
+        quantities={"power": "electric_power"},
+    ),
+    Equation(
+        "electricity", "resistive_power", "Power dissipated in a resistor", "power = current**2 * resistance",
+        (Variable("power", "Power", "W", 20, positive=True), Variable("current", "Current", "A", 2),
+         Variable("resistance", "Resistance", "Ω", 5, positive=True)),
+        description="Solving for current gives its magnitude (the non-negative root).",
+        quantities={"power": "electric_power"},
+    ),
+
+    # ------------------------
+    # Forces
+    # ------------------------
+    Equation(
+        "forces", "weight", "Weight (normal force on level ground)", "weight = mass * g",
+        (Variable("weight", "Weight", "N", 98), Variable("mass", "Mass", "kg", 10, positive=True)),
+        constants={"g": GRAVITY},
+    ),
+    Equation(
+        "forces", "normal", "Normal force on level ground", "normal_force = mass * g",
+        (Variable("normal_force", "Normal Force", "N", 98), Variable("mass", "Mass", "kg", 10, positive=True)),
+        constants={"g": GRAVITY},
+    ),
+    Equation(
+        "forces", "friction", "Kinetic friction", "friction = mu * normal_force",
+        (Variable("friction", "Frictional Force", "N", 49), Variable("mu", "Coefficient of Friction", "μ", 0.5, positive=True),
+         Variable("normal_force", "Normal Force", "N", 98)),
+    ),
+    Equation(
+        "forces", "net", "Net force against friction", "net_force = applied_force - friction",
+        (Variable("net_force", "Net Force", "N", 101), Variable("applied_force", "Applied Force", "N", 150),
+         Variable("friction", "Frictional Force", "N", 49)),
+    ),
+    Equation(
+        "forces", "newton_second", "Newton's second law", "net_force = mass * a",
+        (Variable("net_force", "Net Force", "N", 20), Variable("mass", "Mass", "kg", 10, positive=True),
+         Variable("a", "Acceleration", "m/s^2", 2)),
+    ),
+    Equation(
+        "forces", "gravitational", "Newton's law of gravitation", "force = G * m1 * m2 / r**2",
+        (Variable("force", "Gravitational Force", "N", 1.98e20), Variable("m1", "Mass 1", "kg", 5.972e24, positive=True),
+         Variable("m2", "Mass 2", "kg", 7.348e22, positive=True), Variable("r", "Distance", "m", 384400000, positive=True)),
+        constants={"G": 6.67430e-11},
+        quantities={"force": "gravitational_force"},
+    ),
+    Equation(
+        "forces", "electromagnetic", "Coulomb's law", "force = k_e * q1 * q2 / r**2",
+        (Variable("force", "Electromagnetic Force", "N", -8.24e-8), Variable("q1", "Charge 1", "Coulombs", 1.602e-19),
+         Variable("q2", "Charge 2", "Coulombs", -1.602e-19), Variable("r", "Distance", "m", 5.29e-11, positive=True)),
+        constants={"k_e": 8.9875e9},
+        quantities={"force": "electrostatic_force", "r": "charge_distance"},
+    ),
+]
+
+_BY_NAME = {(equation.group, equation.name): equation for equation in EQUATIONS}
+
+
+def get_equation(group, name):
+    """Looks up one equation, or returns None."""
+    return _BY_NAME.get((group, name))
+
+
+def quantity(equation, variable):
+    """The shared quantity a variable of the equation stands for."""
+    return equation.quantities.get(variable, variable)
@@ -0,0 +1,329 @@
+"""
+User-defined formulas: a safe arithmetic expression over named variables,
+parsed with a small restricted grammar and compiled once into Python callables.
+
+    expression := term (("+" | "-") term)*
+    term       := unary (("*" | "/") unary)*
+    unary      := ("-" | "+") unary | power
+    power      := atom (("^" | "**") unary)?
+    atom       := number | name | function "(" expression ("," expression)* ")" | "(" expression ")"
+
+Names are variables, except `pi` and the whitelisted FUNCTIONS. Nothing the
+client writes is ever evaluated: the parser builds a tree of tuples and the
+compiler turns that tree into source text made only of float literals, x0..xn
+parameters, operators and the whitelisted math / NumPy calls. Each expression
+yields two callables with the inputs in order of first appearance: `scalar`
+(plain floats and the math module, fast for one call) and `vector` (NumPy
+ufuncs, for whole columns).
+"""
+import hashlib
+import math
+import operator
+import re
+
+import numpy as np
+
+MAX_LENGTH = 1000  # Characters in an expression, not counting whitespace (so the normalized text fits too)
+MAX_DEPTH = 50  # Nesting of parentheses, calls and unary operators
+MAX_VARIABLES = 32
+
+# Function name -> (argument count, scalar implementation, NumPy implementation)
+FUNCTIONS = {
+    "sqrt": (1, "math.sqrt", "np.sqrt"),
+    "exp": (1, "math.exp", "np.exp"),
+    "log": (1, "math.log", "np.log"),
+    "log10": (1, "math.log10", "np.log10"),
+    "abs": (1, "abs", "np.abs"),
+    "sin": (1, "math.sin", "np.sin"),
+    "cos": (1, "math.cos", "np.cos"),
+    "tan": (1, "math.tan", "np.tan"),
+    "asin": (1, "math.asin", "np.arcsin"),
+    "acos": (1, "math.acos", "np.arccos"),
+    "atan": (1, "math.atan", "np.arctan"),
+    "sinh": (1, "math.sinh", "np.sinh"),
+    "cosh": (1, "math.cosh", "np.cosh"),
+    "tanh": (1, "math.tanh", "np.tanh"),
+    "radians": (1, "math.radians", "np.radians"),
+    "degrees": (1, "math.degrees", "np.degrees"),
+    "atan2": (2, "math.atan2", "np.arctan2"),
+    "hypot": (2, "math.hypot", "np.hypot"),
+    "min": (2, "min", "np.minimum"),
+    "max": (2, "max", "np.maximum"),
+}
+CONSTANTS = {"pi": math.pi}
+
+_BINARY = {"+": 10, "-": 10, "*": 20, "/": 20, "^": 40}  # Binding powers; ^ is right-associative
+_UNARY = 30  # -x^2 is -(x^2), but -x * y is (-x) * y
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([A-Za-z_][A-Za-z0-9_]*)|(\*\*|[-+*/^(),]))")
+_OPERATORS = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv, "^": math.pow}
+_NAMESPACES = {
+    "scalar": {"__builtins__": {}, "math": math, "abs": abs, "min": min, "max": max, "float": float,
+               "ValueError": ValueError, "OverflowError": OverflowError},
+    "vector": {"__builtins__": {}, "np": np},
+}
+
+
+class ExpressionError(ValueError):
+    """The expression is not valid in the grammar; the message says where."""
+
+
+class Expression:
+    """
+    A parsed and compiled expression. `text` is its normalized form (the same
+    for "m*v^2/2" and "m * v ** 2 / 2"), `key` a digest of it and `variables`
+    the input names in order of first appearance.
+    """
+
+    def __init__(self, text, variables, scalar, vector):
+        self.text = text
+        self.variables = variables
+        self.key = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        self.scalar = scalar
+        self.vector = vector
+
+
+def compile_expression(source, name=None):
+    """
+    Parses `source` and compiles it. `name` becomes the scalar function's name,
+    which is what the formula result cache keys on, so give every distinct
+    definition its own. Raises ExpressionError for anything outside the grammar.
+    """
+    if not isinstance(source, str):
+        raise ExpressionError("The expression must be a string")
+    if sum(not character.isspace() for character in source) > MAX_LENGTH:
+        raise ExpressionError(f"The expression is longer than {MAX_LENGTH} characters")
+    tree, variables = _Parser(source).parse()
+    if not variables:
+        raise ExpressionError("The expression must use at least one variable")
+    if len(variables) > MAX_VARIABLES:
+        raise ExpressionError(f"The expression uses more than {MAX_VARIABLES} variables")
+
+    text = _format(tree)
+    folded = _fold(tree)
+    params = {variable: f"x{index}" for index, variable in enumerate(variables)}
+    name = name or f"expression_{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+    scalar = _function(name, params, (
+        "    try:\n"
+        f"        return float({_emit(folded, params, 'scalar')})\n"
+        "    except (ValueError, OverflowError):\n"
+        "        raise ValueError('No real result for these inputs') from None\n"
+    ), "scalar")
+    vector = _function(f"{name}_vector", params, f"    return {_emit(folded, params, 'vector')}\n", "vector")
+    return Expression(text, tuple(variables), scalar, vector)
+
+
+def _function(name, params, body, mode):
+    namespace = dict(_NAMESPACES[mode], __name__=__name__)
+    code = compile(f"def {name}({', '.join(params.values())}):\n{body}", f"<expression {name}>", "exec")
+    exec(code, namespace)  # The source is generated from the checked tree only, never from the client's text
+    return namespace[name]
+
+
+# ------------------------
+# Parser
+# ------------------------
+class _Parser:
+    """Pratt parser over the tokens of one expression; builds ("num" | "var" | "const" | "neg" | "op" | "call", ...) tuples."""
+
+    def __init__(self, source):
+        self.tokens = _tokenize(source)
+        self.position = 0
+        self.depth = 0
+        self.variables = []
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError("The expression is empty")
+        tree = self.expression(0)
+        if self.position < len(self.tokens):
+            self.fail(f"Unexpected '{self.peek()[1]}'")
+        return tree, self.variables
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None, None)
+
+    def take(self):
+        token = self.peek()
+        if token[0] is None:
+            raise ExpressionError("The expression ends too early")
+        self.position += 1
+        return token
+
+    def expect(self, symbol):
+        kind, value, offset = self.take()
+        if kind != "symbol" or value != symbol:
+            self.fail(f"Expected '{symbol}' but found '{value}'", offset)
+
+    def fail(self, message, offset=None):
+        if offset is None:
+            offset = self.peek()[2]
+        raise ExpressionError(f"{message} at position {offset + 1}" if offset is not None else message)
+
+    def expression(self, right_power):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            self.fail(f"The expression is nested more than {MAX_DEPTH} levels deep")
+        left = self.prefix()
+        while True:
+            kind, symbol, _ = self.peek()
+            power = _BINARY.get(symbol) if kind == "symbol" else None
+            if power is None or power <= right_power:
+                break
+            self.take()
+            right = self.expression(power - 1 if symbol == "^" else power)
+            left = ("op", symbol, left, right)
+        self.depth -= 1
+        return left
+
+    def prefix(self):
+        kind, value, offset = self.take()
+        if kind == "number":
+            number = float(value)
+            if not math.isfinite(number):
+                self.fail(f"The number {value} is too large", offset)
+            return ("num", number)
+        if kind == "name":
+            if self.peek()[1] == "(" and self.peek()[0] == "symbol":
+                return self.call(value, offset)
+            if value in FUNCTIONS:
+                self.fail(f"The function {value} needs arguments", offset)
+            if value in CONSTANTS:
+                return ("const", value)
+            if value not in self.variables:
+                self.variables.append(value)
+            return ("var", value)
+        if value == "-":
+            return ("neg", self.expression(_UNARY))
+        if value == "+":
+            return self.expression(_UNARY)
+        if value == "(":
+            inner = self.expression(0)
+            self.expect(")")
+            return inner
+        self.fail(f"Unexpected '{value}'", offset)
+
+    def call(self, name, offset):
+        if name not in FUNCTIONS:
+            self.fail(f"Unknown function {name} (allowed: {', '.join(sorted(FUNCTIONS))})", offset)
+        self.expect("(")
+        args = [self.expression(0)]
+        while self.peek()[1] == ",":
+            self.take()
+            args.append(self.expression(0))
+        self.expect(")")
+        count = FUNCTIONS[name][0]
+        if len(args) != count:
+            self.fail(f"{name} takes {count} argument{'s' if count > 1 else ''}, not {len(args)}", offset)
+        return ("call", name, tuple(args))
+
+
+def _tokenize(source):
+    tokens = []
+    position = 0
+    end = len(source.rstrip())
+    while position < end:
+        match = _TOKEN.match(source, position)
+        if match is None:
+            offset = len(source) - len(source[position:].lstrip())
+            raise ExpressionError(f"Unexpected character '{source[offset]}' at position {offset + 1}")
+        number, name, symbol = match.groups()
+        offset = match.start(match.lastindex)
+        if number is not None:
+            tokens.append(("number", number, offset))
+        elif name is not None:
+            tokens.append(("name", name, offset))
+        else:
+            tokens.append(("symbol", "^" if symbol == "**" else symbol, offset))
+        position = match.end()
+    return tokens
+
+
+# ------------------------
+# Compiler
+# ------------------------
+def _format(node, power=0):
+    """The normalized text of a tree, with only the parentheses precedence needs."""
+    kind = node[0]
+    if kind == "num":
+        text, own = _literal(node[1]), 100
+    elif kind in ("var", "const"):
+        text, own = node[1], 100
+    elif kind == "neg":
+        text, own = f"-{_format(node[1], _UNARY)}", _UNARY
+    elif kind == "call":
+        text, own = f"{node[1]}({', '.join(_format(arg) for arg in node[2])})", 100
+    else:
+        _, symbol, left, right = node
+        own = _BINARY[symbol]
+        left_power, right_power = (own + 1, own) if symbol == "^" else (own, own + 1)
+        separator = "^" if symbol == "^" else f" {symbol} "
+        text = f"{_format(left, left_power)}{separator}{_format(right, right_power)}"
+    return f"({text})" if own < power else text
+
+
+def _literal(number):
+    text = repr(number)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _fold(node):
+    """Evaluates the parts without variables once, at compile time (2*pi*r multiplies by one constant)."""
+    kind = node[0]
+    if kind == "const":
+        return ("num", CONSTANTS[node[1]])
+    if kind in ("num", "var"):
+        return node
+    if kind == "neg":
+        children = (_fold(node[1]),)
+    elif kind == "call":
+        children = tuple(_fold(arg) for arg in node[2])
+    else:
+        children = (_fold(node[2]), _fold(node[3]))
+    folded = node[:-len(children)] + children if kind != "call" else (kind, node[1], children)
+    if all(child[0] == "num" for child in children):
+        values = [child[1] for child in children]
+        try:
+            if kind == "neg":
+                value = -values[0]
+            elif kind == "call":
+                value = float(_scalar_function(node[1])(*values))
+            else:
+                value = _OPERATORS[node[1]](*values)
+        except ZeroDivisionError:
+            raise ExpressionError("Division by zero in a part of the expression without variables") from None
+        except (ValueError, OverflowError):
+            raise ExpressionError("A part of the expression without variables has no real value") from None
+        if math.isfinite(value):
+            return ("num", value)
+    return folded
+
+
+def _scalar_function(name):
+    path = FUNCTIONS[name][1]
+    return getattr(math, path[5:]) if path.startswith("math.") else _NAMESPACES["scalar"][path]
+
+
+def _emit(node, params, mode, power=0):
+    """
+    Source text for a (folded) tree. Like _format(), parenthesizes only where
+    precedence needs it: Python's parser refuses deeply nested parentheses,
+    and a long sum is a deep tree.
+    """
+    kind = node[0]
+    if kind == "num":
+        return repr(node[1]) if node[1] >= 0 else f"({node[1]!r})"
+    if kind == "var":
+        return params[node[1]]
+    if kind == "neg":
+        return f"(-{_emit(node[1], params, mode, _UNARY)})"
+    if kind == "call":
+        function = FUNCTIONS[node[1]][1 if mode == "scalar" else 2]
+        return f"{function}({', '.join(_emit(arg, params, mode) for arg in node[2])})"
+    _, symbol, left, right = node
+    if symbol == "^":
+        # math.pow raises for a negative base with a fractional power (no complex results); NumPy gives NaN
+        function = "math.pow" if mode == "scalar" else "np.power"
+        return f"{function}({_emit(left, params, mode)}, {_emit(right, params, mode)})"
+    own = _BINARY[symbol]
+    text = f"{_emit(left, params, mode, own)} {symbol} {_emit(right, params, mode, own + 1)}"
+    return f"({text})" if own < power else text
@@ -1,3 +1,7 @@
+import numpy as np
+
+from app.formulas.numeric import divide
+
 def compute_velocity(u, a, t):
     """Compute final velocity v = u + a * t"""
     return u + a * t
@@ -9,12 +13,22 @@ def compute_displacement(u, a, t):
 def compute_velocity_squared(u, a, s):
     """Compute final velocity squared v^2 = u^2 + 2 * a * s"""
     result = (u ** 2) + (2 * a * s)
+    if isinstance(result, np.ndarray):
+        return np.round(result, 2)  # Arrays have no __round__, use NumPy's element-wise round
     return round(result, 2)  # Rounding the result to 2 decimal places
 
-def compute_time(v, u, a):
-    """Compute time t = (v - u) / a"""
-    return (v - u) / a
+def compute_final_velocity(v_squared):
+    """Compute final velocity v = sqrt(v^2), rounded to 2 decimal places"""
+    if isinstance(v_squared, np.ndarray):
+        return np.round(np.sqrt(v_squared), 2)  # Negative v^2 gives NaN element-wise
+    if v_squared < 0:
+        raise ValueError("Velocity squared is negative, so there is no real final velocity")
+    return round(v_squared ** 0.5, 2)
+
+def compute_time(v, u, a, on_zero="raise"):
+    """Compute time t = (v - u) / a; a = 0 raises ZeroDivisionError, as the plain division always did"""
+    return divide(v - u, a, "Acceleration cannot be zero", on_zero, ZeroDivisionError)
 
-def compute_acceleration(v, u, t):
-    """Compute acceleration a = (v - u) / t"""
-    return (v - u) / t
+def compute_acceleration(v, u, t, on_zero="raise"):
+    """Compute acceleration a = (v - u) / t; t = 0 raises ZeroDivisionError, as the plain division always did"""
+    return divide(v - u, t, "Time cannot be zero", on_zero, ZeroDivisionError)
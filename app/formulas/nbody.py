@@ -0,0 +1,290 @@
+import numpy as np
+
+G = 6.67430e-11  # Gravitational constant
+NBODY_METHODS = ("auto", "barnes_hut", "exact")
+# "auto" sums every pair exactly up to this many bodies, and uses the tree above it
+EXACT_LIMIT = 2000
+EXACT_MAX_BODIES = 5000  # "exact" is O(N²): refused above this (about half a second of CPU)
+MAX_BODIES = 100_000  # Largest system for any method (Barnes–Hut takes a few seconds here)
+
+_DEPTH = 16  # Octree levels below the root (Morton codes of 3 * 16 bits)
+_LEAF_SIZE = 8  # Cells this small are summed body by body instead of split further
+_GROUP_SIZE = 32  # Bodies that walk the tree together, sharing one interaction list
+_GROUP_BLOCK = 1024  # Groups walked through the tree together, which bounds memory for large N
+_PAIR_BUDGET = 1 << 16  # Pairs evaluated per vectorized block, sized so temporaries stay in cache
+# Body pairs Barnes–Hut may sum directly: bodies closer together than the deepest cells
+# (coincident or tightly clustered) all land in one leaf, whose near field is O(N²)
+_NEAR_PAIRS = EXACT_MAX_BODIES ** 2
+
+
+def _check(masses, positions, softening):
+    masses = np.asarray(masses, dtype=np.float64)
+    positions = np.asarray(positions, dtype=np.float64)
+    if masses.ndim != 1 or masses.size == 0:
+        raise ValueError("masses must be a non-empty list of numbers")
+    if positions.shape not in ((masses.size, 2), (masses.size, 3)):
+        raise ValueError("positions must be one [x, y] or [x, y, z] point per mass")
+    if not (np.isfinite(masses).all() and np.isfinite(positions).all()):
+        raise ValueError("masses and positions must be finite numbers")
+    if (masses < 0).any():
+        raise ValueError("Masses cannot be negative")
+    if not (softening >= 0 and np.isfinite(softening)):
+        raise ValueError("Softening cannot be negative")
+    dims = positions.shape[1]
+    if dims == 2:
+        positions = np.column_stack((positions, np.zeros(masses.size)))
+    return masses, positions, dims
+
+
+def _accumulate(forces, owners, dx, dy, dz, weights, softening):
+    """
+    Adds weights * (dx, dy, dz) / (r^2 + ε^2)^1.5 to forces[:, owners]; coincident
+    points add nothing. Owners must be sorted, so only their span of forces is touched.
+    """
+    r2 = dx * dx
+    r2 += dy * dy
+    r2 += dz * dz
+    r2 += softening * softening
+    scale = np.sqrt(r2)
+    scale *= r2
+    np.divide(weights, scale, out=scale, where=r2 > 0)  # Left at 0 where r2 == 0
+    low, high = owners[0], owners[-1] + 1
+    owners = owners - low
+    forces[0, low:high] += np.bincount(owners, dx * scale, minlength=high - low)
+    forces[1, low:high] += np.bincount(owners, dy * scale, minlength=high - low)
+    forces[2, low:high] += np.bincount(owners, dz * scale, minlength=high - low)
+
+
+def _expand(owners, starts, counts):
+    """Pairs each owner with every index in [start, start + count)."""
+    offsets = np.cumsum(counts) - counts
+    owner = np.repeat(owners, counts)
+    index = np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+    return owner, index
+
+
+def _split(starts, counts, size):
+    """Cuts each range [start, start + count) into consecutive ranges of at most size."""
+    pieces = -(-counts // size)
+    owner = np.repeat(np.arange(counts.size), pieces)
+    offset = (np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)) * size
+    return starts[owner] + offset, np.minimum(counts[owner] - offset, size), owner
+
+
+def _spread(values):
+    """Spreads the low 16 bits of each value three bits apart (for Morton interleaving)."""
+    values = values.astype(np.uint64)
+    for shift, mask in ((16, 0x0000FF0000FF), (8, 0x00F00F00F00F), (4, 0x0C30C30C30C3), (2, 0x249249249249)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+class _Octree:
+    """
+    A linear octree: bodies sorted by Morton code, and for each level the cells
+    that hold at least one body, with their body range, mass, centre of mass,
+    geometric centre and the range of their children on the next level.
+    """
+
+    def __init__(self, masses, positions):
+        lower = positions.min(axis=0)
+        self.size = max(float((positions.max(axis=0) - lower).max()), 1e-300) * (1 + 1e-9)
+        cells = 1 << _DEPTH
+        grid = np.minimum(((positions - lower) / self.size * cells).astype(np.int64), cells - 1)
+        codes = _spread(grid[:, 0]) | (_spread(grid[:, 1]) << np.uint64(1)) | (_spread(grid[:, 2]) << np.uint64(2))
+
+        self.order = np.argsort(codes, kind="stable")
+        codes, grid = codes[self.order], grid[self.order]
+        self.masses, self.positions = masses[self.order], positions[self.order]
+        weighted = self.positions * self.masses[:, None]
+
+        self.levels = []
+        for level in range(_DEPTH + 1):
+            shift = np.uint64(3 * (_DEPTH - level))
+            prefix = codes >> shift
+            starts = np.flatnonzero(np.concatenate(([True], prefix[1:] != prefix[:-1])))
+            counts = np.diff(np.append(starts, codes.size))
+            mass = np.add.reduceat(self.masses, starts)
+            com = np.add.reduceat(weighted, starts, axis=0)
+            # Cells whose bodies are all massless use their plain mean position
+            plain = np.add.reduceat(self.positions, starts, axis=0) / counts[:, None]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                com = np.where(mass[:, None] > 0, com / mass[:, None], plain)
+            width = self.size / (1 << level)
+            centre = lower + ((grid[starts] >> (_DEPTH - level)) + 0.5) * width
+            self.levels.append({
+                "prefix": prefix[starts],
+                "start": starts,
+                "count": counts,
+                "mass": mass,
+                "com": com,
+                "offset": np.linalg.norm(com - centre, axis=1),
+                "width": width,
+            })
+        for parent, child in zip(self.levels, self.levels[1:]):
+            parents = child["prefix"] >> np.uint64(3)
+            parent["first_child"] = np.searchsorted(parents, parent["prefix"], "left")
+            parent["children"] = np.searchsorted(parents, parent["prefix"], "right") - parent["first_child"]
+
+    def groups(self):
+        """Target groups: the largest cells holding at most _GROUP_SIZE bodies, with a bounding sphere each."""
+        starts, counts = [], []
+        cells = np.zeros(1, dtype=np.int64)
+        for level, cell in enumerate(self.levels):
+            small = cell["count"][cells] <= _GROUP_SIZE
+            if level == _DEPTH:
+                small[:] = True
+            starts.append(cell["start"][cells[small]])
+            counts.append(cell["count"][cells[small]])
+            if level < _DEPTH:
+                big = cells[~small]
+                _, cells = _expand(big, cell["first_child"][big], cell["children"][big])
+        starts, counts = np.concatenate(starts), np.concatenate(counts)
+        order = np.argsort(starts)
+        # Deepest cells can hold any number of bodies; those become several groups
+        starts, counts, _ = _split(starts[order], counts[order], _GROUP_SIZE)
+        low = np.minimum.reduceat(self.positions, starts, axis=0)
+        high = np.maximum.reduceat(self.positions, starts, axis=0)
+        return starts, counts, (low + high) / 2, np.linalg.norm(high - low, axis=1) / 2
+
+    def interactions(self, groups, centre, radius, theta):
+        """
+        Walks the tree for a block of target groups. Returns the (group, cell)
+        pairs that act as a single mass and the (group, body range) pairs that
+        are summed directly, each ordered by group.
+        """
+        far_groups, far_cells, near_groups, near_starts, near_counts = [], [], [], [], []
+        cells = np.zeros(groups.size, dtype=np.int64)
+        for level, cell in enumerate(self.levels):
+            if groups.size == 0:
+                break
+            distance = np.linalg.norm(cell["com"][cells] - centre[groups], axis=1)
+            # Barnes' criterion, taken from the nearest point of the group's bounding sphere
+            accept = cell["width"] < theta * (distance - radius[groups] - cell["offset"][cells])
+            far_groups.append(groups[accept])
+            far_cells.append((level, cells[accept]))
+
+            groups, cells = groups[~accept], cells[~accept]
+            direct = cell["count"][cells] <= _LEAF_SIZE
+            if level == _DEPTH:
+                direct[:] = True
+            near_groups.append(groups[direct])
+            near_starts.append(cell["start"][cells[direct]])
+            near_counts.append(cell["count"][cells[direct]])
+            if level < _DEPTH:
+                split = ~direct
+                groups, cells = _expand(groups[split], cell["first_child"][cells[split]],
+                                        cell["children"][cells[split]])
+
+        # Flatten the accepted cells of every level into one mass/centre-of-mass table
+        far_groups = np.concatenate(far_groups)
+        far = np.argsort(far_groups, kind="stable")
+        masses = np.concatenate([self.levels[level]["mass"][index] for level, index in far_cells])
+        coms = np.concatenate([self.levels[level]["com"][index] for level, index in far_cells])
+        near_groups = np.concatenate(near_groups)
+        near = np.argsort(near_groups, kind="stable")
+        # Split crowded leaves, so one group against one leaf stays within _PAIR_BUDGET
+        near_starts, near_counts, owner = _split(np.concatenate(near_starts)[near], np.concatenate(near_counts)[near],
+                                                 _PAIR_BUDGET // _GROUP_SIZE)
+        return (far_groups[far], masses[far], coms[far]), (near_groups[near][owner], near_starts, near_counts)
+
+    def forces(self, theta, softening):
+        """
+        Net force per body (in sorted order, as a (3, n) array) with opening angle theta.
+        Raises ValueError when more than _NEAR_PAIRS pairs would be summed directly.
+        """
+        starts, counts, centre, radius = self.groups()
+        x, y, z = np.ascontiguousarray(self.positions.T)
+        forces = np.zeros((3, self.masses.size))
+        near_pairs = 0
+
+        # Blocks of neighbouring groups keep every intermediate array small enough for the cache
+        for first in range(0, starts.size, _GROUP_BLOCK):
+            block = np.arange(first, min(first + _GROUP_BLOCK, starts.size))
+            (groups, masses, coms), (near_groups, sources, sizes) = self.interactions(block, centre, radius, theta)
+            near_pairs += int((counts[near_groups] * sizes).sum())
+            if near_pairs > _NEAR_PAIRS:
+                raise ValueError("Too many bodies too close together for barnes_hut to separate; "
+                                 "spread them out or send fewer bodies")
+
+            # Far field: every body of a group against each accepted cell's centre of mass
+            cx, cy, cz = coms.T
+            for piece in _batches(counts[groups]):
+                pair, body = _expand(piece, starts[groups[piece]], counts[groups[piece]])
+                _accumulate(forces, body, cx[pair] - x[body], cy[pair] - y[body], cz[pair] - z[body],
+                            masses[pair], softening)
+
+            # Near field: every body of a group against every body of an opened leaf
+            for piece in _batches(counts[near_groups] * sizes):
+                pair, body = _expand(piece, starts[near_groups[piece]], counts[near_groups[piece]])
+                entry, other = _expand(np.arange(body.size), sources[pair], sizes[pair])
+                body = body[entry]
+                _accumulate(forces, body, x[other] - x[body], y[other] - y[body], z[other] - z[body],
+                            self.masses[other], softening)
+        return forces
+
+
+def _batches(weights):
+    """Splits pair indices into runs whose expanded size stays near _PAIR_BUDGET."""
+    total = np.cumsum(weights)
+    cuts = np.searchsorted(total, np.arange(_PAIR_BUDGET, total[-1], _PAIR_BUDGET)) if total.size else []
+    bounds = np.unique(np.concatenate(([0], cuts, [weights.size])))
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        yield np.arange(begin, end)
+
+
+def _exact_forces(masses, positions, softening):
+    """Direct O(N²) sum, vectorized in blocks of target bodies."""
+    n = masses.size
+    x, y, z = np.ascontiguousarray(positions.T)
+    forces = np.empty((n, 3))
+    block = max(1, _PAIR_BUDGET // n)
+    for begin in range(0, n, block):
+        rows = slice(begin, begin + block)
+        dx, dy, dz = x - x[rows, None], y - y[rows, None], z - z[rows, None]
+        r2 = dx * dx + dy * dy + dz * dz + softening * softening
+        scale = np.sqrt(r2)
+        scale *= r2
+        np.divide(masses, scale, out=scale, where=r2 > 0)
+        forces[rows, 0] = (dx * scale).sum(axis=1)
+        forces[rows, 1] = (dy * scale).sum(axis=1)
+        forces[rows, 2] = (dz * scale).sum(axis=1)
+    return forces
+
+
+def nbody_method(method, count):
+    """The method actually used for count bodies ("auto" picks exact for small systems)."""
+    if method not in NBODY_METHODS:
+        raise ValueError(f"Method must be one of {', '.join(NBODY_METHODS)}")
+    if method == "auto":
+        return "exact" if count <= EXACT_LIMIT else "barnes_hut"
+    return method
+
+
+def compute_nbody_forces(masses, positions, method="auto", theta=0.7, softening=0.0, G=G):
+    """
+    Net gravitational force on every body of a system:
+    F_i = Σ_j G * m_i * m_j * (r_j - r_i) / (|r_j - r_i|^2 + ε^2)^1.5
+
+    "exact" sums all pairs (O(N²), in vectorized blocks); "barnes_hut" builds an
+    octree and treats any cell of width s whose centre of mass is far enough
+    away (s < theta * d) as a single mass, which is O(N log N). Positions may be
+    2D or 3D; forces come back with the same shape. Softening ε keeps close
+    encounters finite.
+    """
+    if not 0 < theta <= 1:
+        raise ValueError("Theta must be greater than 0 and at most 1")
+    masses, positions, dims = _check(masses, positions, softening)
+    method = nbody_method(method, masses.size)
+    if masses.size > MAX_BODIES:
+        raise ValueError(f"Too many bodies: at most {MAX_BODIES}")
+    if method == "exact" and masses.size > EXACT_MAX_BODIES:
+        raise ValueError(f"method exact takes at most {EXACT_MAX_BODIES} bodies; use barnes_hut or auto")
+
+    if method == "exact":
+        forces = _exact_forces(masses, positions, softening)
+    else:
+        tree = _Octree(masses, positions)
+        forces = np.empty((masses.size, 3))
+        forces[tree.order] = tree.forces(theta, softening).T
+    return G * masses[:, None] * forces[:, :dims]
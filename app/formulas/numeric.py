@@ -0,0 +1,63 @@
+import math
+import numpy as np
+
+# Element-wise policies for inputs that would divide by zero
+ZERO_POLICIES = ("raise", "nan", "mask")
+
+
+def is_array(*values):
+    """True if any of the values is a NumPy array (the vectorized path)."""
+    return any(isinstance(value, np.ndarray) for value in values)
+
+
+def radians(angle_deg):
+    """Degrees to radians: math for scalars (unchanged results), NumPy for arrays."""
+    if isinstance(angle_deg, np.ndarray):
+        return np.radians(angle_deg)
+    return math.radians(angle_deg)
+
+
+def sin(x):
+    """Sine: math for scalars (unchanged results), NumPy for arrays."""
+    if isinstance(x, np.ndarray):
+        return np.sin(x)
+    return math.sin(x)
+
+
+def cos(x):
+    """Cosine: math for scalars (unchanged results), NumPy for arrays."""
+    if isinstance(x, np.ndarray):
+        return np.cos(x)
+    return math.cos(x)
+
+
+def divide(numerator, denominator, message, on_zero="raise", error=ValueError):
+    """
+    Divide with an explicit policy for zero denominators:
+    - "raise": raise error(message) if any denominator is zero (default)
+    - "nan":   zero denominators give NaN
+    - "mask":  zero denominators are masked (numpy.ma.MaskedArray)
+    Scalars behave exactly like a plain division guarded by `== 0`.
+    """
+    if on_zero not in ZERO_POLICIES:
+        raise ValueError(f"on_zero must be one of {', '.join(ZERO_POLICIES)}")
+
+    if not is_array(numerator, denominator):
+        if denominator == 0:
+            if on_zero == "raise":
+                raise error(message)
+            return float("nan") if on_zero == "nan" else np.ma.masked
+        return numerator / denominator
+
+    zero = np.asarray(denominator) == 0
+    if not zero.any():
+        return np.divide(numerator, denominator)
+    if on_zero == "raise":
+        raise error(message)
+
+    safe = np.where(zero, 1.0, denominator)
+    result = np.divide(numerator, safe)
+    zero = np.broadcast_to(zero, result.shape)
+    if on_zero == "nan":
+        return np.where(zero, np.nan, result)
+    return np.ma.masked_array(result, mask=zero)
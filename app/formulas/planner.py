@@ -0,0 +1,120 @@
+"""
+Chains the equations of app/formulas/equations.py to reach one quantity from
+others, across groups: mass → normal force → friction → net force →
+acceleration → displacement is one request instead of five.
+
+Quantities are the nodes and each equation joins its quantities: once all but
+one are known, the equation yields the last one (through the cached symbolic
+Solution). plan() finds the steps once per (knowns, target) shape and caches
+them; Plan.run() only evaluates compiled callables.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from app.formulas.equations import EQUATIONS, quantity
+from app.formulas.symbolic import solve_for
+from app.utils.validator import compile_schema
+
+Step = namedtuple("Step", ["equation", "unknown", "quantity", "inputs"])  # inputs: (variable, quantity) pairs
+
+# Every quantity the planner knows, with the first description and unit declared for it
+QUANTITIES = {}
+for _equation in EQUATIONS:
+    for _variable in _equation.variables:
+        QUANTITIES.setdefault(quantity(_equation, _variable.name), (_variable.description, _variable.unit))
+
+
+class PlanError(ValueError):
+    """The target cannot be derived from the known quantities, or some of them follow from the others."""
+
+
+class Plan:
+    """The steps from a set of known quantities to a target, with the validator for those knowns."""
+
+    def __init__(self, knowns, target, steps):
+        self.knowns = knowns
+        self.target = target
+        self.steps = steps
+        self.schema = compile_schema(knowns)
+
+    def run(self, values):
+        """
+        Evaluates the steps in order from a dict of known values. Returns
+        (every value known or derived, [(step, formula, inputs, result)]).
+        Raises ValueError naming the step that has no real solution.
+        """
+        values = dict(values)
+        trace = []
+        for step in self.steps:
+            solution = solve_for(step.equation.group, step.equation.name, step.unknown)
+            inputs = {variable: values[name] for variable, name in step.inputs}
+            try:
+                result, _ = solution(*inputs.values())
+            except ValueError as e:
+                raise ValueError(f"{step.equation.group}/{step.equation.name}: {e}") from None
+            values[step.quantity] = result
+            trace.append((step, " OR ".join(solution.expressions), inputs, result))
+        return values, trace
+
+
+@lru_cache(maxsize=1024)
+def plan(knowns, target):
+    """
+    The Plan deriving `target` from the frozenset `knowns`, cached per shape.
+    Equations are applied breadth-first, in rounds, until the target is
+    reached; only the steps the target depends on are kept. Raises PlanError
+    when it cannot be reached or when a known follows from the other knowns,
+    and KeyError for a quantity no equation has.
+    """
+    unknown = sorted(name for name in knowns | {target} if name not in QUANTITIES)
+    if unknown:
+        raise KeyError(", ".join(unknown))
+
+    known, producers = _derive(knowns, target)
+    if target not in known:
+        reachable = ", ".join(sorted(known - knowns)) or "nothing"
+        raise PlanError(f"Cannot derive {target} from {', '.join(sorted(knowns))} (derivable: {reachable})")
+    # A known that the others already determine could contradict them; the chain would silently use one of the two
+    redundant = sorted(name for name in knowns if name in _derive(knowns - {name}, name)[0])
+    if redundant:
+        raise PlanError(f"Overdetermined: {', '.join(redundant)} can each be derived from the other knowns; leave some out")
+
+    steps = []
+    needed = set()
+
+    def visit(name):
+        if name in knowns or name in needed:
+            return
+        needed.add(name)
+        step = producers[name]
+        for _, dependency in step.inputs:
+            visit(dependency)
+        steps.append(step)
+
+    visit(target)
+    return Plan(tuple(sorted(knowns)), target, tuple(steps))
+
+
+def _derive(knowns, target):
+    """
+    Applies equations breadth-first, in rounds, until `target` is known or
+    nothing more can be derived. Returns (every quantity known or derived,
+    {quantity: Step that derives it}).
+    """
+    known = set(knowns)
+    producers = {}
+    progress = True
+    while target not in known and progress:
+        progress = False
+        derived = {}
+        for equation in EQUATIONS:
+            names = [(variable.name, quantity(equation, variable.name)) for variable in equation.variables]
+            missing = [(variable, name) for variable, name in names if name not in known]
+            if len(missing) == 1 and missing[0][1] not in derived:
+                variable, name = missing[0]
+                derived[name] = Step(equation, variable, name, tuple(pair for pair in names if pair[1] != name))
+        if derived:
+            producers.update(derived)
+            known.update(derived)
+            progress = True
+    return known, producers
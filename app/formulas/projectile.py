@@ -1,19 +1,50 @@
-import math
+import numpy as np
+from app.formulas.numeric import radians, sin, cos
 
 def compute_range(u, angle_deg):
     """Compute horizontal range R = (u^2 * sin(2θ)) / g"""
     g = 9.8
-    angle_rad = math.radians(angle_deg)
-    return (u ** 2) * math.sin(2 * angle_rad) / g
+    angle_rad = radians(angle_deg)
+    return (u ** 2) * sin(2 * angle_rad) / g
 
 def compute_time_of_flight(u, angle_deg):
     """Compute time of flight T = (2 * u * sinθ) / g"""
     g = 9.8
-    angle_rad = math.radians(angle_deg)
-    return (2 * u * math.sin(angle_rad)) / g
+    angle_rad = radians(angle_deg)
+    return (2 * u * sin(angle_rad)) / g
 
 def compute_max_height(u, angle_deg):
     """Compute max height H = (u^2 * sin^2θ) / (2g)"""
     g = 9.8
-    angle_rad = math.radians(angle_deg)
-    return (u ** 2) * (math.sin(angle_rad) ** 2) / (2 * g)
+    angle_rad = radians(angle_deg)
+    return (u ** 2) * (sin(angle_rad) ** 2) / (2 * g)
+
+
+def compute_trajectory(u, angle_deg, t):
+    """
+    Compute position and velocity at time t:
+    x = u * cosθ * t, y = u * sinθ * t - 1/2 * g * t^2
+    vx = u * cosθ, vy = u * sinθ - g * t
+    """
+    g = 9.8
+    angle_rad = radians(angle_deg)
+    ux = u * cos(angle_rad)
+    uy = u * sin(angle_rad)
+    x = ux * t
+    y = uy * t - 0.5 * g * t ** 2
+    vx = ux + 0 * t  # Constant, broadcast to the shape of t
+    vy = uy - g * t
+    return x, y, vx, vy
+
+def sample_trajectory(u, angle_deg, samples, chunk_size=65536):
+    """
+    Sample the flight evenly from launch to landing.
+    Yields (k, 5) float64 arrays with columns t, x, y, vx, vy, one chunk at a time,
+    so the full trajectory never has to be held in memory.
+    """
+    flight_time = compute_time_of_flight(u, angle_deg)
+    step = flight_time / (samples - 1) if samples > 1 else 0.0
+    for start in range(0, samples, chunk_size):
+        t = np.arange(start, min(start + chunk_size, samples), dtype=np.float64) * step
+        x, y, vx, vy = compute_trajectory(u, angle_deg, t)
+        yield np.column_stack((t, x, y, vx, vy))
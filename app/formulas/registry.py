@@ -0,0 +1,179 @@
+"""
+Declarative metadata for every closed-form formula.
+
+Each entry names the function in app/formulas, its inputs (in the order of the
+function's parameters), the output and the formula string. Routes, Swagger specs
+and request validators are generated from these entries (see app/utils/formula_routes.py),
+so adding a formula here is enough to expose it at /api/<group>/<name> and
+/api/<group>/<name>/batch.
+"""
+from collections import namedtuple
+
+from app.formulas import kinematics, projectile, work_energy, electricity, forces
+
+Input = namedtuple("Input", ["name", "description", "unit", "example", "optional"], defaults=[None, False])
+Extra = namedtuple("Extra", ["name", "func", "description"])
+Formula = namedtuple(
+    "Formula",
+    ["group", "name", "title", "func", "inputs", "output", "expression", "extras", "description"],
+    defaults=[(), None],
+)
+
+# Swagger tag for each group; the group is also the URL segment (/api/<group>/...)
+GROUPS = {
+    "kinematics": "Kinematics",
+    "projectile": "Projectile Motion",
+    "work_energy": "Work & Energy",
+    "electricity": "Electricity",
+    "forces": "Forces",
+}
+
+FORMULAS = [
+    # ------------------------
+    # Kinematics
+    # ------------------------
+    Formula(
+        "kinematics", "velocity", "Calculate Final Velocity (v)", kinematics.compute_velocity,
+        (Input("u", "Initial Velocity", "m/s", 0), Input("a", "Acceleration", "m/s^2", 9.8), Input("t", "Time", "s", 10)),
+        "Final Velocity (m/s)", "v = u + a * t",
+    ),
+    Formula(
+        "kinematics", "displacement", "Calculate Displacement (s)", kinematics.compute_displacement,
+        (Input("u", "Initial Velocity", "m/s", 0), Input("a", "Acceleration", "m/s^2", 9.8), Input("t", "Time", "s", 10)),
+        "Displacement (meters)", "s = u * t + 0.5 * a * t^2",
+    ),
+    Formula(
+        "kinematics", "velocity_squared", "Calculate Final Velocity Squared (v^2)", kinematics.compute_velocity_squared,
+        (Input("u", "Initial Velocity", "m/s", 0), Input("a", "Acceleration", "m/s^2", 9.8), Input("s", "Displacement", "m", 100)),
+        "Velocity Squared (v^2)", "v^2 = u^2 + 2 * a * s",
+        extras=(Extra("final_velocity", kinematics.compute_final_velocity, "The square root of result (v)"),),
+    ),
+    Formula(
+        "kinematics", "time", "Calculate Time (t)", kinematics.compute_time,
+        (Input("v", "Final Velocity", "m/s", 50), Input("u", "Initial Velocity", "m/s", 0), Input("a", "Acceleration", "m/s^2", 9.8)),
+        "Time (s)", "t = (v - u) / a",
+    ),
+    Formula(
+        "kinematics", "acceleration", "Calculate Acceleration (a)", kinematics.compute_acceleration,
+        (Input("v", "Final Velocity", "m/s", 50), Input("u", "Initial Velocity", "m/s", 0), Input("t", "Time", "s", 10)),
+        "Acceleration (m/s^2)", "a = (v - u) / t",
+    ),
+
+    # ------------------------
+    # Projectile Motion
+    # ------------------------
+    Formula(
+        "projectile", "range", "Calculate Horizontal Range (R)", projectile.compute_range,
+        (Input("u", "Initial Velocity", "m/s", 20), Input("angle", "Angle of projection", "degrees", 45)),
+        "Range (meters)", "R = (u^2 * sin(2θ)) / g",
+    ),
+    Formula(
+        "projectile", "time", "Calculate Time of Flight (T)", projectile.compute_time_of_flight,
+        (Input("u", "Initial Velocity", "m/s", 20), Input("angle", "Angle of projection", "degrees", 30)),
+        "Time (seconds)", "T = (2 * u * sinθ) / g",
+    ),
+    Formula(
+        "projectile", "height", "Calculate Maximum Height (H)", projectile.compute_max_height,
+        (Input("u", "Initial Velocity", "m/s", 20), Input("angle", "Angle of projection", "degrees", 60)),
+        "Maximum Height (meters)", "H = (u^2 * sin^2θ) / (2g)",
+    ),
+
+    # ------------------------
+    # Work & Energy
+    # ------------------------
+    Formula(
+        "work_energy", "work", "Calculate Work (W)", work_energy.compute_work,
+        (Input("force", "Force", "N", 50), Input("distance", "Distance", "m", 10)),
+        "Work (Joules)", "W = F * d",
+    ),
+    Formula(
+        "work_energy", "power", "Calculate Mechanical Power (P)", work_energy.compute_power,
+        (Input("work", "Work", "J", 500), Input("time", "Time", "s", 10)),
+        "Power (Watts)", "P = W / t",
+    ),
+    Formula(
+        "work_energy", "kinetic", "Calculate Kinetic Energy (KE)", work_energy.compute_kinetic_energy,
+        (Input("mass", "Mass", "kg", 2), Input("velocity", "Velocity", "m/s", 10)),
+        "Kinetic Energy (Joules)", "KE = 1/2 * m * v^2",
+    ),
+    Formula(
+        "work_energy", "potential", "Calculate Potential Energy (PE)", work_energy.compute_potential_energy,
+        (Input("mass", "Mass", "kg", 10), Input("height", "Height", "m", 5)),
+        "Potential Energy (Joules)", "PE = m * g * h",
+    ),
+
+    # ------------------------
+    # Electricity
+    # ------------------------
+    Formula(
+        "electricity", "current", "Calculate Current (I)", electricity.compute_current,
+        (Input("voltage", "Voltage", "V", 12), Input("resistance", "Resistance", "Ω", 4)),
+        "Current (Amperes)", "I = V / R",
+    ),
+    Formula(
+        "electricity", "voltage", "Calculate Voltage (V)", electricity.compute_voltage,
+        (Input("current", "Current", "A", 2), Input("resistance", "Resistance", "Ω", 5)),
+        "Voltage (Volts)", "V = I * R",
+    ),
+    Formula(
+        "electricity", "resistance", "Calculate Resistance (R)", electricity.compute_resistance,
+        (Input("voltage", "Voltage", "V", 220), Input("current", "Current", "A", 5)),
+        "Resistance (Ohms)", "R = V / I",
+    ),
+    Formula(
+        "electricity", "power", "Calculate Power (P)", electricity.compute_power,
+        (
+            Input("voltage", "Voltage", "V", 10, optional=True),
+            Input("current", "Current", "A", 2, optional=True),
+            Input("resistance", "Resistance", "Ω", optional=True),
+        ),
+        "Power (Watts)", "P = V * I OR P = I^2 * R OR P = V^2 / R",
+        description="Calculates power using any two available variables (V, I, R).",
+    ),
+
+    # ------------------------
+    # Forces
+    # ------------------------
+    Formula(
+        "forces", "normal", "Calculate Normal Force (N)", forces.compute_normal_force,
+        (Input("mass", "Mass", "kg", 10),),
+        "Normal Force (Newtons)", "N = mg",
+    ),
+    Formula(
+        "forces", "friction", "Calculate Frictional Force (F_f)", forces.compute_frictional_force,
+        (Input("mu", "Coefficient of Friction", "μ", 0.5), Input("normal_force", "Normal Force", "N", 98)),
+        "Frictional Force (Newtons)", "F_f = μN",
+    ),
+    Formula(
+        "forces", "tension", "Calculate Tension Force (T)", forces.compute_tension_force,
+        (Input("mass", "Mass", "kg", 5),),
+        "Tension Force (Newtons)", "T = mg",
+    ),
+    Formula(
+        "forces", "applied", "Return Applied Force", forces.compute_applied_force,
+        (Input("force", "The applied force value", "N", 150),),
+        "Applied Force (Newtons)", "F = Applied force",
+    ),
+    Formula(
+        "forces", "gravitational", "Calculate Gravitational Force", forces.compute_gravitational_force,
+        (Input("m1", "Mass 1", "kg", 5.972e24), Input("m2", "Mass 2", "kg", 7.348e22), Input("r", "Distance", "m", 384400000)),
+        "Gravitational Force (Newtons)", "F = G * (m1 * m2) / r^2",
+    ),
+    Formula(
+        "forces", "electromagnetic", "Calculate Electromagnetic Force", forces.compute_electromagnetic_force,
+        (Input("q1", "Charge 1", "Coulombs", 1.602e-19), Input("q2", "Charge 2", "Coulombs", -1.602e-19), Input("r", "Distance", "m", 5.29e-11)),
+        "Electromagnetic Force (Newtons)", "F = k_e * (q1 * q2) / r^2",
+    ),
+]
+
+_BY_KEY = {(formula.group, formula.name): formula for formula in FORMULAS}
+
+
+def formulas_for(group):
+    """All registered formulas of one group, in declaration order."""
+    return [formula for formula in FORMULAS if formula.group == group]
+
+
+def get_formula(group, name):
+    """Looks up one formula, or returns None."""
+    return _BY_KEY.get((group, name))
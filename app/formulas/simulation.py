@@ -0,0 +1,155 @@
+from functools import cached_property
+
+import numpy as np
+from app.formulas.forces import compute_gravitational_force, compute_electromagnetic_force
+from app.formulas.kinematics import compute_velocity, compute_displacement
+
+# Pair forces between particles, from the closed-form laws in forces.py
+FORCE_LAWS = ("gravity", "coulomb")
+
+
+class Particles:
+    """
+    State of a particle system: masses, optional charges, positions and
+    velocities (2D or 3D), plus the pair index arrays used by every force evaluation
+    (built on first use, so invalid systems are rejected before that O(N²) allocation).
+    """
+
+    def __init__(self, masses, positions, velocities, charges=None):
+        self.masses = np.asarray(masses, dtype=np.float64)
+        self.positions = np.array(positions, dtype=np.float64)
+        self.velocities = np.array(velocities, dtype=np.float64)
+        self.charges = None if charges is None else np.asarray(charges, dtype=np.float64)
+
+        n = self.masses.size
+        if self.masses.ndim != 1 or n == 0:
+            raise ValueError("masses must be a non-empty list of numbers")
+        if self.positions.shape not in ((n, 2), (n, 3)):
+            raise ValueError("positions must be one [x, y] or [x, y, z] point per mass")
+        if self.velocities.shape != self.positions.shape:
+            raise ValueError("velocities must have the same shape as positions")
+        if self.charges is not None and self.charges.shape != (n,):
+            raise ValueError("charges must have one value per mass")
+        arrays = [self.masses, self.positions, self.velocities] + ([self.charges] if self.charges is not None else [])
+        if not all(np.isfinite(array).all() for array in arrays):
+            raise ValueError("Particle values must be finite numbers")
+        if (self.masses <= 0).any():
+            raise ValueError("Masses must be positive")
+
+    @cached_property
+    def pairs(self):
+        return np.triu_indices(self.masses.size, k=1)
+
+
+def _pair_geometry(particles, softening):
+    """Separation vectors r_j - r_i for every pair and their softened lengths."""
+    i, j = particles.pairs
+    separation = particles.positions[j] - particles.positions[i]
+    distance = np.sqrt(np.einsum("ij,ij->i", separation, separation) + softening * softening)
+    return separation, distance
+
+
+def accelerations(particles, laws, softening, field=None, potential=False):
+    """
+    Acceleration of every particle from all pair forces plus a uniform field.
+    With potential=True, returns (acceleration, potential energy), both from the same pair distances.
+    """
+    i, j = particles.pairs
+    separation, distance = _pair_geometry(particles, softening)
+    # Signed magnitude of the pull of j on i along r_j - r_i (negative pushes i away)
+    pull = np.zeros(distance.size)
+    if "gravity" in laws:
+        pull += compute_gravitational_force(particles.masses[i], particles.masses[j], distance)
+    if "coulomb" in laws:
+        pull -= compute_electromagnetic_force(particles.charges[i], particles.charges[j], distance)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        push = np.where(distance > 0, pull / distance, 0.0)[:, None] * separation
+
+    n, dims = particles.positions.shape
+    force = np.empty((n, dims))
+    for axis in range(dims):
+        force[:, axis] = np.bincount(i, push[:, axis], minlength=n) - np.bincount(j, push[:, axis], minlength=n)
+    acceleration = force / particles.masses[:, None]
+    if field is not None:
+        acceleration += field
+    if not potential:
+        return acceleration
+    # For inverse-square laws the pair potential is -pull(r) * r
+    with np.errstate(invalid="ignore"):
+        energy = -float(np.sum(pull * distance))
+    if field is not None:
+        energy -= float(particles.masses @ (particles.positions @ field))
+    return acceleration, energy
+
+
+def kinetic_energy(particles):
+    return 0.5 * float(particles.masses @ np.einsum("ij,ij->i", particles.velocities, particles.velocities))
+
+
+def energies(particles, laws, softening, field=None):
+    """Kinetic and potential energy of the system."""
+    _, potential = accelerations(particles, laws, softening, field, potential=True)
+    return kinetic_energy(particles), potential
+
+
+def simulate(particles, dt, steps, stride=1, laws=("gravity",), softening=0.0, field=None):
+    """
+    Integrate the system with velocity Verlet (symplectic, so energy stays
+    bounded over long runs) and yield a frame every `stride` steps, plus the
+    first and last step. Each frame holds step, t, positions, velocities,
+    kinetic and potential energy. The state is updated in place (frame arrays
+    are the live state, so encode or copy them before the next frame), and
+    memory does not grow with the number of steps.
+
+    Arguments are checked before the first frame is produced; a ValueError is
+    raised for bad settings, and the returned iterator raises ValueError if the
+    integration diverges.
+    """
+    laws = tuple(laws)
+    unknown = set(laws) - set(FORCE_LAWS)
+    if unknown or not laws and field is None:
+        raise ValueError(f"forces must be a list of {', '.join(FORCE_LAWS)}, or give a uniform field")
+    if "coulomb" in laws and particles.charges is None:
+        raise ValueError("Coulomb forces need charges")
+    if not (dt > 0 and np.isfinite(dt)):
+        raise ValueError("Time step must be positive")
+    if steps < 1 or stride < 1:
+        raise ValueError("steps and stride must be at least 1")
+    if not (softening >= 0 and np.isfinite(softening)):
+        raise ValueError("Softening cannot be negative")
+    if field is not None:
+        field = np.asarray(field, dtype=np.float64)
+        if field.shape != (particles.positions.shape[1],) or not np.isfinite(field).all():
+            raise ValueError("field must be one finite acceleration component per dimension")
+    return _frames(particles, dt, steps, stride, laws, softening, field)
+
+
+def _frames(particles, dt, steps, stride, laws, softening, field):
+    def is_frame(step):
+        return step % stride == 0 or step == steps
+
+    # The potential comes with the accelerations at frame steps, so the pairs are measured once per step
+    acceleration, potential = accelerations(particles, laws, softening, field, potential=True)
+    for step in range(steps + 1):
+        if is_frame(step):
+            kinetic = kinetic_energy(particles)
+            if not (np.isfinite(particles.positions).all() and np.isfinite(kinetic + potential)):
+                raise ValueError(f"Simulation diverged at step {step}; try a smaller time step or softening")
+            yield {
+                "step": step,
+                "t": step * dt,
+                "positions": particles.positions,
+                "velocities": particles.velocities,
+                "kinetic": kinetic,
+                "potential": potential,
+            }
+        if step == steps:
+            break
+        # x(t + dt) = x + v dt + a dt^2 / 2, then v(t + dt) = v + (a + a') dt / 2
+        particles.positions += compute_displacement(particles.velocities, acceleration, dt)
+        if is_frame(step + 1):
+            updated, potential = accelerations(particles, laws, softening, field, potential=True)
+        else:
+            updated = accelerations(particles, laws, softening, field)
+        particles.velocities = compute_velocity(particles.velocities, 0.5 * (acceleration + updated), dt)
+        acceleration = updated
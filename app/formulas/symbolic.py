@@ -0,0 +1,154 @@
+import math
+from collections import namedtuple
+from functools import lru_cache, partial
+
+import numpy as np
+
+from app.formulas.equations import get_equation
+
+
+# The closed forms for one case of an equation: where the inputs at `zeros`
+# (indexes into Solution.inputs) are all zero, or everywhere when it is empty
+Case = namedtuple("Case", ["zeros", "expressions", "funcs"])
+
+
+class Solution:
+    """
+    The closed form(s) of one equation solved for one variable, compiled to
+    NumPy callables that take the other variables in declaration order
+    (`inputs`). Calling it solves one set of floats; roots() and pick() solve
+    whole arrays at once.
+
+    `cases` hold the special cases first: the general form of
+    s = u*t + a*t**2/2 divides by a, so a = 0 has a case of its own, t = s/u.
+    Each set of inputs is solved with the first case that applies.
+    """
+
+    def __init__(self, equation, unknown, inputs, cases):
+        self.equation = equation
+        self.unknown = unknown
+        self.inputs = inputs
+        self.cases = cases
+        self.expressions = [  # One string per root, e.g. ["t = (-u + v)/a"], then the special cases
+            expression if not case.zeros else f"{expression} if {' = '.join(inputs[i] for i in case.zeros)} = 0"
+            for case in reversed(cases) for expression in case.expressions
+        ]
+        self.positive = next(variable.positive for variable in equation.variables if variable.name == unknown)
+
+    def roots(self, *values):
+        """Every root for the given inputs, as float64 arrays broadcast together; NaN where a root is not real."""
+        with np.errstate(all='ignore'):
+            args = [np.asarray(value, dtype=np.float64) for value in values]
+            shape = np.broadcast_shapes(*(arg.shape for arg in args))
+            roots = [np.full(shape, np.nan) for _ in range(max(len(case.funcs) for case in self.cases))]
+            unsolved = np.ones(shape, dtype=bool)
+            for case in self.cases:
+                applies = unsolved.copy()
+                for i in case.zeros:
+                    applies &= args[i] == 0
+                if not applies.any():
+                    continue
+                unsolved &= ~applies
+                for i, func in enumerate(case.funcs):
+                    roots[i] = np.where(applies, self._real(np.asarray(func(*args)), shape), roots[i])
+        return roots
+
+    def _real(self, root, shape):
+        if np.iscomplexobj(root):
+            root = np.where(np.abs(root.imag) <= 1e-12 * np.abs(root.real), root.real, np.nan)
+        root = np.broadcast_to(root.astype(np.float64), shape)
+        if self.positive:
+            root = np.where(root >= 0, root, np.nan)
+        return np.where(np.isfinite(root), root, np.nan)
+
+    def pick(self, roots):
+        """Per row: the smallest non-negative root if there is one, otherwise the first real root, otherwise NaN."""
+        first = np.full(np.shape(roots[0]), np.nan)
+        for root in reversed(roots):
+            first = np.where(np.isnan(root), first, root)
+        non_negative = np.min([np.where(root >= 0, root, np.inf) for root in roots], axis=0)
+        return np.where(np.isfinite(non_negative), non_negative, first)
+
+    def __call__(self, *values):
+        """
+        Scalar solve with plain floats (NumPy's 0-d arrays cost more than the
+        arithmetic): (result, every real root in ascending order), chosen as in pick().
+        Raises ValueError when there is no real solution.
+        """
+        case = next(case for case in self.cases if all(values[i] == 0 for i in case.zeros))
+        real = []
+        with np.errstate(all='ignore'):
+            for func in case.funcs:
+                try:
+                    root = func(*values)
+                except (ZeroDivisionError, OverflowError):
+                    continue
+                if isinstance(root, complex):
+                    if abs(root.imag) > 1e-12 * abs(root.real):
+                        continue
+                    root = root.real
+                root = float(root)
+                if math.isfinite(root) and (root >= 0 or not self.positive):
+                    real.append(root)
+        if not real:
+            raise ValueError(f"No real solution for {self.unknown} with these inputs")
+        non_negative = [root for root in real if root >= 0]
+        return (min(non_negative) if non_negative else real[0]), sorted(real)
+
+
+@lru_cache(maxsize=None)  # At most one entry per (equation, variable) pair
+def solve_for(group, name, unknown):
+    """
+    Derives `unknown` from the equation with SymPy and compiles the result; the
+    first call per pair pays for the symbolic work (and the SymPy import), later
+    calls return the cached Solution. Raises KeyError for an unknown equation or
+    variable and ValueError when there is no closed form.
+    """
+    import sympy  # Deferred: only needed the first time each rearrangement is used
+
+    equation = get_equation(group, name)
+    if equation is None:
+        raise KeyError(f"{group}/{name}")
+    names = [variable.name for variable in equation.variables]
+    if unknown not in names:
+        raise KeyError(unknown)
+
+    symbols = {variable.name: sympy.Symbol(variable.name, real=True) for variable in equation.variables}
+    # Constants stay symbolic (readable forms, no rounding) and are bound as keyword arguments once compiled
+    constants = [sympy.Symbol(constant, positive=True) for constant in equation.constants]
+    namespace = dict(symbols, **{symbol.name: symbol for symbol in constants})
+    left, right = (sympy.parse_expr(side, local_dict=namespace) for side in equation.expression.split("="))
+    target = symbols[unknown]
+    inputs = tuple(name for name in names if name != unknown)
+    args = [symbols[name] for name in inputs]
+
+    numerator = sympy.fraction(sympy.together(left - right))[0]  # The equation with no division by an input
+    cases = {}  # zeros -> roots, general case first
+
+    def derive(zeros, roots):
+        # sympy.solve assumes the coefficients it divides by are not zero; an input
+        # that zeroes a root's denominator gets a case with the equation re-solved without it
+        cases[zeros] = roots
+        for root in roots:
+            denominator = sympy.fraction(sympy.together(root))[1]
+            for i, symbol in enumerate(args):
+                more = tuple(sorted(zeros + (i,)))
+                if i in zeros or more in cases or denominator.subs(symbol, 0) != 0:
+                    continue
+                special = numerator.subs({args[j]: 0 for j in more})
+                # Without the target left in it, the equation holds for any value or none
+                if target in special.free_symbols:
+                    derive(more, sympy.solve(special, target))
+
+    if left == target and target not in right.free_symbols:
+        derive((), [right])  # Already solved for this variable: pick the declared form
+    else:
+        derive((), sympy.solve(sympy.Eq(left, right), target))
+    if not cases[()]:
+        raise ValueError(f"{equation.expression} has no closed form for {unknown}")
+
+    return Solution(equation, unknown, inputs, [
+        Case(zeros, [f"{unknown} = {sympy.sstr(root)}" for root in roots],
+             [partial(sympy.lambdify(args + constants, root, modules="numpy"), **equation.constants) for root in roots])
+        for zeros, roots in sorted(cases.items(), key=lambda item: -len(item[0])) if roots
+    ])
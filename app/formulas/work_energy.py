@@ -1,12 +1,13 @@
+from app.formulas.numeric import divide
+
+
 def compute_work(force, distance):
     """Compute work W = F * d"""
     return force * distance
 
-def compute_power(work, time):
+def compute_power(work, time, on_zero="raise"):
     """Compute power P = W / t"""
-    if time == 0:
-        raise ValueError("Time cannot be zero")
-    return work / time
+    return divide(work, time, "Time cannot be zero", on_zero)
 
 def compute_kinetic_energy(mass, velocity):
     """Compute kinetic energy KE = 1/2 * m * v^2"""
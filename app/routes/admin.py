@@ -0,0 +1,219 @@
+from flask import Blueprint, Response, current_app, request, jsonify, url_for
+from app.utils import auth
+from app.utils.cache import current_cache
+from app.utils.error_handler import handle_invalid_input_error
+from app.utils.profiler import ProfileStore, ProfileBusy, ProfileCooldown
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+
+@bp.before_request
+def require_admin_token():
+    """Admin routes require ADMIN_TOKEN in the X-Admin-Token header, and are off while it is not configured."""
+    return auth.require_admin_token(request.headers.get('X-Admin-Token'))
+
+
+# ------------------------
+# Formula result cache
+# ------------------------
+@bp.route('/cache', methods=['GET'])
+def cache_stats():
+    """
+    Formula Cache Statistics
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        type: string
+        required: false
+    responses:
+      200:
+        description: Cache settings and hit, miss and eviction counters
+      403:
+        description: Missing or wrong admin token
+    """
+    return jsonify(current_cache().stats())
+
+
+@bp.route('/cache', methods=['DELETE'])
+def cache_clear():
+    """
+    Clear the Formula Cache
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        type: string
+        required: false
+    responses:
+      200:
+        description: Cache emptied; counters are kept
+      403:
+        description: Missing or wrong admin token
+    """
+    cache = current_cache()
+    cache.clear()
+    return jsonify(cache.stats())
+
+
+# ------------------------
+# Startup
+# ------------------------
+@bp.route('/startup', methods=['GET'])
+def startup_timings():
+    """
+    Startup Timings
+    ---
+    tags:
+      - Admin
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        type: string
+        required: false
+    responses:
+      200:
+        description: Milliseconds spent in each phase of create_app(), and the Swagger mode
+      403:
+        description: Missing or wrong admin token
+    """
+    return jsonify({
+        "timings_ms": current_app.config.get('STARTUP_TIMINGS', {}),
+        "swagger_mode": current_app.config['SWAGGER_MODE'],
+        "blueprints": sorted(bp.name for bp in current_app.blueprints.values()),
+    })
+
+
+# ------------------------
+# Sampling profiler
+# ------------------------
+def _profiles():
+    store = current_app.extensions.get('physicalc_profiles')
+    if store is None:
+        store = current_app.extensions['physicalc_profiles'] = ProfileStore(current_app.config['PROFILE_DIR'])
+    return store
+
+
+def _describe_profile(profile):
+    return dict(profile, links={"self": url_for('admin.profile_status', profile_id=profile["id"])})
+
+
+@bp.route('/profile', methods=['POST'])
+def profile_start():
+    """
+    Profile This Worker
+    ---
+    tags:
+      - Admin
+    description: >
+      Starts a statistical profiler in the worker that receives the request: every `interval`
+      seconds for `seconds` seconds it records the Python stack of each of the worker's threads.
+      Returns at once; fetch the collapsed stacks from the returned link when the profile finishes.
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        type: string
+        required: false
+      - name: seconds
+        in: query
+        type: number
+        default: 10
+        description: Sampling time, up to PROFILE_MAX_SECONDS
+      - name: interval
+        in: query
+        type: number
+        default: 0.01
+        description: Seconds between samples (at least 0.001)
+      - name: scope
+        in: query
+        type: string
+        enum: [app, all]
+        default: app
+        description: "app keeps only stacks running code of the app package; all keeps every thread"
+    responses:
+      202:
+        description: Profile started; Location points at its status and result
+      400:
+        description: Invalid seconds, interval or scope
+      403:
+        description: Missing or wrong admin token
+      409:
+        description: A profile is already running in this worker
+      429:
+        description: A profile was started less than PROFILE_COOLDOWN seconds ago; see Retry-After
+    """
+    limit = current_app.config['PROFILE_MAX_SECONDS']
+    try:
+        seconds = float(request.args.get('seconds', min(10.0, limit)))
+        interval = float(request.args.get('interval', 0.01))
+    except ValueError:
+        return handle_invalid_input_error("Invalid input: seconds and interval must be numbers")
+    if not 0 < seconds <= limit:
+        return handle_invalid_input_error(f"seconds must be greater than 0 and at most {limit}")
+    if not 0.001 <= interval <= seconds:
+        return handle_invalid_input_error("interval must be at least 0.001 and at most seconds")
+    scope = request.args.get('scope', 'app')
+    if scope not in ('app', 'all'):
+        return handle_invalid_input_error("scope must be 'app' or 'all'")
+
+    store = _profiles()
+    store.sweep(current_app.config['PROFILE_TTL'])
+    try:
+        profile = store.start(seconds, interval, current_app.config['PROFILE_MAX_STACKS'],
+                                    current_app.config['PROFILE_COOLDOWN'], scope)
+    except ProfileBusy as e:
+        return jsonify({"error": str(e)}), 409
+    except ProfileCooldown as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": str(e.retry_after)}
+    body = _describe_profile(profile)
+    return jsonify(body), 202, {"Location": body["links"]["self"]}
+
+
+@bp.route('/profile/<profile_id>', methods=['GET'])
+def profile_status(profile_id):
+    """
+    Profile Result
+    ---
+    tags:
+      - Admin
+    produces:
+      - text/plain
+      - application/json
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        type: string
+        required: false
+      - name: profile_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: >
+          Collapsed stacks ("frame;frame;frame count" per line, root first), ready for
+          flamegraph.pl or speedscope. X-Samples and X-Stacks give the totals.
+      202:
+        description: Still sampling; the body describes the profile
+      404:
+        description: No such profile
+      500:
+        description: The profile failed
+    """
+    store = _profiles()
+    profile = store.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "No such profile"}), 404
+    if profile["status"] == "running":
+        return jsonify(_describe_profile(profile)), 202, {"Retry-After": "1"}
+    if profile["status"] == "failed":
+        return jsonify(_describe_profile(profile)), 500
+    return Response(store.stacks(profile_id), mimetype='text/plain', headers={
+        "X-Samples": str(profile["samples"]),
+        "X-Stacks": str(profile["stacks"]),
+        "X-Truncated": "true" if profile["truncated"] else "false",
+    })
@@ -0,0 +1,171 @@
+from flask import Blueprint, request, jsonify
+from app.formulas.equations import EQUATIONS
+from app.formulas.symbolic import solve_for
+from app.utils import metrics
+from app.utils.batch import parse_batch_inputs, array_to_json
+from app.utils.error_handler import handle_invalid_input_error, handle_validation_error
+from app.utils.formula_routes import provided
+from app.utils.validator import compile_schema, ValidationError
+
+bp = Blueprint('equations', __name__, url_prefix='/api/equations')
+
+
+@bp.route('', methods=['GET'])
+def list_equations():
+    """
+    List Solvable Equations
+    ---
+    tags:
+      - Equations
+    responses:
+      200:
+        description: Every equation with its variables; POST all but one variable to /api/equations/<group>/<name>
+    """
+    return jsonify({"equations": [{
+        "group": equation.group,
+        "name": equation.name,
+        "title": equation.title,
+        "equation": equation.expression,
+        "variables": [
+            {"name": variable.name, "description": variable.description, "unit": variable.unit}
+            for variable in equation.variables
+        ],
+        "url": f"{bp.url_prefix}/{equation.group}/{equation.name}",
+    } for equation in EQUATIONS]})
+
+
+def _unknown(equation, present):
+    """The one variable left out of the request, or an error response."""
+    missing = [variable.name for variable in equation.variables if variable.name not in present]
+    if len(missing) != 1:
+        names = ", ".join(variable.name for variable in equation.variables)
+        return None, handle_invalid_input_error(f"Give all but one of {names}; the missing one is solved for")
+    return missing[0], None
+
+
+def solve_view(equation):
+    names = [variable.name for variable in equation.variables]
+    schema = compile_schema(names, names)  # Any of them may be the unknown
+
+    def view():
+        try:
+            values = schema.parse(request.json)
+        except ValidationError as e:
+            return handle_validation_error(e)
+        known = {name: value for name, value in zip(names, values) if value is not None}
+        unknown, error = _unknown(equation, known)
+        if error is not None:
+            return error
+        try:
+            solution = solve_for(equation.group, equation.name, unknown)
+        except ValueError as e:
+            return handle_invalid_input_error(str(e))
+        metrics.mark("validate")
+        try:
+            result, roots = solution(*known.values())
+        except ValueError as e:
+            return handle_invalid_input_error(str(e))
+        metrics.mark("compute")
+        return jsonify({
+            "formula": " OR ".join(solution.expressions),
+            "inputs": known,
+            "unknown": unknown,
+            "result": result,
+            "solutions": roots,
+        })
+
+    view.__name__ = f'{equation.group}_{equation.name}'
+    view.__doc__ = equation.title
+    view.specs_dict = solve_spec(equation)
+    return view
+
+
+def solve_batch_view(equation):
+    names = [variable.name for variable in equation.variables]
+
+    def view():
+        data = request.json
+        present = [name for name in names if provided(data, name)]
+        unknown, error = _unknown(equation, present)
+        if error is not None:
+            return error
+        columns, error = parse_batch_inputs(data, present)
+        if error is not None:
+            return error
+        try:
+            solution = solve_for(equation.group, equation.name, unknown)
+        except ValueError as e:
+            return handle_invalid_input_error(str(e))
+        metrics.mark("validate")
+        result = solution.pick(solution.roots(*(columns[name] for name in solution.inputs)))
+        metrics.mark("compute")
+        return jsonify({
+            "formula": " OR ".join(solution.expressions),
+            "unknown": unknown,
+            "count": int(result.size),
+            "result": array_to_json(result),
+        })
+
+    view.__name__ = f'{equation.group}_{equation.name}_batch'
+    view.__doc__ = f"{equation.title} for many inputs at once"
+    view.specs_dict = solve_batch_spec(equation)
+    return view
+
+
+# ------------------------
+# Swagger specs, generated from the equations
+# ------------------------
+def solve_spec(equation):
+    properties = {}
+    for variable in equation.variables:
+        properties[variable.name] = {"type": "number", "description": f"{variable.description} ({variable.unit})"}
+        if variable.example is not None:
+            properties[variable.name]["example"] = variable.example
+    description = (
+        f"Solves {equation.expression} for whichever variable is left out of the request. "
+        "The result is the smallest non-negative real root when there is one; every real root is in solutions."
+    )
+    if equation.description:
+        description += f" {equation.description}"
+    return {
+        "tags": ["Equations"],
+        "description": description,
+        "parameters": [{"name": "body", "in": "body", "required": True,
+                        "schema": {"type": "object", "properties": properties}}],
+        "responses": {
+            200: {"description": "Successful calculation", "schema": {"type": "object", "properties": {
+                "unknown": {"type": "string", "description": "The variable solved for"},
+                "result": {"type": "number"},
+                "solutions": {"type": "array", "items": {"type": "number"}},
+            }}},
+            400: {"description": "Invalid input, not exactly one variable missing, or no real solution"},
+        },
+    }
+
+
+def solve_batch_spec(equation):
+    return {
+        "tags": ["Equations"],
+        "description": (
+            f"Solves {equation.expression} for the left-out variable over many inputs in one vectorized pass. "
+            "Send an object of arrays (scalars broadcast) or a list of input objects. "
+            "Rows without a real solution are null."
+        ),
+        "parameters": [{"name": "body", "in": "body", "required": True, "schema": {"type": "object"}}],
+        "responses": {
+            200: {"description": "Successful calculation"},
+            400: {"description": "Invalid input or not exactly one variable missing"},
+        },
+    }
+
+
+def register_equation_routes(bp, equations):
+    """Adds a solve route (/<group>/<name>) and a batch route (/<group>/<name>/batch) for every equation."""
+    for equation in equations:
+        endpoint = f'{equation.group}_{equation.name}'
+        bp.add_url_rule(f'/{equation.group}/{equation.name}', endpoint, solve_view(equation), methods=['POST'])
+        bp.add_url_rule(f'/{equation.group}/{equation.name}/batch', f'{endpoint}_batch', solve_batch_view(equation),
+                        methods=['POST'])
+
+
+register_equation_routes(bp, EQUATIONS)
@@ -0,0 +1,270 @@
+import numpy as np
+from flask import Blueprint, current_app, request, jsonify, url_for
+from app.formulas.expression import FUNCTIONS, ExpressionError
+from app.utils import metrics
+from app.utils.batch import parse_batch_inputs, array_to_json
+from app.utils.error_handler import handle_invalid_input_error, handle_missing_input_error, handle_validation_error
+from app.utils.error_handler import handle_zero_division_error
+from app.utils.expressions import ExpressionStore, ExpressionStoreFull
+from app.utils.formula_routes import evaluate, evaluate_columns
+from app.utils.validator import ValidationError
+
+bp = Blueprint('expressions', __name__, url_prefix='/api/expressions')
+
+MAX_PAGE = 1000  # Formulas listed per request
+
+
+def _store():
+    """The app's expression store, created on first use."""
+    store = current_app.extensions.get('physicalc_expressions')
+    if store is None:
+        store = current_app.extensions['physicalc_expressions'] = ExpressionStore(
+            current_app.config['EXPRESSIONS_DIR'], maxsize=current_app.config['EXPRESSIONS_CACHE_SIZE'],
+            max_definitions=current_app.config['EXPRESSIONS_MAX'],
+        )
+    return store
+
+
+def _describe(definition):
+    return dict(definition, links={
+        "self": url_for('expressions.evaluate_expression', expression_id=definition['id']),
+        "batch": url_for('expressions.evaluate_expression_batch', expression_id=definition['id']),
+    })
+
+
+def _not_found(expression_id):
+    return jsonify({"error": f"No expression {expression_id}"}), 404
+
+
+# ------------------------
+# Defining and listing formulas
+# ------------------------
+@bp.route('', methods=['POST'])
+def define_expression():
+    """
+    Define a Formula
+    ---
+    tags:
+      - Expressions
+    description: >
+      Compiles an arithmetic expression over named variables and stores it under an id; evaluate it
+      afterwards at the returned links like any built-in formula. Allowed are numbers, variables, pi,
+      + - * / and ^ (or **), parentheses and the functions abs, acos, asin, atan, atan2, cos, cosh,
+      degrees, exp, hypot, log, log10, max, min, radians, sin, sinh, sqrt, tan and tanh.
+      Variables are the inputs, in order of first appearance. Defining the same formula again returns the same id.
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - expression
+          properties:
+            expression:
+              type: string
+              example: "m * g * h + m * v^2 / 2"
+            title:
+              type: string
+              example: Mechanical energy
+            description:
+              type: string
+            units:
+              type: object
+              description: Unit of each variable
+              example: {"m": "kg", "g": "m/s^2", "h": "m", "v": "m/s"}
+    responses:
+      201:
+        description: Formula compiled and stored; Location points at its scalar route
+      200:
+        description: The identical formula was already defined
+      400:
+        description: The expression is not valid (the error gives the position), or invalid metadata
+      507:
+        description: EXPRESSIONS_MAX formulas are already defined
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'expression' not in data:
+        return handle_missing_input_error(['expression'])
+    try:
+        definition, created = _store().define(
+            data['expression'], data.get('title'), data.get('description'), data.get('units'),
+        )
+    except ExpressionError as e:
+        return handle_invalid_input_error(str(e))
+    except ExpressionStoreFull as e:
+        return jsonify({"error": str(e)}), 507
+    response = jsonify(_describe(definition))
+    if created:
+        response.status_code = 201
+    response.headers['Location'] = url_for('expressions.evaluate_expression', expression_id=definition['id'])
+    return response
+
+
+@bp.route('', methods=['GET'])
+def list_expressions():
+    """
+    List Formulas
+    ---
+    tags:
+      - Expressions
+    parameters:
+      - name: offset
+        in: query
+        type: integer
+        default: 0
+        description: Formulas to skip, oldest first
+      - name: limit
+        in: query
+        type: integer
+        default: 100
+        description: Formulas to return, at most 1000
+    responses:
+      200:
+        description: >
+          One page of the defined formulas with their total and a link to the next page, the allowed
+          functions and this worker's compiled-formula cache counters
+      400:
+        description: Invalid offset or limit
+    """
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        return handle_invalid_input_error("Invalid input: offset and limit must be integers")
+    if offset < 0 or not 1 <= limit <= MAX_PAGE:
+        return handle_invalid_input_error(f"offset must be at least 0 and limit between 1 and {MAX_PAGE}")
+
+    store = _store()
+    definitions, total = store.list(offset, limit)
+    links = {}
+    if offset + limit < total:
+        links["next"] = url_for('expressions.list_expressions', offset=offset + limit, limit=limit)
+    return jsonify({
+        "expressions": [_describe(definition) for definition in definitions],
+        "total": total,
+        "links": links,
+        "functions": sorted(FUNCTIONS),
+        "cache": store.stats(),
+    })
+
+
+@bp.route('/<expression_id>', methods=['GET'])
+def describe_expression(expression_id):
+    """
+    Describe a Formula
+    ---
+    tags:
+      - Expressions
+    parameters:
+      - name: expression_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: The normalized expression, its variables and units, and links to evaluate it
+      404:
+        description: Unknown formula
+    """
+    definition = _store().get(expression_id)
+    if definition is None:
+        return _not_found(expression_id)
+    return jsonify(_describe(definition))
+
+
+# ------------------------
+# Evaluating formulas
+# ------------------------
+@bp.route('/<expression_id>', methods=['POST'])
+def evaluate_expression(expression_id):
+    """
+    Evaluate a Formula
+    ---
+    tags:
+      - Expressions
+    description: Evaluates a defined formula for one set of inputs, validated and cached like the built-in formulas.
+    parameters:
+      - name: expression_id
+        in: path
+        type: string
+        required: true
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          description: A value for every variable
+          example: {"m": 2, "g": 9.8, "h": 10, "v": 3}
+    responses:
+      200:
+        description: Successful calculation
+      400:
+        description: Missing or invalid inputs, division by zero, or no real result
+      404:
+        description: Unknown formula
+    """
+    compiled = _store().compiled(expression_id)
+    if compiled is None:
+        return _not_found(expression_id)
+    try:
+        values = compiled.schema.parse(request.json)
+    except ValidationError as e:
+        return handle_validation_error(e)
+    metrics.mark("validate")
+    try:
+        body = evaluate(compiled.formula, values)
+    except ZeroDivisionError:
+        return handle_zero_division_error("Division by zero")
+    except (ValueError, TypeError) as e:
+        return handle_invalid_input_error(str(e))
+    metrics.mark("compute")
+    return jsonify(body)
+
+
+@bp.route('/<expression_id>/batch', methods=['POST'])
+def evaluate_expression_batch(expression_id):
+    """
+    Evaluate a Formula for Many Inputs
+    ---
+    tags:
+      - Expressions
+    description: >
+      Evaluates a defined formula over many inputs in one vectorized pass. Send an object of arrays
+      (scalars broadcast) or a list of input objects. Rows without a finite result are null.
+    parameters:
+      - name: expression_id
+        in: path
+        type: string
+        required: true
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          example: {"m": [1, 2, 3], "g": 9.8, "h": 10, "v": [0, 1, 2]}
+    responses:
+      200:
+        description: Successful calculation
+      400:
+        description: Missing or invalid inputs
+      404:
+        description: Unknown formula
+    """
+    compiled = _store().compiled(expression_id)
+    if compiled is None:
+        return _not_found(expression_id)
+    columns, error = parse_batch_inputs(request.json, compiled.schema.fields)
+    if error is not None:
+        return error
+    metrics.mark("validate")
+    try:
+        result, = evaluate_columns(compiled.batch_formula, columns, {})
+    except (ValueError, TypeError) as e:
+        return handle_invalid_input_error(str(e))
+    metrics.mark("compute")
+    return jsonify({
+        "formula": compiled.formula.expression,
+        "count": int(np.size(result)),
+        "result": array_to_json(result),
+    })
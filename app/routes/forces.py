@@ -1,144 +1,60 @@
+import numpy as np
 from flask import Blueprint, request, jsonify
-from app.formulas.forces import (
-    compute_normal_force,
-    compute_frictional_force,
-    compute_tension_force,
-    compute_applied_force,
-    compute_gravitational_force,
-    compute_electromagnetic_force
-)
-from app.utils.validator import validate_inputs
-from app.utils.error_handler import handle_invalid_input_error, handle_missing_input_error, handle_zero_division_error, handle_generic_error
+from app.formulas.coulomb import compute_coulomb_forces
+from app.formulas.nbody import compute_nbody_forces, nbody_method, NBODY_METHODS
+from app.formulas.registry import formulas_for
+from app.utils.batch import array_to_json
+from app.utils import metrics
+from app.utils.error_handler import handle_invalid_input_error, handle_missing_input_error
+from app.utils.formula_routes import register_formula_routes
 
 bp = Blueprint('forces', __name__, url_prefix='/api/forces')
 
+# Scalar, batch and file routes for every formula declared in app/formulas/registry.py
+register_formula_routes(bp, formulas_for('forces'))
 
-# ------------------------
-# Normal Force: N = mg
-# ------------------------
-@bp.route('/normal', methods=['POST'])
-def normal():
-    """
-    Calculate Normal Force (N)
-    ---
-    tags:
-      - Forces
-    parameters:
-      - name: body
-        in: body
-        required: true
-        schema:
-          type: object
-          required:
-            - mass
-          properties:
-            mass:
-              type: number
-              description: Mass (kg)
-              example: 10
-    responses:
-      200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Normal Force (Newtons)
-      400:
-        description: Invalid input
-    """
-    data = request.json
-    required = ['mass']
-
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
 
+def _arrays(data, names):
+    """Converts the named JSON lists to float arrays; shapes are checked by the formula."""
     try:
-        mass = float(data['mass'])
-        result = compute_normal_force(mass)
-    except (ValueError, TypeError) as e:
-        return handle_invalid_input_error(str(e))
-    
-    return jsonify({
-        "formula": "N = mg",
-        "inputs": {"mass": mass},
-        "result": result
-    })
+        return [np.asarray(data[name], dtype=np.float64) for name in names]
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid input: {' and '.join(names)} must be numbers")
 
 
 # ------------------------
-# Frictional Force: F_f = μN
+# N-body gravity: net force on every body of a system
 # ------------------------
-@bp.route('/friction', methods=['POST'])
-def friction():
-    """
-    Calculate Frictional Force (F_f)
-    ---
-    tags:
-      - Forces
-    parameters:
-      - name: body
-        in: body
-        required: true
-        schema:
-          type: object
-          required:
-            - mu
-            - normal_force
-          properties:
-            mu:
-              type: number
-              description: Coefficient of Friction (μ)
-              example: 0.5
-            normal_force:
-              type: number
-              description: Normal Force (N)
-              example: 98
-    responses:
-      200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Frictional Force (Newtons)
-      400:
-        description: Invalid input
-    """
-    data = request.json
-    required = ['mu', 'normal_force']
+NBODY_FORMULA = "F_i = Σ_j G * m_i * m_j * (r_j - r_i) / (|r_j - r_i|^2 + ε^2)^1.5"
 
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
 
-    try:
-        mu = float(data['mu'])
-        normal_force = float(data['normal_force'])
-        result = compute_frictional_force(mu, normal_force)
-    except (ValueError, TypeError) as e:
-        return handle_invalid_input_error(str(e))
-    
-    return jsonify({
-        "formula": "F_f = μN",
-        "inputs": {"mu": mu, "normal_force": normal_force},
-        "result": result
-    })
+def _nbody_options(data):
+    """Reads the optional method, opening angle and softening length from the request body."""
+    method = data.get('method', 'auto')
+    if method not in NBODY_METHODS:
+        raise ValueError(f"method must be one of {', '.join(NBODY_METHODS)}")
+    options = {}
+    for name, default in (('theta', 0.7), ('softening', 0.0)):
+        value = data.get(name, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{name} must be a number")
+        options[name] = float(value)
+    return method, options
 
 
-# ------------------------
-# Tension Force: T = mg
-# ------------------------
-@bp.route('/tension', methods=['POST'])
-def tension():
+@bp.route('/nbody', methods=['POST'])
+def nbody_route():
     """
-    Calculate Tension Force (T)
+    Net Gravitational Force on Every Body of a System
     ---
     tags:
       - Forces
+    description: >
+      Returns the net force vector on each body. "exact" sums every pair;
+      "barnes_hut" groups distant bodies in an octree (O(N log N)), with the opening
+      angle theta trading accuracy for speed. "auto" (default) uses exact sums up to
+      2000 bodies. Positions may be 2D or 3D. At most 100000 bodies, and 5000 with "exact";
+      bodies packed too closely for the octree to separate are refused rather than summed pair by pair.
     parameters:
       - name: body
         in: body
@@ -146,176 +62,95 @@ def tension():
         schema:
           type: object
           required:
-            - mass
+            - masses
+            - positions
           properties:
-            mass:
-              type: number
-              description: Mass (kg)
-              example: 5
+            masses:
+              type: array
+              items:
+                type: number
+              description: Masses (kg)
+              example: [5.97e24, 7.35e22]
+            positions:
+              type: array
+              items:
+                type: array
+                items:
+                  type: number
+              description: Positions (m), one [x, y, z] per mass
+              example: [[0, 0, 0], [3.84e8, 0, 0]]
+            method:
+              type: string
+              enum: [auto, barnes_hut, exact]
+            theta:
+              type: number
+              description: Barnes–Hut opening angle, in (0, 1] (default 0.7)
+              example: 0.7
+            softening:
+              type: number
+              description: Softening length ε (m) for close encounters (default 0)
+              example: 0
     responses:
       200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Tension Force (Newtons)
+        description: Net force (N) on each body, in input order
       400:
-        description: Invalid input
+        description: Invalid input or Missing Fields
     """
     data = request.json
-    required = ['mass']
-
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
+    if not isinstance(data, dict):
+        return handle_invalid_input_error("Invalid input: request body must be an object")
+    missing = [name for name in ('masses', 'positions') if name not in data]
+    if missing:
+        return handle_missing_input_error(missing)
 
     try:
-        mass = float(data['mass'])
-        result = compute_tension_force(mass)
-    except (ValueError, TypeError) as e:
+        method, options = _nbody_options(data)
+        masses, positions = _arrays(data, ('masses', 'positions'))
+        metrics.mark("validate")
+        forces = compute_nbody_forces(masses, positions, method=method, **options)
+    except ValueError as e:
         return handle_invalid_input_error(str(e))
-    
-    return jsonify({
-        "formula": "T = mg",
-        "inputs": {"mass": mass},
-        "result": result
-    })
-
-
-# ------------------------
-# Applied Force: F = Applied force
-# ------------------------
-@bp.route('/applied', methods=['POST'])
-def applied():
-    """
-    Return Applied Force
-    ---
-    tags:
-      - Forces
-    parameters:
-      - name: body
-        in: body
-        required: true
-        schema:
-          type: object
-          required:
-            - force
-          properties:
-            force:
-              type: number
-              description: The applied force value
-              example: 150
-    responses:
-      200:
-        description: Successful return
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Applied Force (Newtons)
-      400:
-        description: Invalid input
-    """
-    data = request.json
-    required = ['force']
+    metrics.mark("compute")
 
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
-
-    try:
-        force = float(data['force'])
-        result = compute_applied_force(force)
-    except (ValueError, TypeError) as e:
-        return handle_invalid_input_error(str(e))
-    
     return jsonify({
-        "formula": "F = Applied force",
-        "inputs": {"force": force},
-        "result": result
+        "formula": NBODY_FORMULA,
+        "count": int(masses.size),
+        "inputs": {"method": nbody_method(method, masses.size), **options},
+        "result": array_to_json(forces),
     })
 
 
 # ------------------------
-# Gravitational Force: F = G * (m1 * m2) / r^2
+# Many point charges: net Coulomb force on each charge and total energy
 # ------------------------
-@bp.route('/gravitational', methods=['POST'])
-def gravitational():
-    """
-    Calculate Gravitational Force
-    ---
-    tags:
-      - Forces
-    parameters:
-      - name: body
-        in: body
-        required: true
-        schema:
-          type: object
-          required:
-            - m1
-            - m2
-            - r
-          properties:
-            m1:
-              type: number
-              description: Mass 1 (kg)
-              example: 5.972e24
-            m2:
-              type: number
-              description: Mass 2 (kg)
-              example: 7.348e22
-            r:
-              type: number
-              description: Distance (m)
-              example: 384400000
-    responses:
-      200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Gravitational Force (Newtons)
-      400:
-        description: Invalid input
-    """
-    data = request.json
-    required = ['m1', 'm2', 'r']
+COULOMB_FORMULA = "F_i = k_e * q_i * Σ_j q_j * (r_i - r_j) / |r_i - r_j|^3, U = k_e * Σ_(i<j) q_i * q_j / |r_i - r_j|"
 
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
 
-    try:
-        m1 = float(data['m1'])
-        m2 = float(data['m2'])
-        r = float(data['r'])
-        result = compute_gravitational_force(m1, m2, r)
-    except (ValueError, TypeError) as e:
-        return handle_invalid_input_error(str(e))
-    
-    return jsonify({
-        "formula": "F = G * (m1 * m2) / r^2",
-        "inputs": {"m1": m1, "m2": m2, "r": r},
-        "result": result
-    })
+def _coulomb_options(data):
+    """Reads the optional cutoff radius and softening length from the request body."""
+    options = {}
+    for name, default in (('cutoff', None), ('softening', 0.0)):
+        value = data.get(name, default)
+        if value is not None:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"{name} must be a number")
+            value = float(value)
+        options[name] = value
+    return options
 
 
-# ------------------------
-# Electromagnetic Force: F = k_e * (q1 * q2) / r^2
-# ------------------------
-@bp.route('/electromagnetic', methods=['POST'])
-def electromagnetic():
+@bp.route('/coulomb', methods=['POST'])
+def coulomb_route():
     """
-    Calculate Electromagnetic Force
+    Net Electrostatic Force on Many Point Charges
     ---
     tags:
       - Forces
+    description: >
+      Returns the net Coulomb force on each charge and the total potential energy.
+      Without a cutoff every pair is summed exactly, for up to 5000 charges. With a cutoff
+      radius only pairs closer than it interact, found with a k-d tree, for up to 100000
+      charges and 2000000 interacting pairs. Positions may be 2D or 3D.
     parameters:
       - name: body
         in: body
@@ -323,51 +158,59 @@ def electromagnetic():
         schema:
           type: object
           required:
-            - q1
-            - q2
-            - r
+            - charges
+            - positions
           properties:
-            q1:
-              type: number
-              description: Charge 1 (Coulombs)
-              example: 1.602e-19
-            q2:
-              type: number
-              description: Charge 2 (Coulombs)
-              example: -1.602e-19
-            r:
-              type: number
-              description: Distance (m)
-              example: 5.29e-11
+            charges:
+              type: array
+              items:
+                type: number
+              description: Charges (C)
+              example: [1.0e-6, -2.0e-6, 1.0e-6]
+            positions:
+              type: array
+              items:
+                type: array
+                items:
+                  type: number
+              description: Positions (m), one [x, y, z] per charge
+              example: [[0, 0, 0], [0.1, 0, 0], [0, 0.1, 0]]
+            cutoff:
+              type: number
+              description: Interaction radius (m); omit for the exact all-pairs sum
+            softening:
+              type: number
+              description: Softening length ε (m) for coincident or very close charges (default 0)
+              example: 0
     responses:
       200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Electromagnetic Force (Newtons)
+        description: Force (N) on each charge in input order, total energy (J) and number of interacting pairs
       400:
-        description: Invalid input
+        description: Invalid input or Missing Fields
     """
     data = request.json
-    required = ['q1', 'q2', 'r']
-
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
+    if not isinstance(data, dict):
+        return handle_invalid_input_error("Invalid input: request body must be an object")
+    missing = [name for name in ('charges', 'positions') if name not in data]
+    if missing:
+        return handle_missing_input_error(missing)
 
     try:
-        q1 = float(data['q1'])
-        q2 = float(data['q2'])
-        r = float(data['r'])
-        result = compute_electromagnetic_force(q1, q2, r)
-    except (ValueError, TypeError) as e:
+        options = _coulomb_options(data)
+        charges, positions = _arrays(data, ('charges', 'positions'))
+        metrics.mark("validate")
+        result = compute_coulomb_forces(charges, positions, **options)
+    except ValueError as e:
         return handle_invalid_input_error(str(e))
-    
+    metrics.mark("compute")
+
     return jsonify({
-        "formula": "F = k_e * (q1 * q2) / r^2",
-        "inputs": {"q1": q1, "q2": q2, "r": r},
-        "result": result
-    })
\ No newline at end of file
+        "formula": COULOMB_FORMULA,
+        "count": int(charges.size),
+        "inputs": options,
+        "result": {
+            "forces": array_to_json(result["forces"]),
+            "energy": result["energy"],
+            "pairs": result["pairs"],
+        },
+    })
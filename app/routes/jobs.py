@@ -0,0 +1,309 @@
+import json
+import time
+
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context, url_for
+from werkzeug.exceptions import HTTPException
+from app.utils.error_handler import handle_invalid_input_error, handle_missing_input_error
+from app.utils.jobs import ACTIVE, JobRunner, JobStore
+
+bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+# Blueprints whose POST endpoints cannot be run as jobs
+EXCLUDED_BLUEPRINTS = ("jobs", "admin")
+# Settings a job's app does not take over from the app that submitted it
+JOB_CONFIG_OVERRIDES = {"SWAGGER_MODE": "off", "TRACE_ENABLED": False, "SIMULATION_MAX_WORK": None}
+EVENT_INTERVAL = 0.2  # Seconds between progress polls in /events
+
+
+def _runner():
+    """The app's job runner, created on first use so workers that never see a job skip it."""
+    runner = current_app.extensions.get('physicalc_jobs')
+    if runner is None:
+        runner = current_app.extensions['physicalc_jobs'] = JobRunner(
+            JobStore(current_app.config['JOBS_DIR']),
+            concurrency=current_app.config['JOBS_MAX_CONCURRENT'],
+            cpu_limit=current_app.config['JOBS_CPU_LIMIT'],
+            nice=current_app.config['JOBS_NICE'],
+        )
+    return runner
+
+
+def _blueprint_for(endpoint):
+    """Name of the blueprint serving POST `endpoint`, or raises ValueError."""
+    if not isinstance(endpoint, str) or not endpoint.startswith('/api/'):
+        raise ValueError("endpoint must be an /api/ path, e.g. /api/forces/nbody")
+    try:
+        view, _ = current_app.url_map.bind('localhost').match(endpoint, method='POST')
+    except HTTPException:
+        raise ValueError(f"No POST endpoint at {endpoint}")
+    blueprint = view.partition('.')[0]
+    if blueprint in EXCLUDED_BLUEPRINTS:
+        raise ValueError(f"{endpoint} cannot be run as a job")
+    return blueprint
+
+
+def job_config():
+    """
+    The submitting app's settings (directories, caches, limits) for the job's
+    own app, so a job sees the same formulas, cache and metrics as a direct request.
+    """
+    from app import DEFAULT_CONFIG  # app imports this module
+
+    config = {name: current_app.config[name] for name in DEFAULT_CONFIG if name in current_app.config}
+    config.update(JOB_CONFIG_OVERRIDES)
+    return config
+
+
+def run_endpoint(endpoint, body, blueprint, config, progress):
+    """
+    Job target: serves one request to `endpoint` from an app holding only its
+    blueprint (built from `config`, see job_config()), and streams the response
+    body into the result. Streams that announce X-Frame-Count (simulations)
+    report progress per NDJSON line.
+    """
+    from app import create_app  # Imported in the job process; app imports this module
+
+    app = create_app(dict(config, BLUEPRINTS=blueprint))
+    response = app.test_client().post(endpoint, json=body, buffered=False)
+    if response.status_code != 200:
+        error = (response.get_json(silent=True) or {}).get('error')
+        response.close()
+        raise ValueError(error or response.status)
+    frames = response.headers.get('X-Frame-Count')
+    total = int(frames) if frames and response.mimetype == 'application/x-ndjson' else None
+    return response.mimetype, _chunks(response, total, progress)
+
+
+def _chunks(response, total, progress):
+    lines = 0
+    try:
+        for chunk in response.iter_encoded():
+            if total:
+                lines += chunk.count(b"\n")
+                progress(min(lines / total, 1.0))
+            yield chunk
+    finally:
+        response.close()
+
+
+def _describe(job):
+    job = dict(job)
+    job.pop('pid', None)
+    job['links'] = {
+        "self": url_for('jobs.job_status', job_id=job['id']),
+        "result": url_for('jobs.job_result', job_id=job['id']),
+        "events": url_for('jobs.job_events', job_id=job['id']),
+    }
+    return job
+
+
+def _not_found(job_id):
+    return jsonify({"error": f"No job {job_id}"}), 404
+
+
+# ------------------------
+# Submitting and listing jobs
+# ------------------------
+@bp.route('', methods=['POST'])
+def submit_job():
+    """
+    Submit a Job
+    ---
+    tags:
+      - Jobs
+    description: >
+      Runs the POST request {endpoint, body} in a separate, lower-priority
+      process and returns at once. Any computational /api endpoint can be used,
+      e.g. /api/forces/nbody, /api/simulation/run or a /batch route.
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - endpoint
+          properties:
+            endpoint:
+              type: string
+              example: /api/forces/nbody
+            body:
+              type: object
+              description: JSON body for the endpoint
+    responses:
+      202:
+        description: Job queued; poll the Location header or stream its events
+      400:
+        description: Missing or invalid endpoint
+      429:
+        description: Too many jobs are already pending
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or 'endpoint' not in data:
+        return handle_missing_input_error(['endpoint'])
+    body = data.get('body', {})
+    try:
+        blueprint = _blueprint_for(data['endpoint'])
+        if not isinstance(body, (dict, list)):
+            raise ValueError("body must be a JSON object")
+    except ValueError as e:
+        return handle_invalid_input_error(str(e))
+
+    runner = _runner()
+    runner.store.sweep(current_app.config['JOBS_TTL'])
+    pending = sum(job['status'] in ACTIVE for job in runner.store.jobs())
+    if pending >= current_app.config['JOBS_MAX_PENDING']:
+        return jsonify({"error": f"Too many pending jobs ({pending}); try again later"}), 429
+
+    job = runner.submit(data['endpoint'], run_endpoint, (data['endpoint'], body, blueprint, job_config()))
+    response = jsonify(_describe(job))
+    response.status_code = 202
+    response.headers['Location'] = url_for('jobs.job_status', job_id=job['id'])
+    return response
+
+
+@bp.route('', methods=['GET'])
+def list_jobs():
+    """
+    List Jobs
+    ---
+    tags:
+      - Jobs
+    responses:
+      200:
+        description: Every job that has not yet expired, oldest first
+    """
+    store = _runner().store
+    store.sweep(current_app.config['JOBS_TTL'])
+    return jsonify({"jobs": [_describe(job) for job in store.jobs()]})
+
+
+# ------------------------
+# Following a job
+# ------------------------
+@bp.route('/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """
+    Job Status
+    ---
+    tags:
+      - Jobs
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: Status (queued, running, succeeded, failed or cancelled), progress, timestamps and error
+      404:
+        description: Unknown or expired job
+    """
+    job = _runner().store.get(job_id)
+    if job is None:
+        return _not_found(job_id)
+    return jsonify(_describe(job))
+
+
+@bp.route('/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """
+    Job Result
+    ---
+    tags:
+      - Jobs
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: The endpoint's response body, with its original content type
+      404:
+        description: Unknown or expired job
+      409:
+        description: The job has not succeeded (yet); the body gives its status and error
+    """
+    store = _runner().store
+    job = store.get(job_id)
+    if job is None:
+        return _not_found(job_id)
+    if job['status'] != 'succeeded':
+        return jsonify({"error": f"Job is {job['status']}", "status": job['status'], "job_error": job['error']}), 409
+    return send_file(store.result_path(job_id), mimetype=job['mimetype'])
+
+
+@bp.route('/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Job Progress Events
+    ---
+    tags:
+      - Jobs
+    produces:
+      - text/event-stream
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: >
+          Server-sent "progress" events with the job status whenever it changes,
+          then one "end" event once the job has finished
+      404:
+        description: Unknown or expired job
+    """
+    store = _runner().store
+    job = store.get(job_id)
+    if job is None:
+        return _not_found(job_id)
+
+    def events(job):
+        previous = None
+        while job is not None:
+            state = (job['status'], job['progress'])
+            if state != previous:
+                previous = state
+                yield f"event: progress\ndata: {json.dumps(_describe(job))}\n\n"
+            if job['status'] not in ACTIVE:
+                break
+            time.sleep(EVENT_INTERVAL)
+            job = store.get(job_id)
+        yield "event: end\ndata: {}\n\n"
+
+    # url_for needs the request context while the stream is produced
+    return Response(
+        stream_with_context(events(job)), mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@bp.route('/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """
+    Cancel or Delete a Job
+    ---
+    tags:
+      - Jobs
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+    responses:
+      200:
+        description: An active job is cancelled (its process is stopped); a finished one is deleted with its result
+      404:
+        description: Unknown or expired job
+    """
+    store = _runner().store
+    job = store.get(job_id)
+    if job is None:
+        return _not_found(job_id)
+    if job['status'] in ACTIVE:
+        return jsonify(_describe(store.cancel(job_id)))
+    store.delete(job_id)
+    return jsonify({"deleted": job_id})
@@ -0,0 +1,46 @@
+from flask import Blueprint, Response, current_app, request, jsonify
+from app.utils import auth
+from app.utils.metrics import gather_text
+
+bp = Blueprint('metrics', __name__)
+
+
+@bp.before_request
+def require_admin_token():
+    """Like the admin routes, /metrics needs the admin token (and is off without one); scrapers can send it as a bearer token."""
+    return auth.require_admin_token(request.headers.get('X-Admin-Token'), _bearer())
+
+
+def _bearer():
+    scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+    return credentials if scheme.lower() == 'bearer' else None
+
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus Metrics
+    ---
+    tags:
+      - Admin
+    produces:
+      - text/plain
+    parameters:
+      - name: X-Admin-Token
+        in: header
+        type: string
+        required: false
+    responses:
+      200:
+        description: >
+          Request counts, latency histograms (total and per phase: validate, compute, serialize),
+          CPU seconds per blueprint and error counts, summed over every worker sharing METRICS_DIR
+      403:
+        description: Missing or wrong admin token
+      404:
+        description: Metrics are disabled (METRICS_ENABLED=false)
+    """
+    text = gather_text(current_app)
+    if text is None:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(text, mimetype='text/plain', content_type='text/plain; version=0.0.4; charset=utf-8')
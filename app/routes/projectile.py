@@ -1,26 +1,56 @@
-from flask import Blueprint, request, jsonify
-from app.formulas.projectile import compute_range, compute_time_of_flight, compute_max_height
-from app.utils.validator import validate_inputs
-from app.utils.error_handler import (
-    handle_invalid_input_error,
-    handle_missing_input_error,
-    handle_zero_division_error,
-    handle_generic_error,
-)
+from flask import Blueprint, Response, request, jsonify
+from app.formulas.projectile import sample_trajectory
+from app.formulas.drag import simulate_drag, DRAG_MODELS, MAX_BATCH, MIN_TOL
+from app.formulas.registry import formulas_for
+from app.utils.validator import compile_schema, ValidationError
+from app.utils.cache import current_cache
+from app.utils.batch import parse_batch_inputs, array_to_json
+from app.utils import metrics
+from app.utils.error_handler import handle_invalid_input_error, handle_validation_error
+from app.utils.formula_routes import register_formula_routes
 
 bp = Blueprint('projectile', __name__, url_prefix='/api/projectile')
 
+# Range, time of flight and maximum height: generated from app/formulas/registry.py
+register_formula_routes(bp, formulas_for('projectile'))
+
 
 # ------------------------
-# Horizontal Range: R = (u^2 * sin(2θ)) / g
+# Trajectory: (t, x, y, vx, vy) sampled from launch to landing
 # ------------------------
-@bp.route('/range', methods=['POST'])
-def range_route():
+DEFAULT_TRAJECTORY_SAMPLES = 100
+MAX_TRAJECTORY_SAMPLES = 1_000_000
+TRAJECTORY_COLUMNS = ('t', 'x', 'y', 'vx', 'vy')
+TRAJECTORY_SCHEMA = compile_schema(['u', 'angle'])
+
+
+def _ndjson_chunks(chunks):
+    """Encodes each sampled chunk as newline-delimited JSON objects."""
+    for chunk in chunks:
+        yield ''.join(
+            f'{{"t":{t!r},"x":{x!r},"y":{y!r},"vx":{vx!r},"vy":{vy!r}}}\n'
+            for t, x, y, vx, vy in chunk.tolist()
+        )
+
+
+def _binary_chunks(chunks):
+    """Encodes each sampled chunk as little-endian float64 rows of (t, x, y, vx, vy)."""
+    for chunk in chunks:
+        yield chunk.astype('<f8', copy=False).tobytes()
+
+
+@bp.route('/trajectory', methods=['POST'])
+def trajectory_route():
     """
-    Calculate Horizontal Range (R)
+    Sample the Projectile Trajectory
     ---
     tags:
       - Projectile Motion
+    description: >
+      Streams evenly spaced samples (t, x, y, vx, vy) from launch to landing.
+      The default format is NDJSON (one JSON object per line). Send "format": "binary"
+      or an Accept header of application/octet-stream to get packed little-endian
+      float64 rows of five values instead.
     parameters:
       - name: body
         in: body
@@ -37,53 +67,86 @@ def range_route():
               example: 20
             angle:
               type: number
-              description: Angle of projection (degrees)
+              description: Angle of projection (degrees), greater than 0 and at most 90
               example: 45
+            samples:
+              type: integer
+              description: Number of sampled points (max 1,000,000)
+              example: 100
+            format:
+              type: string
+              enum: [ndjson, binary]
+              description: Response encoding
     responses:
       200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Range (meters)
+        description: Streamed trajectory samples
       400:
         description: Invalid input
     """
     data = request.json
-    required = ['u', 'angle']
-
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
+    try:
+        u, angle = TRAJECTORY_SCHEMA.parse(data)
+    except ValidationError as e:
+        return handle_validation_error(e)
+    if not 0 < angle <= 90:
+        # Other angles never leave the ground: the flight time is zero or negative
+        return handle_invalid_input_error("angle must be greater than 0 and at most 90 degrees")
 
     try:
-        u = float(data['u'])
-        angle = float(data['angle'])
-        result = compute_range(u, angle)
-    except (ValueError, TypeError):
-        return handle_invalid_input_error("Inputs must be numbers")
-    except Exception as e:
-        return handle_generic_error(str(e))
+        samples = data.get('samples', DEFAULT_TRAJECTORY_SAMPLES)
+        if isinstance(samples, bool) or int(samples) != samples:
+            raise ValueError
+        samples = int(samples)
+    except (ValueError, TypeError, OverflowError):
+        return handle_invalid_input_error("Invalid input: samples must be an integer")
+
+    if not 1 <= samples <= MAX_TRAJECTORY_SAMPLES:
+        return handle_invalid_input_error(f"samples must be between 1 and {MAX_TRAJECTORY_SAMPLES}")
+
+    output = data.get('format')
+    if output is None:
+        output = 'binary' if request.accept_mimetypes.best == 'application/octet-stream' else 'ndjson'
+    if output not in ('ndjson', 'binary'):
+        return handle_invalid_input_error("format must be 'ndjson' or 'binary'")
+
+    chunks = sample_trajectory(u, angle, samples)
+    headers = {"X-Sample-Count": str(samples), "X-Columns": ",".join(TRAJECTORY_COLUMNS)}
+    if output == 'binary':
+        return Response(_binary_chunks(chunks), mimetype='application/octet-stream', headers=headers)
+    return Response(_ndjson_chunks(chunks), mimetype='application/x-ndjson', headers=headers)
 
-    return jsonify({
-        "formula": "R = (u^2 * sin(2θ)) / g",
-        "inputs": {"u": u, "angle": angle},
-        "result": result
-    })
 
 
 # ------------------------
-# Time of Flight: T = (2 * u * sinθ) / g
+# Projectile with Air Drag: a = -k * f(|v|) * v - g (adaptive RK45)
 # ------------------------
-@bp.route('/time', methods=['POST'])
-def time_route():
+DRAG_FORMULA = "a = -k * v - g (linear) OR a = -k * |v| * v - g (quadratic)"
+DRAG_SCHEMA = compile_schema(['u', 'angle', 'k'])
+
+
+def _drag_options(data):
+    """Reads the optional drag model and integrator tolerance from the request body."""
+    model = data.get('model', 'quadratic')
+    tol = data.get('tol', 1e-6)
+    if model not in DRAG_MODELS:
+        raise ValueError(f"model must be one of {', '.join(DRAG_MODELS)}")
+    if isinstance(tol, bool) or not isinstance(tol, (int, float)):
+        raise ValueError("tol must be a number")
+    if not MIN_TOL <= tol < 1:
+        raise ValueError(f"tol must be at least {MIN_TOL:g} and less than 1")
+    return model, float(tol)
+
+
+@bp.route('/drag', methods=['POST'])
+def drag_route():
     """
-    Calculate Time of Flight (T)
+    Simulate a Projectile with Air Drag
     ---
     tags:
       - Projectile Motion
+    description: >
+      Integrates the flight numerically with an adaptive RK45 (Dormand–Prince) solver
+      and returns the range, maximum height and time of flight.
     parameters:
       - name: body
         in: body
@@ -93,108 +156,112 @@ def time_route():
           required:
             - u
             - angle
+            - k
           properties:
             u:
               type: number
-              description: Initial Velocity (m/s)
+              description: Initial Velocity (m/s), at most 10000
               example: 20
             angle:
               type: number
               description: Angle of projection (degrees)
-              example: 30
+              example: 45
+            k:
+              type: number
+              description: Drag coefficient per unit mass (1/s for linear, 1/m for quadratic), at most 10
+              example: 0.01
+            model:
+              type: string
+              enum: [linear, quadratic]
+              description: Drag model (default quadratic)
+            tol:
+              type: number
+              description: Integrator tolerance, at least 1e-12 and less than 1 (default 1e-6)
+              example: 0.000001
     responses:
       200:
-        description: Successful calculation
+        description: Successful simulation
         schema:
           type: object
           properties:
             result:
-              type: number
-              description: Time (seconds)
+              type: object
+              properties:
+                range:
+                  type: number
+                  description: Range (meters)
+                max_height:
+                  type: number
+                  description: Maximum Height (meters)
+                time_of_flight:
+                  type: number
+                  description: Time of Flight (s)
       400:
         description: Invalid input
     """
     data = request.json
-    required = ['u', 'angle']
-
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
+    try:
+        u, angle, k = DRAG_SCHEMA.parse(data)
+    except ValidationError as e:
+        return handle_validation_error(e)
 
     try:
-        u = float(data['u'])
-        angle = float(data['angle'])
-        result = compute_time_of_flight(u, angle)
-    except (ValueError, TypeError):
-        return handle_invalid_input_error("Inputs must be numbers")
-    except Exception as e:
-        return handle_generic_error(str(e))
+        model, tol = _drag_options(data)
+        metrics.mark("validate")
+        result = current_cache().call(simulate_drag, u, angle, k, model=model, tol=tol)
+    except ValueError as e:
+        return handle_invalid_input_error(str(e))
+    metrics.mark("compute")
 
     return jsonify({
-        "formula": "T = (2 * u * sinθ) / g",
-        "inputs": {"u": u, "angle": angle},
+        "formula": DRAG_FORMULA,
+        "inputs": {"u": u, "angle": angle, "k": k, "model": model, "tol": tol},
         "result": result
     })
 
 
-# ------------------------
-# Maximum Height: H = (u^2 * sin^2θ) / (2g)
-# ------------------------
-@bp.route('/height', methods=['POST'])
-def height_route():
+@bp.route('/drag/batch', methods=['POST'])
+def drag_batch_route():
     """
-    Calculate Maximum Height (H)
+    Simulate Many Projectiles with Air Drag at once
     ---
     tags:
       - Projectile Motion
+    description: >
+      Accepts arrays of u, angle and k (scalars broadcast) plus optional model and tol
+      (at least 1e-12 and less than 1), and integrates every launch condition in one
+      vectorized pass. At most 10000 launch conditions per request, with u up to 10000 m/s
+      and k up to 10. Launches whose integration fails (too many steps) are null.
     parameters:
       - name: body
         in: body
         required: true
         schema:
           type: object
-          required:
-            - u
-            - angle
-          properties:
-            u:
-              type: number
-              description: Initial Velocity (m/s)
-              example: 20
-            angle:
-              type: number
-              description: Angle of projection (degrees)
-              example: 60
+          example: {"u": [20, 30, 40], "angle": [45, 45, 30], "k": 0.01, "model": "quadratic"}
     responses:
       200:
-        description: Successful calculation
-        schema:
-          type: object
-          properties:
-            result:
-              type: number
-              description: Maximum Height (meters)
+        description: Successful simulation
       400:
-        description: Invalid input
+        description: Invalid input or Missing Fields
     """
     data = request.json
-    required = ['u', 'angle']
-
-    validation = validate_inputs(data, required)
-    if validation is not True:
-        return validation
+    columns, error = parse_batch_inputs(data, ['u', 'angle', 'k'])
+    if error is not None:
+        return error
+    if columns['u'].size > MAX_BATCH:
+        return handle_invalid_input_error(f"Batch too large: at most {MAX_BATCH} launch conditions per request")
 
     try:
-        u = float(data['u'])
-        angle = float(data['angle'])
-        result = compute_max_height(u, angle)
-    except (ValueError, TypeError):
-        return handle_invalid_input_error("Inputs must be numbers")
-    except Exception as e:
-        return handle_generic_error(str(e))
+        model, tol = _drag_options(data if isinstance(data, dict) else {})
+        metrics.mark("validate")
+        result = simulate_drag(columns['u'], columns['angle'], columns['k'], model=model, tol=tol)
+    except ValueError as e:
+        return handle_invalid_input_error(str(e))
+    metrics.mark("compute")
 
     return jsonify({
-        "formula": "H = (u^2 * sin^2θ) / (2g)",
-        "inputs": {"u": u, "angle": angle},
-        "result": result
-    })
\ No newline at end of file
+        "formula": DRAG_FORMULA,
+        "count": int(columns['u'].size),
+        "result": {name: array_to_json(values) for name, values in result.items()}
+    })
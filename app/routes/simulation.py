@@ -0,0 +1,195 @@
+import json
+
+from flask import Blueprint, Response, current_app, request
+from app.formulas.simulation import Particles, simulate, FORCE_LAWS
+from app.utils.error_handler import handle_invalid_input_error, handle_missing_input_error
+
+bp = Blueprint('simulation', __name__, url_prefix='/api/simulation')
+
+MAX_SIMULATION_STEPS = 1_000_000
+MAX_PARTICLES = 1000
+DEFAULT_STRIDE = 100
+
+
+def _integer(data, name, default):
+    value = data.get(name, default)
+    try:
+        if isinstance(value, bool) or int(value) != value:
+            raise ValueError
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError(f"Invalid input: {name} must be an integer")
+    return int(value)
+
+
+def _number(data, name, default=None):
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Invalid input: {name} must be a number")
+    return float(value)
+
+
+def _encode(frame):
+    return json.dumps({
+        "step": frame["step"],
+        "t": frame["t"],
+        "positions": frame["positions"].tolist(),
+        "velocities": frame["velocities"].tolist(),
+        "kinetic": frame["kinetic"],
+        "potential": frame["potential"],
+    })
+
+
+def _ndjson_frames(frames):
+    """One JSON object per frame; a divergence ends the stream with an error line."""
+    try:
+        for frame in frames:
+            yield _encode(frame) + "\n"
+    except ValueError as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+
+def _sse_frames(frames):
+    """Server-sent events: a "frame" event per frame, then "end" (or "error") so EventSource clients stop."""
+    try:
+        for frame in frames:
+            yield f"id: {frame['step']}\nevent: frame\ndata: {_encode(frame)}\n\n"
+    except ValueError as e:
+        yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        return
+    yield "event: end\ndata: {}\n\n"
+
+
+@bp.route('/run', methods=['POST'])
+def run_route():
+    """
+    Run a Particle Simulation
+    ---
+    tags:
+      - Simulation
+    description: >
+      Evolves a system of particles under gravity and/or Coulomb forces (and an
+      optional uniform field such as [0, -9.8]) with the velocity Verlet integrator,
+      streaming a frame every `stride` steps. Frames are NDJSON by default; send
+      "format": "sse" or an Accept header of text/event-stream for server-sent events.
+      Each frame has step, t, positions, velocities, kinetic and potential energy (SI units).
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - masses
+            - positions
+            - velocities
+            - dt
+            - steps
+          properties:
+            masses:
+              type: array
+              items:
+                type: number
+              example: [1.989e30, 5.97e24]
+            positions:
+              type: array
+              items:
+                type: array
+                items:
+                  type: number
+              example: [[0, 0], [1.496e11, 0]]
+            velocities:
+              type: array
+              items:
+                type: array
+                items:
+                  type: number
+              example: [[0, 0], [0, 29780]]
+            charges:
+              type: array
+              items:
+                type: number
+              description: Charges (C), needed for coulomb
+            forces:
+              type: array
+              items:
+                type: string
+                enum: [gravity, coulomb]
+              description: Pair forces to apply (default [gravity])
+            field:
+              type: array
+              items:
+                type: number
+              description: Uniform acceleration (m/s^2) added to every particle
+            dt:
+              type: number
+              description: Time step (s)
+              example: 3600
+            steps:
+              type: integer
+              description: >
+                Number of steps (max 1,000,000). Particle pairs × steps is capped at
+                SIMULATION_MAX_WORK; run larger simulations with POST /api/jobs
+              example: 8760
+            stride:
+              type: integer
+              description: Steps between frames (default 100)
+              example: 24
+            softening:
+              type: number
+              description: Softening length (m) for close encounters (default 0)
+            format:
+              type: string
+              enum: [ndjson, sse]
+    responses:
+      200:
+        description: Streamed frames
+      400:
+        description: Invalid input, Missing Fields, or a run too large to serve directly (use /api/jobs)
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return handle_invalid_input_error("Invalid input: request body must be an object")
+    missing = [name for name in ('masses', 'positions', 'velocities', 'dt', 'steps') if name not in data]
+    if missing:
+        return handle_missing_input_error(missing)
+
+    try:
+        steps = _integer(data, 'steps', None)
+        stride = _integer(data, 'stride', DEFAULT_STRIDE)
+        if not 1 <= steps <= MAX_SIMULATION_STEPS:
+            raise ValueError(f"steps must be between 1 and {MAX_SIMULATION_STEPS}")
+        laws = data.get('forces', ['gravity'])
+        if not isinstance(laws, list) or not all(law in FORCE_LAWS for law in laws):
+            raise ValueError(f"forces must be a list of {', '.join(FORCE_LAWS)}")
+        # Checked on the raw lists, before any array (or the pair index) is allocated
+        if any(isinstance(data.get(name), list) and len(data[name]) > MAX_PARTICLES
+               for name in ('masses', 'positions', 'velocities', 'charges')):
+            raise ValueError(f"At most {MAX_PARTICLES} particles can be simulated")
+        particles = Particles(data['masses'], data['positions'], data['velocities'], data.get('charges'))
+        # Every step measures every pair (and moves every particle)
+        budget = current_app.config['SIMULATION_MAX_WORK']
+        n = particles.masses.size
+        if budget is not None and max(n * (n - 1) // 2, n) * steps > budget:
+            raise ValueError(f"Particle pairs × steps can be at most {budget:,}; "
+                             "send fewer steps or particles, or run it with POST /api/jobs "
+                             "(endpoint /api/simulation/run)")
+        frames = simulate(
+            particles, _number(data, 'dt'), steps, stride, laws=laws,
+            softening=_number(data, 'softening', 0.0), field=data.get('field'),
+        )
+    except TypeError:
+        return handle_invalid_input_error("Invalid input: particle values and field must be numbers")
+    except ValueError as e:
+        return handle_invalid_input_error(str(e))
+
+    output = data.get('format')
+    if output is None:
+        output = 'sse' if request.accept_mimetypes.best == 'text/event-stream' else 'ndjson'
+    if output not in ('ndjson', 'sse'):
+        return handle_invalid_input_error("format must be 'ndjson' or 'sse'")
+
+    headers = {"X-Frame-Count": str(steps // stride + 1 + (steps % stride != 0))}
+    if output == 'sse':
+        headers.update({"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+        return Response(_sse_frames(frames), mimetype='text/event-stream', headers=headers)
+    return Response(_ndjson_frames(frames), mimetype='application/x-ndjson', headers=headers)
@@ -0,0 +1,101 @@
+from flask import Blueprint, request, jsonify
+from app.formulas.planner import QUANTITIES, PlanError, plan
+from app.utils import metrics
+from app.utils.error_handler import handle_invalid_input_error, handle_missing_input_error, handle_validation_error
+from app.utils.validator import ValidationError
+
+bp = Blueprint('solve', __name__, url_prefix='/api/solve')
+
+
+@bp.route('', methods=['GET'])
+def list_quantities():
+    """
+    Quantities the Problem Solver Knows
+    ---
+    tags:
+      - Equations
+    responses:
+      200:
+        description: Every quantity that can be given as known or asked for as the target
+    """
+    return jsonify({"quantities": [
+        {"name": name, "description": description, "unit": unit}
+        for name, (description, unit) in sorted(QUANTITIES.items())
+    ]})
+
+
+@bp.route('', methods=['POST'])
+def solve_route():
+    """
+    Multi-Step Problem Solver
+    ---
+    tags:
+      - Equations
+    description: >
+      Chains the equations of /api/equations (across forces, kinematics, work and energy, ...) to derive
+      the target from the known quantities in one request, and returns every intermediate value.
+      The plan for each set of known quantity names and target is worked out once and cached.
+      Quantity names are listed by GET /api/solve. Give no known that the others already determine.
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          required:
+            - knowns
+            - target
+          properties:
+            knowns:
+              type: object
+              description: Known quantities by name
+              example: {"mass": 10, "mu": 0.3, "applied_force": 50, "u": 0, "t": 4}
+            target:
+              type: string
+              example: s
+    responses:
+      200:
+        description: The target's value, the steps taken and every value known or derived
+      400:
+        description: Invalid input, unknown quantity, a target that cannot be derived, or knowns that follow from each other
+    """
+    data = request.json
+    if not isinstance(data, dict):
+        return handle_invalid_input_error("Invalid input: request body must be an object")
+    missing = [name for name in ('knowns', 'target') if name not in data]
+    if missing:
+        return handle_missing_input_error(missing)
+    knowns, target = data['knowns'], data['target']
+    if not isinstance(knowns, dict) or not isinstance(target, str):
+        return handle_invalid_input_error("Invalid input: knowns must be an object and target a quantity name")
+
+    try:
+        chain = plan(frozenset(knowns), target)
+    except KeyError as e:
+        return handle_invalid_input_error(f"Unknown quantities: {e.args[0]}")
+    except PlanError as e:
+        return handle_invalid_input_error(str(e))
+    try:
+        values = chain.schema.parse(knowns)
+    except ValidationError as e:
+        return handle_validation_error(e)
+    metrics.mark("validate")
+
+    try:
+        values, trace = chain.run(values._asdict() if chain.knowns else {})
+    except ValueError as e:
+        return handle_invalid_input_error(str(e))
+    metrics.mark("compute")
+
+    return jsonify({
+        "target": target,
+        "result": values[target],
+        "steps": [{
+            "equation": f"{step.equation.group}/{step.equation.name}",
+            "formula": formula,
+            "inputs": inputs,
+            "quantity": step.quantity,
+            "result": result,
+        } for step, formula, inputs, result in trace],
+        "values": values,
+    })
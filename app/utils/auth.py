@@ -0,0 +1,22 @@
+# app/utils/auth.py
+
+import hmac
+
+from flask import current_app, jsonify
+
+
+def require_admin_token(*credentials):
+    """
+    Guards the admin endpoints: returns None when one of the credentials sent
+    matches ADMIN_TOKEN, otherwise the error response. They fail closed, so
+    without a configured ADMIN_TOKEN they answer 404 to everyone.
+    """
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        return jsonify({"error": "Admin endpoints are disabled; set ADMIN_TOKEN to enable them"}), 404
+    expected = token.encode("utf-8")
+    # Constant-time comparison, so response timing does not reveal how much of a guess was right
+    if not any(credential is not None and hmac.compare_digest(credential.encode("utf-8"), expected)
+               for credential in credentials):
+        return jsonify({"error": "Admin token required"}), 403
+    return None
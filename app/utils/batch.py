@@ -0,0 +1,73 @@
+# app/utils/batch.py
+
+import numpy as np
+
+from app.utils.error_handler import handle_missing_input_error, handle_invalid_input_error, handle_validation_error
+from app.utils.validator import ValidationError
+
+MAX_BATCH_SIZE = 1_000_000
+
+
+def parse_batch_inputs(data, required_fields):
+    """
+    Turns a batch request body into one float64 array per required field.
+
+    Accepts either columns ({"u": [0, 1], "a": [9.8, 9.8], ...}) or a list of
+    input objects ([{"u": 0, "a": 9.8, ...}, ...]). A scalar column is broadcast
+    against the others. Like Schema.parse, booleans, NaN and infinities are rejected
+    and every bad field is reported at once.
+    Returns (columns, None) on success, or (None, error_response).
+    """
+    if isinstance(data, list):
+        if not all(isinstance(row, dict) for row in data):
+            return None, handle_invalid_input_error("Invalid input: each row must be an object")
+        missing = [field for field in required_fields if any(field not in row for row in data)]
+        if missing:
+            return None, handle_missing_input_error(missing)
+        data = {field: [row[field] for row in data] for field in required_fields}
+    elif not isinstance(data, dict):
+        return None, handle_invalid_input_error("Invalid input: expected an object of arrays or a list of objects")
+
+    missing = [field for field in required_fields if data.get(field) is None]
+    invalid = []
+    columns = {}
+    for field in required_fields:
+        if field in missing:
+            continue
+        values = data[field]
+        # float(True) is 1.0, so booleans have to be caught before NumPy converts them
+        if isinstance(values, bool) or (isinstance(values, list) and any(value.__class__ is bool for value in values)):
+            invalid.append(field)
+            continue
+        try:
+            column = np.asarray(values, dtype=np.float64)
+        except (ValueError, TypeError):
+            invalid.append(field)
+            continue
+        if column.ndim > 1 or not np.isfinite(column).all():
+            invalid.append(field)
+            continue
+        columns[field] = column
+    if missing or invalid:
+        return None, handle_validation_error(ValidationError(missing, invalid))
+
+    try:
+        arrays = np.broadcast_arrays(*(np.atleast_1d(column) for column in columns.values()))
+    except ValueError:
+        return None, handle_invalid_input_error("Invalid input: input arrays must have matching lengths")
+    if arrays and arrays[0].size > MAX_BATCH_SIZE:
+        return None, handle_invalid_input_error(f"Batch too large: at most {MAX_BATCH_SIZE} rows per request")
+
+    return dict(zip(columns, arrays)), None
+
+
+def array_to_json(values):
+    """
+    Converts a result array into a JSON-safe list.
+    Non-finite entries (e.g. division by zero) become null.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    if finite.all():
+        return values.tolist()
+    return np.where(finite, values, None).tolist()
@@ -0,0 +1,158 @@
+# app/utils/cache.py
+
+import inspect
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from numbers import Number
+
+from flask import current_app
+
+from app.utils.shared_cache import SharedResultStore
+
+
+class FormulaCache:
+    """
+    Opt-in memoization for the pure functions in app/formulas.
+
+    Results are keyed on the function and all of its arguments after defaults
+    are applied (so overriding g gives a different key), with numbers
+    normalized to float. Array arguments are never cached. The cache holds at
+    most `maxsize` entries, evicts the least recently used one, and optionally
+    expires entries after `ttl` seconds.
+
+    An optional `shared` store (see app/utils/shared_cache.py) is consulted on a
+    local miss, so float results computed by one worker serve all the others.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, enabled=False, shared=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._signatures = weakref.WeakKeyDictionary()  # User-defined formulas come and go (app/utils/expressions.py)
+        self.shared = None
+        self.configure(enabled=enabled, maxsize=maxsize, ttl=ttl, shared=shared)
+
+    def configure(self, enabled, maxsize, ttl=None, shared=None):
+        """Changes the settings and starts over with an empty cache and fresh counters."""
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        with self._lock:
+            self.enabled = bool(enabled)
+            self.maxsize = int(maxsize)
+            self.ttl = float(ttl) if ttl else None
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+            if self.shared is not None and self.shared is not shared:
+                self.shared.close()
+            self.shared = shared
+
+    def _key(self, func, args, kwargs):
+        """Builds the cache key, or returns None if an argument is not a plain number/string."""
+        signature = self._signatures.get(func)
+        if signature is None:
+            signature = self._signatures[func] = inspect.signature(func)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+
+        values = []
+        for value in bound.arguments.values():
+            if isinstance(value, Number) and not isinstance(value, complex):
+                value = float(value)
+            elif value is not None and not isinstance(value, str):
+                return None
+            values.append(value)
+        return (func.__module__, func.__qualname__, tuple(values))
+
+    def call(self, func, *args, **kwargs):
+        """Returns func(*args, **kwargs), served from the cache when possible."""
+        if not self.enabled:
+            return func(*args, **kwargs)
+        key = self._key(func, args, kwargs)
+        if key is None:
+            return func(*args, **kwargs)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, expires = entry
+                if expires is None or expires > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        shared = self.shared
+        if shared is not None:
+            result = shared.get(key)
+            if result is not None:
+                self._store(key, result, now)
+                return result
+
+        # Computed outside the lock; errors propagate and are never cached
+        result = func(*args, **kwargs)
+        if shared is not None and isinstance(result, float):
+            shared.put(key, result)
+        self._store(key, result, now)
+        return result
+
+    def _store(self, key, result, now):
+        with self._lock:
+            self._entries[key] = (result, now + self.ttl if self.ttl else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry (including the shared store) but keeps the counters."""
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self):
+        """Current settings and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "shared": self.shared.stats() if self.shared is not None else None,
+            }
+
+
+def init_cache(app):
+    """
+    Creates the app's FormulaCache from its FORMULA_CACHE_* and SHARED_CACHE_*
+    settings and keeps it in app.extensions, so every app has its own settings and counters.
+    """
+    shared = None
+    if app.config['FORMULA_CACHE_ENABLED'] and app.config['SHARED_CACHE_PATH']:
+        shared = SharedResultStore(
+            app.config['SHARED_CACHE_PATH'],
+            slots=app.config['SHARED_CACHE_SLOTS'],
+            ttl=app.config['FORMULA_CACHE_TTL'],
+        )
+    cache = app.extensions['physicalc_formula_cache'] = FormulaCache(
+        enabled=app.config['FORMULA_CACHE_ENABLED'],
+        maxsize=app.config['FORMULA_CACHE_SIZE'],
+        ttl=app.config['FORMULA_CACHE_TTL'],
+        shared=shared,
+    )
+    return cache
+
+
+def current_cache():
+    """The FormulaCache of the app handling the current request."""
+    return current_app.extensions['physicalc_formula_cache']
@@ -0,0 +1,250 @@
+# app/utils/encoding.py
+
+import json
+import math
+import sys
+import time
+
+from flask import Request, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import BadRequest, UnsupportedMediaType
+
+from app.utils import metrics
+
+try:  # Optional: MessagePack is offered only when the package is installed
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:  # Optional: a faster JSON encoder and decoder, used when installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+FLOAT64 = "application/octet-stream"  # Little-endian float64 rows, columns named in X-Columns
+ECHO_FIELDS = ("formula", "inputs")  # Dropped from responses with Prefer: return=minimal
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+
+def _is_numpy(value):
+    """
+    True for NumPy arrays and scalars. NumPy is only imported by the routes that
+    use it, so while it is not loaded no value can be one.
+    """
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(value, (np.ndarray, np.generic))
+
+
+def _plain(value):
+    """MessagePack fallback for NumPy values that reach a response body."""
+    if _is_numpy(value):
+        return value.tolist()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _finite(value):
+    """A copy of a body with NaN and infinities replaced by None (null), which JSON cannot represent."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if _is_numpy(value):
+        return _finite(value.tolist())
+    return value
+
+
+class ApiRequest(Request):
+    """
+    request.json that also reads MessagePack bodies, and raw float64 bodies
+    (application/octet-stream, X-Columns naming the columns of each row) as one
+    array per column, which the batch routes take as they are.
+    """
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if cache and self._cached_json[silent] is not Ellipsis:
+            return self._cached_json[silent]
+        started = time.perf_counter()
+        try:
+            return self._load(force, silent, cache)
+        finally:
+            metrics.add_phase("parse", started)
+
+    def _load(self, force, silent, cache):
+        if self.mimetype not in MSGPACK_TYPES and not (self.mimetype == FLOAT64 and "X-Columns" in self.headers):
+            return super().get_json(force=force, silent=silent, cache=cache)
+        if cache and self._cached_json[silent] is not Ellipsis:
+            return self._cached_json[silent]
+        try:
+            data = self._decode_binary()
+        except ValueError as e:
+            if silent:
+                return None
+            raise BadRequest(f"Failed to decode the request body: {e}")
+        if cache:
+            self._cached_json = (data, data)
+        return data
+
+    def _decode_binary(self):
+        body = self.get_data(cache=True)
+        if self.mimetype == FLOAT64:
+            import numpy as np
+
+            names = [name.strip() for name in self.headers["X-Columns"].split(",") if name.strip()]
+            if not names or len(body) % (8 * len(names)):
+                raise ValueError("the body must hold whole rows of float64, one value per X-Columns name")
+            rows = np.frombuffer(body, dtype="<f8").reshape(-1, len(names))
+            return {name: rows[:, i] for i, name in enumerate(names)}
+        if msgpack is None:
+            raise UnsupportedMediaType("MessagePack support needs the msgpack package")
+        try:
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        except (ValueError, TypeError):  # msgpack's unpack errors are ValueErrors
+            raise ValueError("invalid MessagePack data")
+
+
+class ApiJSONProvider(DefaultJSONProvider):
+    """
+    The app's JSON provider.
+
+    Encodes with orjson when it is installed (backend "auto" or "orjson") and
+    with the stdlib otherwise ("json"); either way NaN and infinities become
+    null, so responses are always valid JSON. NumPy arrays and scalars are
+    encoded directly.
+
+    jsonify() also negotiates for /api/* routes: the Accept header picks JSON
+    (default), MessagePack or raw float64 rows for array results, and
+    Prefer: return=minimal (or ?return=minimal) drops the formula and inputs
+    echo. Bodies that cannot be sent as float64 rows fall back to JSON.
+    """
+
+    def __init__(self, app, backend="auto"):
+        super().__init__(app)
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"JSON_BACKEND must be one of {', '.join(JSON_BACKENDS)}")
+        if backend == "orjson" and orjson is None:
+            raise ValueError("JSON_BACKEND=orjson needs the orjson package")
+        self.backend = "json" if backend == "json" or orjson is None else "orjson"
+
+    def _default(self, value):
+        if _is_numpy(value):
+            return _plain(value)
+        return self.default(value)
+
+    def encode(self, obj):
+        """Compact UTF-8 JSON bytes, the body of every JSON response."""
+        if self.backend == "orjson":
+            try:
+                return orjson.dumps(obj, default=self._default, option=(
+                    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+                ))
+            except TypeError:
+                pass  # e.g. integers beyond 64 bits, which the stdlib handles
+        return self.dumps(obj, separators=(",", ":")).encode()
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs and self.backend == "orjson":
+            return self.encode(obj).decode()
+        kwargs.setdefault("default", self._default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        try:
+            return json.dumps(obj, allow_nan=False, **kwargs)
+        except ValueError:  # Non-finite floats; only then is the body copied
+            return json.dumps(_finite(obj), allow_nan=False, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if not kwargs and self.backend == "orjson":
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # The stdlib reports the error (or parses what orjson does not, e.g. huge integers)
+        return super().loads(s, **kwargs)
+
+    def _json_response(self, obj):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(obj)  # Indented for debugging
+        return self._app.response_class(self.encode(obj) + b"\n", mimetype=self.mimetype)
+
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        obj = self._prepare_response_obj(args, kwargs)
+        if not has_request_context() or not request.path.startswith("/api/"):
+            return self._json_response(obj)
+
+        minimal = wants_minimal()
+        if minimal and isinstance(obj, dict):
+            obj = {key: value for key, value in obj.items() if key not in ECHO_FIELDS}
+
+        # Ties go to the earlier offer, so Accept: */* (or none) keeps JSON
+        offered = [JSON, MSGPACK, FLOAT64] if msgpack is not None else [JSON, FLOAT64]
+        chosen = request.accept_mimetypes.best_match(offered, default=JSON)
+        response = None
+        if chosen == MSGPACK:
+            response = self._app.response_class(msgpack.packb(obj, default=_plain), mimetype=MSGPACK)
+        elif chosen == FLOAT64:
+            columns = float64_columns(obj)
+            if columns is not None:
+                names, rows = columns
+                response = self._app.response_class(rows.tobytes(), mimetype=FLOAT64, headers={
+                    "X-Columns": ",".join(names), "X-Count": str(rows.shape[0]),
+                })
+        if response is None:
+            response = self._json_response(obj)
+        response.vary.update(("Accept", "Prefer"))
+        if minimal:
+            response.headers["Preference-Applied"] = "return=minimal"
+        metrics.add_phase("serialize", started)
+        return response
+
+
+def wants_minimal():
+    """Prefer: return=minimal (RFC 7240) or ?return=minimal asks for the result without the echo."""
+    if request.args.get("return") == "minimal":
+        return True
+    return any(
+        part.strip().replace(" ", "") == "return=minimal"
+        for value in request.headers.getlist("Prefer") for part in value.split(",")
+    )
+
+
+def float64_columns(obj):
+    """
+    (names, rows) for the array results of a body, as a (count, columns)
+    little-endian float64 array: flat lists become one column, lists of
+    points one column per coordinate (forces[0], forces[1], ...), and a
+    "result" object one column per entry. None if there are no arrays or
+    their lengths differ; nulls become NaN.
+    """
+    if not isinstance(obj, dict):
+        return None
+    import numpy as np
+
+    candidates = []
+    for key, value in obj.items():
+        if isinstance(value, dict) and key == "result":
+            candidates.extend(value.items())
+        elif isinstance(value, list):
+            candidates.append((key, value))
+
+    names, arrays = [], []
+    for name, value in candidates:
+        if not isinstance(value, list) or not value:
+            continue
+        try:
+            array = np.array(value, dtype="<f8")
+        except (TypeError, ValueError):
+            continue
+        if array.ndim == 1:
+            names.append(name)
+            arrays.append(array)
+        elif array.ndim == 2:
+            names.extend(f"{name}[{i}]" for i in range(array.shape[1]))
+            arrays.extend(array.T)
+    if not arrays or len({array.size for array in arrays}) != 1:
+        return None
+    return names, np.column_stack(arrays).astype("<f8", copy=False)
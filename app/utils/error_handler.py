@@ -1,18 +1,28 @@
 from flask import jsonify
+from app.utils.metrics import count_error
 
-def handle_zero_division_error():
+def handle_zero_division_error(message="Resistance cannot be zero"):
     """Handles division by zero errors gracefully."""
-    return jsonify({"error": "Resistance cannot be zero"}), 400
+    count_error("handle_zero_division_error")
+    return jsonify({"error": message}), 400
 
 def handle_invalid_input_error(message="Invalid input"):
     """Handles invalid input errors."""
+    count_error("handle_invalid_input_error")
     # FIX: Use the 'message' variable instead of hardcoding "Invalid input"
     return jsonify({"error": message}), 400
 
 def handle_missing_input_error(required_fields):
     """Handles missing input errors."""
+    count_error("handle_missing_input_error")
     return jsonify({"error": f"Missing required fields: {', '.join(required_fields)}"}), 400
 
+def handle_validation_error(error):
+    """Handles a ValidationError, listing every missing and invalid field at once."""
+    count_error("handle_validation_error")
+    return jsonify({"error": str(error), "missing": error.missing, "invalid": error.invalid}), 400
+
 def handle_generic_error(message="An unexpected error occurred"):
     """Handles generic errors."""
+    count_error("handle_generic_error")
     return jsonify({"error": message}), 404
\ No newline at end of file
@@ -0,0 +1,181 @@
+# app/utils/expressions.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from app.formulas.expression import ExpressionError, compile_expression
+from app.formulas.registry import Formula, Input
+from app.utils.validator import compile_schema
+
+MAX_TITLE = 200
+MAX_DESCRIPTION = 2000
+
+# One compiled definition: the registry-style formulas for scalar and batch
+# evaluation (same func signature, math vs NumPy) and the request validator
+Compiled = namedtuple("Compiled", ["definition", "formula", "batch_formula", "schema"])
+
+
+class ExpressionStoreFull(Exception):
+    """The store already holds its maximum number of definitions."""
+
+
+class ExpressionStore:
+    """
+    User-defined formulas. Definitions are small JSON files in one directory
+    (<id>.json), so a formula defined through one worker can be evaluated by
+    any other; each worker keeps the compiled callables of the `maxsize` most
+    recently used ones and recompiles the rest from their definition on demand.
+
+    Ids are derived from the normalized expression and its metadata, so
+    defining the same formula twice returns the existing id. At most
+    `max_definitions` are stored; definitions are never deleted, so ids stay valid.
+    """
+
+    def __init__(self, path=None, maxsize=256, max_definitions=10_000):
+        if maxsize < 1:
+            raise ValueError("The expression cache size must be at least 1")
+        self.path = path or os.path.join(tempfile.gettempdir(), "physicalc-expressions")
+        os.makedirs(self.path, exist_ok=True)
+        self.maxsize = int(maxsize)
+        self.max_definitions = int(max_definitions)
+        self._lock = threading.Lock()
+        self._compiled = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def _file(self, expression_id):
+        if not expression_id or not all(c in "0123456789abcdef" for c in expression_id):
+            raise KeyError(expression_id)
+        return os.path.join(self.path, f"{expression_id}.json")
+
+    def _write(self, path, data):
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    def define(self, source, title=None, description=None, units=None):
+        """
+        Compiles and stores a formula. Returns (definition, created), where
+        created is False when the identical formula was already defined.
+        Raises ExpressionError for an invalid expression or metadata and
+        ExpressionStoreFull for a new formula once max_definitions are stored.
+        """
+        expression = compile_expression(source)
+        units = _check_metadata(expression, title, description, units)
+        definition = {
+            "expression": expression.text,
+            "title": title or expression.text,
+            "description": description,
+            "variables": [{"name": name, "unit": units.get(name, "")} for name in expression.variables],
+        }
+        key = json.dumps(definition, sort_keys=True).encode("utf-8")
+        definition = dict(id=hashlib.sha256(key).hexdigest()[:16], **definition)
+
+        existing = self.get(definition["id"])
+        if existing is not None:
+            return existing, False
+        # Workers defining at the same moment can each pass this check, overshooting by at most one each
+        if self.count() >= self.max_definitions:
+            raise ExpressionStoreFull(f"At most {self.max_definitions} formulas can be defined")
+        definition["created"] = time.time()
+        self._write(self._file(definition["id"]), definition)
+        self._remember(definition["id"], _compile(definition))
+        return definition, True
+
+    def get(self, expression_id):
+        """A stored definition, or None."""
+        try:
+            with open(self._file(expression_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (KeyError, OSError, ValueError):
+            return None
+
+    def _entries(self):
+        with os.scandir(self.path) as entries:
+            return [entry for entry in entries if entry.name.endswith(".json")]
+
+    def count(self):
+        """The number of stored definitions."""
+        return len(self._entries())
+
+    def list(self, offset=0, limit=None):
+        """
+        One page of the stored definitions, oldest first, and the total count.
+        Files are ordered by modification time (they are written once, when
+        defined), so only the definitions on the page are read.
+        """
+        entries = sorted(self._entries(), key=lambda entry: (entry.stat().st_mtime, entry.name))
+        end = None if limit is None else offset + limit
+        definitions = []
+        for entry in entries[offset:end]:
+            definition = self.get(entry.name[:-5])
+            if definition is not None:
+                definitions.append(definition)
+        return definitions, len(entries)
+
+    def compiled(self, expression_id):
+        """The Compiled formula for an id, from this worker's cache or rebuilt from its definition; None if unknown."""
+        with self._lock:
+            compiled = self._compiled.get(expression_id)
+            if compiled is not None:
+                self._compiled.move_to_end(expression_id)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+        definition = self.get(expression_id)
+        if definition is None:
+            return None
+        # Compiled outside the lock; two threads missing at once both compile, and the last one stays
+        compiled = _compile(definition)
+        self._remember(expression_id, compiled)
+        return compiled
+
+    def _remember(self, expression_id, compiled):
+        with self._lock:
+            self._compiled[expression_id] = compiled
+            self._compiled.move_to_end(expression_id)
+            while len(self._compiled) > self.maxsize:
+                self._compiled.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        """Compiled-formula cache size and hit/miss/eviction counters for this worker."""
+        with self._lock:
+            return {
+                "size": len(self._compiled),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _check_metadata(expression, title, description, units):
+    if title is not None and (not isinstance(title, str) or len(title) > MAX_TITLE):
+        raise ExpressionError(f"title must be a string of at most {MAX_TITLE} characters")
+    if description is not None and (not isinstance(description, str) or len(description) > MAX_DESCRIPTION):
+        raise ExpressionError(f"description must be a string of at most {MAX_DESCRIPTION} characters")
+    if units is None:
+        return {}
+    if not isinstance(units, dict) or not all(isinstance(unit, str) and len(unit) <= 50 for unit in units.values()):
+        raise ExpressionError("units must map variable names to unit strings")
+    unknown = sorted(set(units) - set(expression.variables))
+    if unknown:
+        raise ExpressionError(f"units given for variables the expression does not use: {', '.join(unknown)}")
+    return units
+
+
+def _compile(definition):
+    # Named after the id, so the formula result cache never mixes up two definitions
+    expression = compile_expression(definition["expression"], name=f"expression_{definition['id']}")
+    inputs = tuple(Input(variable["name"], variable["name"], variable["unit"]) for variable in definition["variables"])
+    formula = Formula(
+        "expressions", definition["id"], definition["title"], expression.scalar, inputs, "Result", expression.text,
+        description=definition["description"],
+    )
+    return Compiled(definition, formula, formula._replace(func=expression.vector), compile_schema(expression.variables))
@@ -0,0 +1,279 @@
+# app/utils/formula_routes.py
+
+import inspect
+
+import numpy as np
+from flask import Response, current_app, request, jsonify, stream_with_context
+
+from app.formulas.registry import GROUPS
+from app.utils.batch import parse_batch_inputs, array_to_json
+from app.utils.cache import current_cache
+from app.utils.error_handler import handle_invalid_input_error, handle_zero_division_error, handle_validation_error
+from app.utils import metrics
+from app.utils.ingest import NPY_TYPES, CsvReader, NpyReader, IngestError, detach, locate, csv_chunk, npy_header, npy_chunk
+from app.utils.validator import compile_schema, ValidationError
+
+
+def register_formula_routes(bp, formulas):
+    """
+    Adds a scalar route (/<name>), a batch route (/<name>/batch) and a file
+    route (/<name>/file) to the blueprint for every formula, with Swagger docs
+    and a validator built from the registry entry.
+    """
+    for formula in formulas:
+        bp.add_url_rule(f'/{formula.name}', formula.name, scalar_view(formula), methods=['POST'])
+        bp.add_url_rule(f'/{formula.name}/batch', f'{formula.name}_batch', batch_view(formula), methods=['POST'])
+        bp.add_url_rule(f'/{formula.name}/file', f'{formula.name}_file', file_view(formula), methods=['POST'])
+
+
+def evaluate(formula, values):
+    """
+    The single hot path behind every scalar formula route: calls the formula
+    (through the result cache) and builds the response body.
+    Raises ValueError / ZeroDivisionError for inputs the formula rejects.
+    """
+    result = current_cache().call(formula.func, *values)
+    body = {
+        "formula": formula.expression,
+        "inputs": dict(zip((field.name for field in formula.inputs), values)),
+        "result": result,
+    }
+    for extra in formula.extras:
+        body[extra.name] = extra.func(result)
+    return body
+
+
+def scalar_view(formula):
+    schema = compile_schema(
+        [field.name for field in formula.inputs],
+        [field.name for field in formula.inputs if field.optional],
+    )
+
+    def view():
+        try:
+            values = schema.parse(request.json)
+        except ValidationError as e:
+            return handle_validation_error(e)
+        metrics.mark("validate")
+        try:
+            body = evaluate(formula, values)
+        except ZeroDivisionError:
+            return handle_zero_division_error("Division by zero")
+        except (ValueError, TypeError) as e:
+            return handle_invalid_input_error(str(e))
+        metrics.mark("compute")
+        return jsonify(body)
+
+    view.__name__ = formula.name
+    view.__doc__ = formula.title
+    view.specs_dict = scalar_spec(formula)
+    return view
+
+
+def batch_options(formula):
+    """Formulas with a zero policy give NaN for the failing rows instead of rejecting the whole batch."""
+    return {"on_zero": "nan"} if "on_zero" in inspect.signature(formula.func).parameters else {}
+
+
+def evaluate_columns(formula, columns, options):
+    """
+    The vectorized counterpart of evaluate(): the result array followed by one
+    array per extra, for a dict of input columns (absent optional inputs are None).
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        result = formula.func(*(columns.get(field.name) for field in formula.inputs), **options)
+        return [result] + [extra.func(result) for extra in formula.extras]
+
+
+def batch_view(formula):
+    names = [field.name for field in formula.inputs]
+    optional = {field.name for field in formula.inputs if field.optional}
+    options = batch_options(formula)
+
+    def view():
+        data = request.json
+        present = [name for name in names if name not in optional or provided(data, name)]
+        columns, error = parse_batch_inputs(data, present)
+        if error is not None:
+            return error
+        metrics.mark("validate")
+        try:
+            result, *extras = evaluate_columns(formula, columns, options)
+        except (ValueError, TypeError) as e:
+            return handle_invalid_input_error(str(e))
+        metrics.mark("compute")
+        body = {
+            "formula": formula.expression,
+            "count": int(np.size(result)),
+            "result": array_to_json(result),
+        }
+        for extra, values in zip(formula.extras, extras):
+            body[extra.name] = array_to_json(values)
+        return jsonify(body)
+
+    view.__name__ = f'{formula.name}_batch'
+    view.__doc__ = f"{formula.title} for many inputs at once"
+    view.specs_dict = batch_spec(formula)
+    return view
+
+
+def file_view(formula):
+    required = [field.name for field in formula.inputs if not field.optional]
+    optional = [field.name for field in formula.inputs if field.optional]
+    outputs = ["result"] + [extra.name for extra in formula.extras]
+    options = batch_options(formula)
+
+    def view():
+        # A multipart upload ("file" field) or the raw request body; .npy is detected by name or content type
+        upload = request.files.get('file')
+        if upload is not None:
+            stream, binary = detach(upload), upload.filename.lower().endswith('.npy') or upload.mimetype in NPY_TYPES
+        else:
+            stream, binary = request.stream, request.mimetype in NPY_TYPES
+        # ?<input>=<column> maps a differently named column onto an input
+        mapping = {name: request.args[name] for name in required + optional if name in request.args}
+        try:
+            if binary:
+                columns = request.args.get('columns')
+                reader = NpyReader(stream, columns.split(',') if columns else None)
+            else:
+                reader = CsvReader(stream)
+            indices = locate(reader.header, required, optional, mapping)
+        except IngestError as e:
+            return handle_invalid_input_error(str(e))
+        except UnicodeDecodeError:
+            return handle_invalid_input_error("CSV files must be UTF-8 text")
+
+        chunks = reader.chunks(indices)
+        if binary:
+            body, mimetype, extension = _npy_body(formula, chunks, options, reader.rows, outputs), 'application/x-npy', 'npy'
+        else:
+            body, mimetype, extension = _csv_body(formula, chunks, options, reader.header, outputs), 'text/csv', 'csv'
+        response = Response(stream_with_context(body), mimetype=mimetype, headers={
+            "Content-Disposition": f'attachment; filename="{formula.name}.{extension}"',
+        })
+        if upload is not None:
+            response.call_on_close(stream.close)
+        return response
+
+    view.__name__ = f'{formula.name}_file'
+    view.__doc__ = f"{formula.title} for every row of a CSV or .npy file"
+    view.specs_dict = file_spec(formula)
+    return view
+
+
+def _csv_body(formula, chunks, options, header, outputs):
+    """The uploaded rows with result columns appended, one chunk at a time. A late failure ends with a # Error line."""
+    yield csv_chunk([], header, [], outputs)
+    try:
+        for rows, columns in chunks:
+            yield csv_chunk(rows, None, evaluate_columns(formula, columns, options), outputs)
+    except (ValueError, TypeError) as e:  # Includes UnicodeDecodeError
+        yield f"# Error: {e}\n".encode()
+
+
+def _npy_body(formula, chunks, options, rows, outputs):
+    """A structured .npy array with one float64 field per output; a late failure leaves it short of its declared rows."""
+    yield npy_header(rows, outputs)
+    try:
+        for _, columns in chunks:
+            count = next(iter(columns.values())).size if columns else 0
+            results = evaluate_columns(formula, columns, options)
+            yield npy_chunk([np.broadcast_to(values, (count,)) for values in results])
+    except (ValueError, TypeError) as e:
+        current_app.logger.warning("File evaluation of %s stopped: %s", formula.name, e)
+
+
+def provided(data, name):
+    """True if an optional field is given as a column, or in every row of a list of objects."""
+    if isinstance(data, dict):
+        return name in data
+    return bool(data) and all(isinstance(row, dict) and name in row for row in data)
+
+
+# ------------------------
+# Swagger specs, generated from the registry
+# ------------------------
+# Attached to each view as `specs_dict`, which Flasgger reads as-is, so no YAML
+# is written at startup or parsed when /apispec.json is first built.
+def scalar_spec(formula):
+    properties = {}
+    for field in formula.inputs:
+        properties[field.name] = {"type": "number", "description": f"{field.description} ({field.unit})"}
+        if field.example is not None:
+            properties[field.name]["example"] = field.example
+    schema = {"type": "object"}
+    required = [field.name for field in formula.inputs if not field.optional]
+    if required:
+        schema["required"] = required
+    schema["properties"] = properties
+
+    outputs = {"result": {"type": "number", "description": formula.output}}
+    for extra in formula.extras:
+        outputs[extra.name] = {"type": "number", "description": extra.description}
+
+    spec = {"tags": [GROUPS[formula.group]]}
+    if formula.description:
+        spec["description"] = formula.description
+    spec["parameters"] = [{"name": "body", "in": "body", "required": True, "schema": schema}]
+    spec["responses"] = {
+        200: {"description": "Successful calculation", "schema": {"type": "object", "properties": outputs}},
+        400: {"description": "Invalid input or Missing Fields"},
+    }
+    return spec
+
+
+def batch_spec(formula):
+    example = {
+        field.name: [field.example, field.example]
+        for field in formula.inputs if field.example is not None
+    }
+    spec = {
+        "tags": [GROUPS[formula.group]],
+        "description": (
+            f"Evaluates {formula.expression} over many inputs in one vectorized pass. "
+            "Send an object of arrays (scalars broadcast) or a list of input objects. "
+            "Undefined results (e.g. division by zero) are null."
+        ),
+        "parameters": [{"name": "body", "in": "body", "required": True,
+                        "schema": {"type": "object", "example": example}}],
+        "responses": {
+            200: {"description": "Successful calculation", "schema": {"type": "object", "properties": {
+                "count": {"type": "integer", "description": "Number of evaluated rows"},
+                "result": {"type": "array", "items": {"type": "number"}, "description": formula.output},
+            }}},
+            400: {"description": "Invalid input or Missing Fields"},
+        },
+    }
+    return spec
+
+
+def file_spec(formula):
+    columns = ", ".join(field.name for field in formula.inputs)
+    spec = {
+        "tags": [GROUPS[formula.group]],
+        "description": (
+            f"Evaluates {formula.expression} for every row of an uploaded file, streamed in chunks so "
+            f"memory stays flat for any size. Send a CSV with a header row naming the columns ({columns}) "
+            "as text/csv, or a .npy array as application/x-npy (a structured array with those field names, "
+            "or a 2-D array with the columns parameter), either as the raw body or a multipart 'file' field. "
+            "CSV input comes back with result columns appended; .npy input comes back as a structured "
+            "float64 array of the results. Unreadable cells and undefined results are empty (NaN)."
+        ),
+        "consumes": ["text/csv", "application/x-npy", "multipart/form-data"],
+        "produces": ["text/csv", "application/x-npy"],
+        "parameters": [
+            {"name": "file", "in": "formData", "type": "file", "required": False},
+            {"name": "columns", "in": "query", "type": "string", "required": False,
+             "description": "Comma-separated column names of a plain 2-D .npy array"},
+        ] + [
+            {"name": field.name, "in": "query", "type": "string", "required": False,
+             "description": f"Column holding {field.description} ({field.unit}); defaults to '{field.name}'"}
+            for field in formula.inputs
+        ],
+        "responses": {
+            200: {"description": "The evaluated file"},
+            400: {"description": "Unreadable file or missing columns"},
+        },
+    }
+    return spec
@@ -0,0 +1,202 @@
+# app/utils/ingest.py
+
+import csv
+import io
+import os
+
+import numpy as np
+
+CHUNK_ROWS = 65536  # Rows read, evaluated and written per step; bounds memory for any file size
+NPY_TYPES = ("application/x-npy", "application/octet-stream")
+
+
+class IngestError(ValueError):
+    """A file that cannot be read; raised before any output is produced."""
+
+
+def detach(upload):
+    """
+    A handle on an uploaded file that stays open while the response streams;
+    Flask closes the request's files as soon as the view returns.
+    """
+    try:
+        handle = os.fdopen(os.dup(upload.stream.fileno()), "rb")
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return io.BytesIO(upload.read())  # Small uploads are kept in memory anyway
+    handle.seek(0)
+    return handle
+
+
+# ------------------------
+# Readers: a header check up front, then column chunks
+# ------------------------
+class CsvReader:
+    """
+    Reads a CSV with a header row in chunks of rows. Cells that are empty or
+    not finite numbers become NaN, so only those rows get empty results.
+    """
+
+    def __init__(self, stream):
+        self._text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        self._rows = csv.reader(self._text)
+        try:
+            self.header = next(self._rows, None)
+        except csv.Error as e:  # e.g. a field over csv.field_size_limit()
+            raise IngestError(f"Not a valid CSV file: {e}") from None
+        if not self.header:
+            raise IngestError("CSV file is empty; the first row must name the columns")
+
+    def chunks(self, indices):
+        """
+        Yields (rows, columns): the raw rows and a float64 array per input of
+        indices ({input: column index}). Raises IngestError for malformed CSV.
+        """
+        while True:
+            rows = []
+            try:
+                for row in self._rows:
+                    if row:  # Skips blank lines
+                        rows.append(row)
+                        if len(rows) == CHUNK_ROWS:
+                            break
+            except csv.Error as e:
+                raise IngestError(f"Not a valid CSV file: {e}") from None
+            if not rows:
+                return
+            yield rows, {name: _floats([row[i] if i < len(row) else "" for row in rows])
+                         for name, i in indices.items()}
+
+
+def _floats(cells):
+    try:
+        values = np.asarray(cells).astype(np.float64)
+    except ValueError:
+        values = np.array([_float(cell) for cell in cells])
+    values[~np.isfinite(values)] = np.nan
+    return values
+
+
+def _float(cell):
+    try:
+        return float(cell)
+    except ValueError:
+        return np.nan
+
+
+class NpyReader:
+    """
+    Reads a NumPy .npy file row block by row block: either a 1-D structured
+    array with one numeric field per column, or a 2-D numeric array whose
+    columns are named by `columns`. Fortran-ordered and object arrays are refused.
+    """
+
+    def __init__(self, stream, columns=None):
+        self._stream = stream
+        try:
+            version = np.lib.format.read_magic(stream)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+            else:
+                raise ValueError(f"unsupported format version {version}")
+        except ValueError as e:
+            raise IngestError(f"Not a valid .npy file: {e}")
+        if fortran_order or dtype.hasobject:
+            raise IngestError("Only C-ordered numeric .npy arrays can be streamed")
+        if dtype.names:
+            if len(shape) != 1:
+                raise IngestError("A structured .npy array must be one-dimensional")
+            self.header = list(dtype.names)
+            if any(dtype[name].kind not in "biuf" or dtype[name].shape for name in self.header):
+                raise IngestError("Every field of the .npy array must be a number")
+        else:
+            if len(shape) != 2 or dtype.kind not in "biuf":
+                raise IngestError("A plain .npy array must be a 2-D table of numbers")
+            self.header = list(columns or ())
+            if len(self.header) != shape[1]:
+                raise IngestError(f"Name the {shape[1]} columns of the array with the columns parameter")
+        self.rows = shape[0]
+        self.dtype = dtype
+
+    def chunks(self, indices):
+        """Yields (None, columns) with a float64 array per input of indices ({input: column index})."""
+        width = self.dtype.itemsize * (1 if self.dtype.names else len(self.header))
+        remaining = self.rows
+        while remaining:
+            count = min(remaining, CHUNK_ROWS)
+            data = _read_exact(self._stream, count * width)
+            if len(data) < count * width:
+                raise IngestError(f"The .npy file ends after {self.rows - remaining + len(data) // width} rows")
+            block = np.frombuffer(data, dtype=self.dtype)
+            if self.dtype.names:
+                columns = {name: block[self.header[i]].astype(np.float64) for name, i in indices.items()}
+            else:
+                block = block.reshape(count, len(self.header))
+                columns = {name: block[:, i].astype(np.float64) for name, i in indices.items()}
+            for values in columns.values():
+                values[~np.isfinite(values)] = np.nan
+            remaining -= count
+            yield None, columns
+
+
+def _read_exact(stream, size):
+    parts = []
+    while size:
+        part = stream.read(size)
+        if not part:
+            break
+        parts.append(part)
+        size -= len(part)
+    return b"".join(parts)
+
+
+def locate(header, required, optional=(), mapping=None):
+    """
+    Column index for each input: the column named in mapping ({input: column}),
+    else the column named like the input. Optional inputs without a column are
+    left out. Raises IngestError naming every required column that is missing.
+    """
+    mapping = mapping or {}
+    positions = {name: i for i, name in enumerate(header)}
+    indices, missing = {}, []
+    for name in list(required) + list(optional):
+        column = mapping.get(name, name)
+        if column in positions:
+            indices[name] = positions[column]
+        elif name in required or name in mapping:
+            missing.append(column)
+    if missing:
+        raise IngestError(f"Missing columns: {', '.join(missing)}")
+    return indices
+
+
+# ------------------------
+# Writers: bytes for each evaluated chunk
+# ------------------------
+def csv_chunk(rows, header, results, names):
+    """The input rows with the result columns appended; undefined results are empty cells."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header is not None:
+        writer.writerow(header + names)
+    cells = [
+        [repr(value) if value == value else "" for value in np.where(np.isfinite(column), column, np.nan).tolist()]
+        for column in results
+    ]
+    writer.writerows(row + list(extra) for row, extra in zip(rows, zip(*cells)))
+    return buffer.getvalue().encode()
+
+
+def npy_header(rows, names):
+    """The .npy header for a structured float64 array of `rows` results, written before the first chunk."""
+    buffer = io.BytesIO()
+    dtype = np.dtype([(name, np.float64) for name in names])
+    np.lib.format.write_array_header_1_0(buffer, {
+        "descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (rows,),
+    })
+    return buffer.getvalue()
+
+
+def npy_chunk(results):
+    return np.column_stack(results).astype(np.float64, copy=False).tobytes()
@@ -0,0 +1,261 @@
+# app/utils/jobs.py
+
+import fcntl
+import json
+import multiprocessing
+import os
+import resource
+import signal
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+
+from app.utils.shared_cache import _alive
+
+ACTIVE = ("queued", "running")
+FINISHED = ("succeeded", "failed", "cancelled")
+START_TIMEOUT = 60  # Seconds a queued job may go without its process reporting in before it counts as failed
+
+
+class CpuLimitExceeded(Exception):
+    pass
+
+
+class JobStore:
+    """
+    Job state kept as small files in one directory, so every worker process
+    (and the job processes themselves) can read and update it:
+
+      <id>.json         status, progress, timestamps, pid, error and result mimetype
+      <id>.result       the result body, once the job succeeds
+      <id>.cancel       present once cancellation was requested
+      slots/<n>.lock    flock()ed by running jobs; the number of files bounds concurrency
+
+    Files are replaced atomically, so readers never see a partial write.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.gettempdir(), "physicalc-jobs")
+        os.makedirs(os.path.join(self.path, "slots"), exist_ok=True)
+
+    def _file(self, job_id, suffix=".json"):
+        if not job_id or not all(c.isalnum() for c in job_id):
+            raise KeyError(job_id)
+        return os.path.join(self.path, job_id + suffix)
+
+    def _write(self, path, data):
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(temporary, path)
+
+    def create(self, kind):
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "progress": 0.0,
+            "created": time.time(),
+            "started": None,
+            "finished": None,
+            "pid": None,
+            "error": None,
+            "mimetype": None,
+        }
+        self._write(self._file(job["id"]), job)
+        return job
+
+    def update(self, job_id, **changes):
+        path = self._file(job_id)
+        with open(path, encoding="utf-8") as f:
+            job = json.load(f)
+        job.update(changes)
+        self._write(path, job)
+        return job
+
+    def get(self, job_id):
+        """Current state of a job, or None. Cancelled and crashed jobs are reported as such."""
+        try:
+            with open(self._file(job_id), encoding="utf-8") as f:
+                job = json.load(f)
+        except (OSError, ValueError, KeyError):
+            return None
+        if job["status"] in ACTIVE:
+            marker = self._file(job_id, ".cancel")
+            if os.path.exists(marker):
+                job.update(status="cancelled", finished=os.path.getmtime(marker))
+            elif job["pid"] and not _alive(job["pid"]):
+                # Killed without reporting back, e.g. by the hard CPU limit or the OOM killer
+                job.update(status="failed", error="Job process exited unexpectedly")
+            elif not job["pid"] and time.time() - job["created"] > START_TIMEOUT:
+                # The process died (or never ran) before recording its pid
+                job.update(status="failed", error="Job process did not start")
+        return job
+
+    def jobs(self):
+        found = []
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                job = self.get(name[:-5])
+                if job is not None:
+                    found.append(job)
+        return sorted(found, key=lambda job: job["created"])
+
+    def save_result(self, job_id, chunks):
+        """Writes the result body from an iterable of bytes, replacing the file only once it is complete."""
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(temporary, self._file(job_id, ".result"))
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def result_path(self, job_id):
+        return self._file(job_id, ".result")
+
+    def cancel(self, job_id):
+        """Marks the job cancelled and stops its process if it is still active."""
+        job = self.get(job_id)
+        if job is None or job["status"] not in ACTIVE:
+            return job
+        open(self._file(job_id, ".cancel"), "w").close()
+        if job["pid"]:
+            try:
+                os.kill(job["pid"], signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        return self.get(job_id)
+
+    def cancelled(self, job_id):
+        return os.path.exists(self._file(job_id, ".cancel"))
+
+    def delete(self, job_id):
+        for suffix in (".json", ".result", ".cancel"):
+            try:
+                os.remove(self._file(job_id, suffix))
+            except FileNotFoundError:
+                pass
+
+    def sweep(self, ttl):
+        """
+        Deletes finished jobs (and their results) more than ttl seconds after they ended,
+        and partial writes (*.tmp) untouched for ttl seconds, left behind by killed processes.
+        """
+        now = time.time()
+        for job in self.jobs():
+            if job["status"] in FINISHED and (job["finished"] or job["created"]) + ttl < now:
+                self.delete(job["id"])
+        for name in os.listdir(self.path):
+            if name.endswith(".tmp"):
+                path = os.path.join(self.path, name)
+                try:
+                    if os.path.getmtime(path) + ttl < now:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass  # Renamed into place or removed by another worker meanwhile
+
+    @contextmanager
+    def slot(self, slots):
+        """Blocks until one of `slots` concurrency slots is free, across all processes."""
+        handles = []
+        try:
+            while True:
+                for index in range(slots):
+                    handle = open(os.path.join(self.path, "slots", f"{index}.lock"), "w")
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        handle.close()
+                        continue
+                    handles.append(handle)
+                    yield index
+                    return
+                time.sleep(0.05)
+        finally:
+            for handle in handles:
+                handle.close()  # Releases the lock
+
+
+class JobRunner:
+    """
+    Starts each job in its own process (forked from a clean fork server where
+    available), so a job can be cancelled or killed on its own without
+    disturbing the web workers. Jobs run at lower CPU priority, wait for one
+    of `concurrency` slots, and are stopped after `cpu_limit` seconds of CPU.
+    """
+
+    def __init__(self, store, concurrency=2, cpu_limit=300, nice=10):
+        self.store = store
+        self.concurrency = concurrency
+        self.cpu_limit = cpu_limit
+        self.nice = nice
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+    def submit(self, kind, target, args):
+        """
+        Records a queued job and starts its process. target(*args, progress=callback)
+        returns (mimetype, iterable of bytes) for the result, calls progress(fraction)
+        as it goes, and raises ValueError with a message for the client on failure.
+        """
+        self._context.active_children()  # Forget job processes that have already exited
+        job = self.store.create(kind)
+        process = self._context.Process(
+            target=_run_job,
+            args=(self.store.path, job["id"], target, args, self.concurrency, self.cpu_limit, self.nice),
+            daemon=False,
+        )
+        try:
+            process.start()
+        except Exception as e:
+            return self.store.update(job["id"], status="failed", finished=time.time(),
+                                     error=f"Job process could not be started: {e}")
+        # Only the job process writes its state from here on, so nothing it reports can be overwritten
+        return job
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _raise_cpu_limit(signum, frame):
+    raise CpuLimitExceeded()
+
+
+def _run_job(path, job_id, target, args, concurrency, cpu_limit, nice):
+    """Entry point of a job process."""
+    store = JobStore(path)
+    store.update(job_id, pid=os.getpid())
+    os.nice(nice)  # Interactive requests keep priority over batch work
+    with store.slot(concurrency):
+        if store.cancelled(job_id):
+            return
+        # SIGXCPU at the soft limit lets the job report the timeout; the hard limit kills it regardless
+        limit = int(_cpu_seconds()) + int(cpu_limit)
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 5))
+        store.update(job_id, status="running", started=time.time(), pid=os.getpid())
+
+        last = [0.0]
+
+        def progress(fraction):
+            now = time.monotonic()
+            if now - last[0] >= 0.2:  # Throttled: at most five status writes a second
+                last[0] = now
+                store.update(job_id, progress=round(float(fraction), 4))
+
+        try:
+            mimetype, chunks = target(*args, progress=progress)
+            store.save_result(job_id, chunks)
+        except CpuLimitExceeded:
+            store.update(job_id, status="failed", finished=time.time(),
+                         error=f"CPU time limit of {cpu_limit} s exceeded")
+        except Exception as e:  # Reported to the client through the job status
+            store.update(job_id, status="failed", finished=time.time(), error=str(e) or type(e).__name__)
+        else:
+            store.update(job_id, status="succeeded", progress=1.0, finished=time.time(), mimetype=mimetype)
@@ -0,0 +1,295 @@
+# app/utils/metrics.py
+
+import bisect
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+
+from flask import current_app, has_request_context, request
+
+from app.utils.shared_cache import _alive
+
+# Histogram bucket upper bounds in seconds; formula routes take tens of microseconds
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "physicalc_requests_total": ("counter", "Requests served, by route, method and status"),
+    "physicalc_request_duration_seconds": ("histogram", "Time until the response is ready (streamed bodies excluded)"),
+    "physicalc_request_phase_seconds": ("histogram", "Time per request phase: validate, compute, serialize"),
+    "physicalc_cpu_seconds_total": ("counter", "Thread CPU time spent serving requests, by blueprint"),
+    "physicalc_errors_total": ("counter", "Error responses by error_handler function and route"),
+}
+
+_request = threading.local()  # Phase timings of the request this thread is serving
+
+
+class Registry:
+    """
+    Counters and histograms for one process. Each thread records into its own
+    shard (plain dicts, so the hot path takes no lock); collect() adds the
+    shards up. With a directory, every worker also writes its totals there
+    (at most once per flush interval) and gather() merges all workers.
+    """
+
+    def __init__(self, path=None, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._shards = []
+        self._shards_lock = threading.Lock()  # Taken once per thread, when its shard is created
+        self._local = threading.local()
+        self._flush_lock = threading.Lock()
+        self._flushed = 0.0
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = ({}, {})
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def count(self, name, labels, value=1):
+        counters = self._shard()[0]
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        histograms = self._shard()[1]
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        histogram[bisect.bisect_left(BUCKETS, seconds)] += 1
+        histogram[-1] += seconds
+
+    def collect(self):
+        """This process's totals: ({(name, labels): value}, {(name, labels): [per-bucket counts..., sum]})."""
+        counters, histograms = {}, {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard_counters, shard_histograms in shards:
+            for key, value in list(shard_counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, values in list(shard_histograms.items()):
+                total = histograms.setdefault(key, [0] * (len(BUCKETS) + 1) + [0.0])
+                for i, value in enumerate(list(values)):
+                    total[i] += value
+        return counters, histograms
+
+    # ------------------------
+    # Sharing across worker processes
+    # ------------------------
+    def maybe_flush(self, now):
+        """Writes this worker's snapshot if the interval has passed; never waits for another thread."""
+        if self.path and now - self._flushed >= self.flush_interval and self._flush_lock.acquire(blocking=False):
+            try:
+                self._flushed = now
+                self.flush()
+            finally:
+                self._flush_lock.release()
+
+    def flush(self):
+        _write(os.path.join(self.path, f"{os.getpid()}.json"), _encode(*self.collect()))
+
+    def gather(self):
+        """Totals over every worker sharing the directory (or this process alone without one)."""
+        if not self.path:
+            return self.collect()
+        self.flush()
+        counters, histograms = {}, {}
+        with open(os.path.join(self.path, "lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)  # Only scrapes take it, while folding dead workers in
+            retired = os.path.join(self.path, "retired.json")
+            snapshots = [retired]
+            dead = []
+            for name in os.listdir(self.path):
+                pid = name[:-5]
+                if name.endswith(".json") and pid.isdigit():
+                    snapshots.append(os.path.join(self.path, name))
+                    if int(pid) != os.getpid() and not _alive(int(pid)):
+                        dead.append(os.path.join(self.path, name))
+            for snapshot in snapshots:
+                _merge(counters, histograms, _read(snapshot))
+            if dead:
+                # Keep their counts (so totals never go down) without keeping their files
+                folded_counters, folded_histograms = {}, {}
+                for snapshot in [retired] + dead:
+                    _merge(folded_counters, folded_histograms, _read(snapshot))
+                _write(retired, _encode(folded_counters, folded_histograms))
+                for snapshot in dead:
+                    os.remove(snapshot)
+        return counters, histograms
+
+
+def _encode(counters, histograms):
+    return {
+        "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+        "histograms": [[name, list(labels), values] for (name, labels), values in histograms.items()],
+    }
+
+
+def _merge(counters, histograms, snapshot):
+    for name, labels, value in snapshot.get("counters", ()):
+        key = (name, tuple(tuple(label) for label in labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, values in snapshot.get("histograms", ()):
+        key = (name, tuple(tuple(label) for label in labels))
+        total = histograms.setdefault(key, [0] * (len(BUCKETS) + 1) + [0.0])
+        for i, value in enumerate(values):
+            total[i] += value
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write(path, data):
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+# ------------------------
+# Request hooks and phase marks
+# ------------------------
+def init_metrics(app):
+    """Installs the request hooks that feed the app's Registry (kept in app.extensions), or does nothing if disabled."""
+    if not app.config['METRICS_ENABLED']:
+        return None
+    registry = app.extensions['physicalc_metrics'] = Registry(
+        app.config['METRICS_DIR'], app.config['METRICS_FLUSH_INTERVAL'],
+    )
+    track_phases(app)
+
+    @app.after_request
+    def record_request(response):
+        phases = getattr(_request, "phases", None)
+        if phases is None:
+            return response
+        now = time.perf_counter()
+        rule = request.url_rule
+        route = rule.rule if rule is not None else "unmatched"  # Unknown paths share one label
+        registry.count("physicalc_requests_total", (
+            ("route", route), ("method", request.method), ("status", str(response.status_code)),
+        ))
+        registry.observe("physicalc_request_duration_seconds", (("route", route),), now - _request.started)
+        for phase, started, ended in phases:
+            registry.observe("physicalc_request_phase_seconds", (("route", route), ("phase", phase)), ended - started)
+        registry.count("physicalc_cpu_seconds_total", (("blueprint", request.blueprint or "app"),),
+                       time.thread_time() - _request.cpu)
+        registry.maybe_flush(now)
+        return response
+
+    return registry
+
+
+def track_phases(app):
+    """Installs (once per app) the hooks that collect the phases of each request, for metrics and tracing."""
+    if 'physicalc_phases' in app.extensions:
+        return
+    app.extensions['physicalc_phases'] = True
+
+    @app.before_request
+    def start_phases():
+        _request.phases = []
+        _request.last = _request.started = time.perf_counter()
+        _request.cpu = time.thread_time()
+
+    @app.teardown_request
+    def end_phases(exc):
+        _request.phases = None
+
+
+def phases():
+    """The current request's phases so far, as (name, start, end) perf_counter() times; None outside tracked requests."""
+    return getattr(_request, "phases", None)
+
+
+def request_started():
+    return _request.started
+
+
+def mark(phase):
+    """Ends a phase of the current request (e.g. "validate" after parsing inputs, "compute" after the formula)."""
+    phases = getattr(_request, "phases", None)
+    if phases is not None:
+        now = time.perf_counter()
+        phases.append((phase, _request.last, now))
+        _request.last = now
+
+
+def add_phase(phase, started):
+    """Records a phase that began at `started` and ends now, such as parse in request.json or serialize in jsonify()."""
+    phases = getattr(_request, "phases", None)
+    if phases is not None:
+        now = time.perf_counter()
+        phases.append((phase, started, now))
+        _request.last = now
+
+
+def count_error(handler):
+    """Counts one error response built by `handler` (a function in error_handler.py)."""
+    if not has_request_context():
+        return
+    registry = current_app.extensions.get('physicalc_metrics')
+    if registry is not None:
+        rule = request.url_rule
+        registry.count("physicalc_errors_total", (
+            ("handler", handler), ("route", rule.rule if rule is not None else "unmatched"),
+        ))
+
+
+# ------------------------
+# Prometheus text format
+# ------------------------
+def gather_text(app):
+    """The exposition text for every worker sharing the app's registry, or None when metrics are disabled."""
+    registry = app.extensions.get('physicalc_metrics')
+    return None if registry is None else render(*registry.gather())
+
+
+def render(counters, histograms):
+    lines = []
+    for name, (kind, description) in HELP.items():
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        else:
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), values):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(values[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,179 @@
+# app/utils/profiler.py
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from app.utils.shared_cache import _alive
+
+MAX_DEPTH = 128  # Frames kept per stack, innermost first; deeper stacks are cut at the root end
+TRUNCATED = "[truncated]"
+
+
+class ProfileBusy(Exception):
+    """A profile is already running in this worker."""
+
+
+class ProfileCooldown(Exception):
+    """Profiles were started too recently; retry_after is in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Wait {retry_after} s before starting another profile")
+        self.retry_after = retry_after
+
+
+class ProfileStore:
+    """
+    Profiles in a directory shared by all workers: <id>.json holds the
+    settings and status, <id>.txt the collapsed stacks once the sampler is
+    done, so any worker can answer for a profile taken in another one.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(tempfile.gettempdir(), "physicalc-profiles")
+        os.makedirs(self.path, exist_ok=True)
+        self._lock = threading.Lock()  # One profile at a time in this worker
+        self._last_started = float("-inf")
+
+    def _file(self, profile_id, extension):
+        if not profile_id.isalnum():
+            raise KeyError(profile_id)
+        return os.path.join(self.path, f"{profile_id}.{extension}")
+
+    def _write(self, path, data):
+        fd, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if isinstance(data, str):
+                f.write(data)
+            else:
+                json.dump(data, f)
+        os.replace(temporary, path)
+
+    def get(self, profile_id):
+        """A profile's description, or None. A running profile whose worker has died is reported as failed."""
+        try:
+            with open(self._file(profile_id, "json"), encoding="utf-8") as f:
+                profile = json.load(f)
+        except (KeyError, OSError, ValueError):
+            return None
+        if profile["status"] == "running" and not _alive(profile["pid"]):
+            profile.update(status="failed", error="The worker exited before the profile finished")
+        return profile
+
+    def sweep(self, ttl):
+        """Deletes profiles (settings and stacks) started more than ttl seconds ago, unless still running."""
+        now = time.time()
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+            profile = self.get(name[:-5])
+            if profile is not None and profile["status"] != "running" and profile["started"] + ttl < now:
+                for extension in ("json", "txt"):
+                    try:
+                        os.remove(self._file(profile["id"], extension))
+                    except FileNotFoundError:
+                        pass
+
+    def stacks(self, profile_id):
+        with open(self._file(profile_id, "txt"), encoding="utf-8") as f:
+            return f.read()
+
+    def start(self, seconds, interval, max_stacks, cooldown, scope="app"):
+        """
+        Samples every other thread of this worker for `seconds` in a background
+        thread and returns the new profile's description. Raises ProfileBusy
+        or ProfileCooldown instead of starting a second one.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfileBusy("A profile is already running in this worker")
+        try:
+            wait = self._last_started + cooldown - time.monotonic()
+            if wait > 0:
+                raise ProfileCooldown(int(wait) + 1)
+            self._last_started = time.monotonic()
+            profile = {
+                "id": uuid.uuid4().hex,
+                "status": "running",
+                "pid": os.getpid(),
+                "seconds": seconds,
+                "interval": interval,
+                "scope": scope,
+                "started": time.time(),
+                "samples": 0,
+                "stacks": 0,
+                "truncated": False,
+                "error": None,
+            }
+            self._write(self._file(profile["id"], "json"), profile)
+            threading.Thread(target=self._run, args=(profile, max_stacks), daemon=True,
+                             name="physicalc-profiler").start()
+            return profile
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def _run(self, profile, max_stacks):
+        try:
+            counts, samples, truncated = sample(profile["seconds"], profile["interval"], max_stacks, profile["scope"])
+            self._write(self._file(profile["id"], "txt"), collapsed(counts))
+            profile.update(status="finished", samples=samples, stacks=len(counts), truncated=truncated)
+        except Exception as e:  # pragma: no cover - reported to whoever polls the profile
+            profile.update(status="failed", error=str(e))
+        try:
+            self._write(self._file(profile["id"], "json"), profile)
+        finally:
+            self._lock.release()
+
+
+def sample(seconds, interval, max_stacks, scope="app"):
+    """
+    Every `interval` seconds, records the stack of each other thread. With
+    scope "app", only stacks passing through the app package are kept (idle
+    server threads are dropped). Returns ({collapsed stack: count}, samples,
+    truncated); stacks beyond `max_stacks` distinct ones are counted under
+    a single [truncated] entry.
+    """
+    me = threading.get_ident()
+    labels = {}
+    counts = {}
+    samples = 0
+    truncated = False
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack, in_app = _stack(frame, labels)
+            if scope == "app" and not in_app:
+                continue
+            if stack not in counts and len(counts) >= max_stacks:
+                stack, truncated = TRUNCATED, True
+            counts[stack] = counts.get(stack, 0) + 1
+        samples += 1
+        time.sleep(interval)
+    return counts, samples, truncated
+
+
+def _stack(frame, labels):
+    names = []
+    in_app = False
+    while frame is not None and len(names) < MAX_DEPTH:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+        names.append(label)
+        in_app = in_app or label.startswith("app.")
+        frame = frame.f_back
+    if frame is not None:
+        names.append(TRUNCATED)
+    return ";".join(reversed(names)), in_app
+
+
+def collapsed(counts):
+    """Brendan Gregg's collapsed format ("root;...;leaf count" per line), as read by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items(), key=lambda item: -item[1]))
@@ -0,0 +1,214 @@
+# app/utils/shared_cache.py
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+MAGIC = b"PCSC"
+VERSION = 1
+
+# Header: magic, version, shards, buckets per shard, ways per bucket, worker rows
+_HEADER = struct.Struct("<4sIIIII")
+_HEADER_SIZE = 4096
+# Worker stats row: pid, hits, misses, stores, evictions (row 0 holds retired workers)
+_WORKER = struct.Struct("<qQQQQ")
+# Slot: seqlock counter, write time (monotonic ns), key digest, value
+_SLOT = struct.Struct("<QQ16sd")
+_SEQ = struct.Struct("<Q")
+_COUNTERS = ("hits", "misses", "stores", "evictions")
+
+
+class SharedResultStore:
+    """
+    A fixed-size hash table of float results in an mmap'd file, shared by every
+    worker process that opens the same path (e.g. a file under /dev/shm).
+
+    The table is split into shards of 'ways'-slot buckets. Reads take no locks:
+    each slot carries a seqlock counter that writers make odd while they update
+    it, so a reader that sees an odd or changed counter treats the slot as a miss.
+    Writers lock only their shard (an fcntl byte-range lock plus a thread lock),
+    and when a bucket is full they overwrite its oldest entry. Memory is fixed at
+    creation time. Each worker keeps its own counters in a stats row of the file,
+    so per-worker and overall statistics need no shared counter updates.
+    """
+
+    def __init__(self, path, slots=65536, shards=16, ways=4, max_workers=64, ttl=None):
+        if slots < shards * ways:
+            raise ValueError("Shared cache needs at least shards * ways slots")
+        self.path = path
+        self.shards = shards
+        self.ways = ways
+        self.buckets_per_shard = slots // (shards * ways)
+        self.max_workers = max_workers
+        self.ttl_ns = int(ttl * 1e9) if ttl else None
+
+        self._workers_offset = _HEADER_SIZE
+        self._slots_offset = self._workers_offset + (max_workers + 1) * _WORKER.size
+        self._lock_offset = self._slots_offset + shards * self.buckets_per_shard * ways * _SLOT.size
+        size = self._lock_offset + shards + 1  # One lockable byte per shard, one for the header
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._thread_locks = [threading.Lock() for _ in range(shards + 1)]
+        with self._locked(shards):
+            header = _HEADER.pack(MAGIC, VERSION, shards, self.buckets_per_shard, ways, max_workers)
+            if os.fstat(self._fd).st_size != size or os.pread(self._fd, _HEADER.size, 0) != header:
+                # New file or different geometry: start from an empty table
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+        self._map = mmap.mmap(self._fd, size)
+        self._pid = None
+        self._row = None
+
+    # ------------------------
+    # Locking and worker rows
+    # ------------------------
+    @contextmanager
+    def _locked(self, index):
+        """Exclusive lock on one shard (or the header when index == shards), across threads and processes."""
+        with self._thread_locks[index]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._lock_offset + index)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._lock_offset + index)
+
+    def _worker_row(self):
+        """Offset of this process's stats row, claimed on first use after each fork."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._row
+
+        with self._locked(self.shards):
+            retired = self._workers_offset
+            free = None
+            for index in range(1, self.max_workers + 1):
+                offset = self._workers_offset + index * _WORKER.size
+                owner, *counters = _WORKER.unpack_from(self._map, offset)
+                if owner == pid:
+                    free = offset
+                    break
+                if owner and _alive(owner):
+                    continue
+                if owner:
+                    # Fold a dead worker's counters into the retired row
+                    _, *totals = _WORKER.unpack_from(self._map, retired)
+                    _WORKER.pack_into(self._map, retired, 0, *(a + b for a, b in zip(totals, counters)))
+                    _WORKER.pack_into(self._map, offset, 0, 0, 0, 0, 0)
+                if free is None:
+                    free = offset
+            if free is not None:
+                owner = _WORKER.unpack_from(self._map, free)[0]
+                if owner != pid:
+                    _WORKER.pack_into(self._map, free, pid, 0, 0, 0, 0)
+        self._pid, self._row = pid, free
+        return free
+
+    def _count(self, name):
+        """Bumps one of this worker's counters; only this process writes its row."""
+        row = self._worker_row()
+        if row is None:
+            return  # More workers than stats rows; serve without counting
+        field = 8 + 8 * _COUNTERS.index(name)
+        value = _SEQ.unpack_from(self._map, row + field)[0]
+        _SEQ.pack_into(self._map, row + field, value + 1)
+
+    # ------------------------
+    # Table access
+    # ------------------------
+    def _locate(self, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+        bucket = int.from_bytes(digest[:8], "little") % (self.shards * self.buckets_per_shard)
+        offset = self._slots_offset + bucket * self.ways * _SLOT.size
+        return digest, bucket % self.shards, offset
+
+    def get(self, key):
+        """Returns the stored float for key, or None. Never blocks."""
+        digest, _, offset = self._locate(key)
+        now = time.monotonic_ns()
+        for way in range(self.ways):
+            slot = offset + way * _SLOT.size
+            seq, stamp, stored, value = _SLOT.unpack_from(self._map, slot)
+            if seq == 0 or seq & 1 or stored != digest:
+                continue
+            if _SEQ.unpack_from(self._map, slot)[0] != seq:
+                continue  # Rewritten while we were reading
+            if self.ttl_ns and now - stamp > self.ttl_ns:
+                break
+            self._count("hits")
+            return value
+        self._count("misses")
+        return None
+
+    def put(self, key, value):
+        """Stores a float result, replacing the oldest entry of a full bucket."""
+        digest, shard, offset = self._locate(key)
+        with self._locked(shard):
+            target, oldest, evicting = None, None, False
+            for way in range(self.ways):
+                slot = offset + way * _SLOT.size
+                seq, stamp, stored, _ = _SLOT.unpack_from(self._map, slot)
+                if seq == 0 or stored == digest:
+                    target, evicting = slot, False
+                    break
+                if oldest is None or stamp < oldest:
+                    target, oldest, evicting = slot, stamp, True
+            seq = _SEQ.unpack_from(self._map, target)[0]
+            _SEQ.pack_into(self._map, target, seq + 1)  # Odd: readers skip the slot
+            _SLOT.pack_into(self._map, target, seq + 1, time.monotonic_ns(), digest, float(value))
+            _SEQ.pack_into(self._map, target, seq + 2)
+        self._count("stores")
+        if evicting:
+            self._count("evictions")
+
+    def clear(self):
+        """Empties the table for every worker; counters are kept."""
+        for shard in range(self.shards):
+            with self._locked(shard):
+                for bucket in range(shard, self.shards * self.buckets_per_shard, self.shards):
+                    start = self._slots_offset + bucket * self.ways * _SLOT.size
+                    self._map[start:start + self.ways * _SLOT.size] = bytes(self.ways * _SLOT.size)
+
+    def stats(self):
+        """Counters for this worker, every live worker, and the total (including retired workers)."""
+        self._worker_row()
+        workers = []
+        total = dict.fromkeys(_COUNTERS, 0)
+        for index in range(self.max_workers + 1):
+            owner, *counters = _WORKER.unpack_from(self._map, self._workers_offset + index * _WORKER.size)
+            for name, value in zip(_COUNTERS, counters):
+                total[name] += value
+            if owner:
+                workers.append({"pid": owner, **dict(zip(_COUNTERS, counters))})
+        used = sum(
+            1 for slot in range(self._slots_offset, self._lock_offset, _SLOT.size)
+            if _SEQ.unpack_from(self._map, slot)[0]
+        )
+        current = next((worker for worker in workers if worker["pid"] == os.getpid()), None)
+        return {
+            "path": self.path,
+            "slots": self.shards * self.buckets_per_shard * self.ways,
+            "used": used,
+            "worker": current,
+            "workers": workers,
+            "total": total,
+        }
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,123 @@
+# app/utils/tracing.py
+
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+
+from flask import request
+
+from app.utils import metrics
+
+
+def init_tracing(app):
+    """
+    Opt-in request tracing (TRACE_ENABLED). Every response gets a Server-Timing
+    header with the request's phases (parse, validate, compute, serialize and
+    total), and every TRACE_SAMPLE_EVERY-th request is appended to this
+    worker's trace file in TRACE_DIR, rotated at TRACE_MAX_BYTES. When
+    disabled no hook is installed.
+    """
+    if not app.config['TRACE_ENABLED']:
+        return None
+    every = app.config['TRACE_SAMPLE_EVERY']
+    writer = app.extensions['physicalc_trace'] = TraceWriter(
+        app.config['TRACE_DIR'] or os.path.join(tempfile.gettempdir(), "physicalc-traces"),
+        max_bytes=app.config['TRACE_MAX_BYTES'], ttl=app.config['TRACE_TTL'],
+    ) if every else None
+    counter = itertools.count(1)
+    metrics.track_phases(app)
+
+    @app.after_request
+    def trace_request(response):
+        phases = metrics.phases()
+        if phases is None:
+            return response
+        started, ended = metrics.request_started(), time.perf_counter()
+        timings = [f"{name};dur={(end - start) * 1000:.3f}" for name, start, end in phases]
+        timings.append(f"total;dur={(ended - started) * 1000:.3f}")
+        response.headers["Server-Timing"] = ", ".join(timings)
+        if writer is not None and next(counter) % every == 0:
+            rule = request.url_rule
+            writer.write(rule.rule if rule is not None else request.path, started, ended, phases, {
+                "method": request.method, "path": request.path, "status": response.status_code,
+            })
+        return response
+
+    return writer
+
+
+class TraceWriter:
+    """
+    Appends sampled requests to <directory>/trace-<pid>.json in the Chrome trace
+    event format: one complete ("X") event for the request and one nested event
+    per phase. The file is a JSON array left open so events can be appended;
+    chrome://tracing, Perfetto and speedscope load it as it is.
+
+    Once the file would grow past max_bytes it is renamed to trace-<pid>.1.json
+    (replacing the previous one) and a new file is started, so each worker keeps
+    at most twice max_bytes. Trace files not written to for ttl seconds, such as
+    those of stopped workers, are deleted at startup and on every rotation.
+    """
+
+    def __init__(self, directory, max_bytes=None, ttl=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()  # Only sampled requests take it
+        self.sweep()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"trace-{os.getpid()}.json")  # After a fork each worker writes its own
+
+    def write(self, name, started, ended, phases, args):
+        pid, tid = os.getpid(), threading.get_ident()
+        events = [_event(name, "request", started, ended, pid, tid, args)]
+        events += [_event(phase, "phase", start, end, pid, tid) for phase, start, end in phases]
+        lines = "".join(json.dumps(event, separators=(",", ":")) + ",\n" for event in events).encode("utf-8")
+        with self._lock:
+            path = self.path
+            if self.max_bytes:
+                try:
+                    size = os.path.getsize(path)
+                except FileNotFoundError:
+                    size = 0
+                if size and size + len(lines) > self.max_bytes:
+                    os.replace(path, path[:-len(".json")] + ".1.json")
+                    self.sweep()
+            with open(path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(b"[\n")
+                f.write(lines)
+
+    def sweep(self):
+        """Deletes trace files in the directory last written more than ttl seconds ago."""
+        if self.ttl is None:
+            return
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.startswith("trace-") and name.endswith(".json"):
+                try:
+                    if os.path.getmtime(os.path.join(self.directory, name)) + self.ttl < now:
+                        os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+def _event(name, category, start, end, pid, tid, args=None):
+    event = {"name": name, "cat": category, "ph": "X", "ts": round(start * 1e6, 3),
+             "dur": round((end - start) * 1e6, 3), "pid": pid, "tid": tid}
+    if args:
+        event["args"] = args
+    return event
+
+
+def read_trace(path):
+    """The events in a trace file written by TraceWriter."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read().rstrip().rstrip(",")
+    return json.loads(text + "]") if text else []
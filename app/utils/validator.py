@@ -1,20 +1,103 @@
 # app/utils/validator.py
 
-from app.utils.error_handler import handle_missing_input_error, handle_invalid_input_error
+import math
+from collections import namedtuple
+from functools import lru_cache
+
+from app.utils.error_handler import handle_validation_error
+
+
+class ValidationError(ValueError):
+    """Raised by Schema.parse with every missing and invalid field found in one pass."""
+
+    def __init__(self, missing=(), invalid=()):
+        self.missing = list(missing)
+        self.invalid = list(invalid)
+        parts = []
+        if self.missing:
+            parts.append(f"Missing required fields: {', '.join(self.missing)}")
+        if self.invalid:
+            parts.append(f"Invalid input: {', '.join(self.invalid)} must be finite numbers")
+        super().__init__("; ".join(parts) or "Invalid input")
+
+
+class Schema:
+    """
+    A request validator compiled once per set of fields.
+
+    parse() walks the fields a single time, converting each value to float as it
+    checks it, and returns a namedtuple of floats in field order (optional fields
+    that are absent or null come back as None). Numbers and numeric strings are accepted;
+    booleans, NaN and infinities are not. All problems are collected and raised
+    together as one ValidationError.
+    """
+
+    def __init__(self, fields, optional_fields=()):
+        self.fields = tuple(fields)
+        self.optional = frozenset(optional_fields)
+        self.values = namedtuple("Values", self.fields, rename=True)
+        self._plan = tuple((field, field in self.optional) for field in self.fields)
+
+    def parse(self, data):
+        if not isinstance(data, dict):
+            raise ValidationError(invalid=["request body"])
+
+        values = []
+        missing = invalid = None
+        for field, optional in self._plan:
+            value = data.get(field)
+            kind = type(value)
+            if kind is float or kind is int:
+                # Fast path for JSON numbers; float(int) can overflow, inf - inf is NaN
+                try:
+                    value = float(value)
+                except OverflowError:
+                    value = math.inf
+                if value - value == 0:
+                    values.append(value)
+                    continue
+            elif value is None:
+                if optional:
+                    values.append(None)
+                    continue
+                missing = missing or []
+                missing.append(field)
+                continue
+            elif kind is str:
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass
+                else:
+                    if value - value == 0:
+                        values.append(value)
+                        continue
+            invalid = invalid or []
+            invalid.append(field)
+
+        if missing or invalid:
+            raise ValidationError(missing or (), invalid or ())
+        return self.values._make(values)
+
+
+def compile_schema(fields, optional_fields=()):
+    """Builds the Schema for one formula once, when its route is registered."""
+    return Schema(fields, optional_fields)
+
+
+@lru_cache(maxsize=256)
+def _cached_schema(fields):
+    return Schema(fields)
+
 
 def validate_inputs(data, required_fields):
     """
     Checks if all required fields exist and are numbers.
     Returns True if valid, otherwise calls the error handler.
+    Kept for existing callers; new code should use compile_schema().parse().
     """
-    for field in required_fields:
-        value = data.get(field)
-        if value is None:  # Check for missing field
-            return handle_missing_input_error([field])  # Return missing field error immediately
-        
-        try:
-            float(value)  # Try to convert to float
-        except (ValueError, TypeError):  # Catch invalid types
-            return handle_invalid_input_error("Invalid input")  # Return invalid input error if conversion fails
-
-    return True  # Return True if all fields are valid
+    try:
+        _cached_schema(tuple(required_fields)).parse(data)
+    except ValidationError as e:
+        return handle_validation_error(e)
+    return True
@@ -0,0 +1,5 @@
+from app.asgi import create_asgi_app
+
+
+# ASGI entry point: gunicorn -k uvicorn_worker.UvicornWorker --workers 4 asgi:app (or uvicorn asgi:app)
+app = create_asgi_app()
@@ -0,0 +1,144 @@
+"""
+Concurrency limits of the WSGI and ASGI deployments, measured over real sockets.
+
+Starts each server as a subprocess, then holds `--idle` client connections
+open without finishing a request (like idle keep-alive or slow clients)
+while `--clients` active clients call /api/kinematics/velocity for
+`--duration` seconds. Sync gunicorn workers serve one connection at a time,
+so once the idle connections outnumber the workers, active requests wait or
+time out; uvicorn workers park idle connections on their event loop.
+
+    python -m benchmarks.concurrency
+    python -m benchmarks.concurrency --server asgi --idle 0,1000 --workers 4
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.harness import summarize
+
+SERVERS = {
+    "wsgi": ["gunicorn", "--workers", "{workers}", "--bind", "127.0.0.1:{port}", "run:app"],
+    "asgi": ["gunicorn", "--workers", "{workers}", "--worker-class", "uvicorn_worker.UvicornWorker",
+             "--bind", "127.0.0.1:{port}", "asgi:app"],
+}
+PATH = "/api/kinematics/velocity"
+PAYLOAD = json.dumps({"u": 0, "a": 9.8, "t": 10})
+
+
+def _free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def start_server(kind, workers):
+    port = _free_port()
+    command = [part.format(workers=workers, port=port) for part in SERVERS[kind]]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(command, cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("POST", PATH, PAYLOAD, {"Content-Type": "application/json"})
+            connection.getresponse().read()
+            connection.close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start: {' '.join(command)}")
+
+
+def open_idle(port, count):
+    """Connections that send part of a request and then go quiet."""
+    sockets = []
+    for _ in range(count):
+        idle = socket.create_connection(("127.0.0.1", port))
+        idle.sendall(b"POST " + PATH.encode() + b" HTTP/1.1\r\nHost: localhost\r\n")
+        sockets.append(idle)
+    return sockets
+
+
+def drive(port, clients, duration, timeout):
+    latencies, failures = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        local, failed = [], 0
+        connection = None
+        while time.perf_counter() < deadline:
+            begin = time.perf_counter()
+            try:
+                if connection is None:
+                    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+                connection.request("POST", PATH, PAYLOAD, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise OSError(response.status)
+                if response.getheader("Connection", "").lower() == "close":
+                    connection.close()
+                    connection = None
+                local.append(time.perf_counter() - begin)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                if connection is not None:
+                    connection.close()
+                connection = None
+        if connection is not None:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+            failures[0] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = summarize(latencies, time.perf_counter() - started)
+    result["failed"] = failures[0]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", action="append", choices=sorted(SERVERS), help="server to test (repeatable, default both)")
+    parser.add_argument("--workers", type=int, default=2, help="worker processes per server")
+    parser.add_argument("--idle", default="0,2,100,1000", help="comma-separated idle connection counts")
+    parser.add_argument("--clients", type=int, default=8, help="active client threads")
+    parser.add_argument("--duration", type=float, default=3.0, help="seconds per measurement")
+    parser.add_argument("--timeout", type=float, default=2.0, help="seconds before an active request counts as failed")
+    args = parser.parse_args(argv)
+
+    print(f"{'server':6} {'idle':>6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'failed':>7}")
+    for kind in args.server or sorted(SERVERS, reverse=True):
+        for idle_count in (int(count) for count in args.idle.split(",")):
+            process, port = start_server(kind, args.workers)
+            idle = open_idle(port, idle_count)
+            try:
+                time.sleep(0.2)
+                metrics = drive(port, args.clients, args.duration, args.timeout)
+            finally:
+                for connection in idle:
+                    connection.close()
+                process.terminate()
+                process.wait()
+            print(f"{kind:6} {idle_count:6d} {metrics['per_second']:9.0f} {metrics['p50_us'] / 1000:9.2f} "
+                  f"{metrics['p99_us'] / 1000:9.2f} {metrics['failed']:7d}")
+            sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
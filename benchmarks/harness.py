@@ -0,0 +1,83 @@
+"""Timing, statistics and baseline comparison shared by every benchmark suite."""
+import json
+import statistics
+import time
+
+
+def percentile(samples, q):
+    """q-th percentile (0-100) of a list of numbers, with linear interpolation."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies, elapsed, rows_per_call=1):
+    """Turns per-call latencies (seconds) into the metrics stored in a baseline."""
+    calls = len(latencies)
+    return {
+        "calls": calls,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+        "mean_us": statistics.fmean(latencies) * 1e6 if latencies else 0.0,
+        "per_second": calls / elapsed if elapsed else 0.0,
+        "rows_per_second": calls * rows_per_call / elapsed if elapsed else 0.0,
+    }
+
+
+def measure(func, duration=0.5, group=1, warmup=10, rows_per_call=1):
+    """
+    Calls func repeatedly for about `duration` seconds.
+    Very fast functions are timed in groups of `group` calls so timer overhead
+    does not dominate; each group contributes one per-call latency sample.
+    """
+    for _ in range(warmup):
+        func()
+    latencies = []
+    started = time.perf_counter()
+    deadline = started + duration
+    while True:
+        begin = time.perf_counter()
+        for _ in range(group):
+            func()
+        end = time.perf_counter()
+        latencies.append((end - begin) / group)
+        if end >= deadline:
+            break
+    elapsed = time.perf_counter() - started
+    result = summarize(latencies, elapsed, rows_per_call)
+    # Grouped samples stand for `group` calls each
+    result["calls"] *= group
+    result["per_second"] *= group
+    result["rows_per_second"] *= group
+    return result
+
+
+def save(results, path):
+    with open(path, "w") as handle:
+        json.dump(results, handle, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(results, baseline, threshold=0.25, metric="p50_us"):
+    """
+    Compares each benchmark's latency metric with the baseline.
+    Returns a list of (name, baseline, current, change) for every benchmark
+    that got slower by more than `threshold` (0.25 = 25%).
+    """
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before or not before.get(metric):
+            continue
+        change = current[metric] / before[metric] - 1
+        if change > threshold:
+            regressions.append((name, before[metric], current[metric], change))
+    return regressions
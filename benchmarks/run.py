@@ -0,0 +1,59 @@
+"""
+Run the PhysiCalc benchmarks and compare them with a stored baseline.
+
+    python -m benchmarks.run                          # all suites, print results
+    python -m benchmarks.run --save-baseline          # store benchmarks/baseline.json
+    python -m benchmarks.run --threshold 0.2          # exit 1 if any p50 got >20% slower
+    python -m benchmarks.run --suite formulas --duration 0.2
+"""
+import argparse
+import os
+import sys
+
+from benchmarks.harness import compare, load, save
+from benchmarks.suites import SUITES
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="suite to run (repeatable, default all)")
+    parser.add_argument("--duration", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--metric", default="p50_us", choices=["p50_us", "p99_us", "mean_us"], help="metric compared with the baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for suite in args.suite or sorted(SUITES):
+        results.update(SUITES[suite](args.duration))
+
+    print(f"{'benchmark':58} {'p50 µs':>10} {'p99 µs':>10} {'calls/s':>12} {'rows/s':>14}")
+    for name, metrics in sorted(results.items()):
+        print(f"{name:58} {metrics['p50_us']:10.2f} {metrics['p99_us']:10.2f} "
+              f"{metrics['per_second']:12.0f} {metrics['rows_per_second']:14.0f}")
+
+    if args.output:
+        save(results, args.output)
+    if args.save_baseline:
+        save(results, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+    regressions = compare(results, load(args.baseline), args.threshold, args.metric)
+    for name, before, after, change in regressions:
+        print(f"REGRESSION {name}: {args.metric} {before:.2f} -> {after:.2f} (+{change:.0%})")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
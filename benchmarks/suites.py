@@ -0,0 +1,142 @@
+"""
+The benchmark levels:
+formulas  - each function in app/formulas, scalar and vectorized
+endpoints - each route through the Flask test client
+json      - the endpoints once per JSON backend (orjson and the stdlib), plus encoding alone
+wsgi      - the full WSGI stack over HTTP under a local threaded load generator
+"""
+import http.client
+import json
+import threading
+import time
+
+import numpy as np
+from werkzeug.serving import make_server
+
+from app import create_app
+from app.formulas.drag import simulate_drag
+from app.formulas.projectile import sample_trajectory
+from app.formulas.registry import FORMULAS
+from app.utils.encoding import orjson
+from benchmarks.harness import measure, summarize
+
+BATCH_ROWS = 100_000
+
+
+def _example_inputs(formula):
+    return {field.name: field.example for field in formula.inputs if field.example is not None}
+
+
+def _arguments(formula, inputs):
+    return [inputs.get(field.name) for field in formula.inputs]
+
+
+def formula_benchmarks(duration):
+    results = {}
+    rng = np.random.default_rng(0)
+    for formula in FORMULAS:
+        name = f"formula.{formula.group}.{formula.name}"
+        args = [float(value) if value is not None else None for value in _arguments(formula, _example_inputs(formula))]
+        results[name] = measure(lambda: formula.func(*args), duration, group=100)
+
+        # Same formula over BATCH_ROWS rows in one vectorized call
+        arrays = [None if value is None else rng.uniform(1, 100, BATCH_ROWS) for value in args]
+        results[f"{name}.vectorized"] = measure(lambda: formula.func(*arrays), duration, rows_per_call=BATCH_ROWS)
+
+    results["formula.projectile.drag"] = measure(lambda: simulate_drag(20.0, 45.0, 0.01), duration)
+    u = rng.uniform(5, 100, 1000)
+    angle = rng.uniform(5, 85, 1000)
+    results["formula.projectile.drag.vectorized"] = measure(lambda: simulate_drag(u, angle, 0.01), duration, rows_per_call=1000)
+    results["formula.projectile.trajectory"] = measure(
+        lambda: sum(len(chunk) for chunk in sample_trajectory(20.0, 45.0, BATCH_ROWS)), duration, rows_per_call=BATCH_ROWS
+    )
+    return results
+
+
+def endpoint_benchmarks(duration, config=None):
+    results = {}
+    client = create_app(config).test_client()
+    for formula in FORMULAS:
+        path = f"/api/{formula.group}/{formula.name}"
+        body = _example_inputs(formula)
+        results[f"endpoint.{formula.group}.{formula.name}"] = measure(lambda: client.post(path, json=body), duration)
+
+    columns = {name: [value] * 1000 for name, value in _example_inputs(FORMULAS[0]).items()}
+    batch_path = f"/api/{FORMULAS[0].group}/{FORMULAS[0].name}/batch"
+    results[f"endpoint.{FORMULAS[0].group}.{FORMULAS[0].name}.batch"] = measure(
+        lambda: client.post(batch_path, json=columns), duration, rows_per_call=1000
+    )
+    results["endpoint.projectile.drag"] = measure(
+        lambda: client.post("/api/projectile/drag", json={"u": 20, "angle": 45, "k": 0.01}), duration
+    )
+    return results
+
+
+def json_benchmarks(duration):
+    """
+    endpoint_benchmarks under each JSON backend, named json.<backend>.endpoint...,
+    and the cost of encoding a 1000- and a BATCH_ROWS-row batch response alone.
+    """
+    results = {}
+    rng = np.random.default_rng(0)
+    bodies = {
+        rows: {"formula": FORMULAS[0].expression, "count": rows, "result": rng.uniform(0, 100, rows).tolist()}
+        for rows in (1000, BATCH_ROWS)
+    }
+    for backend in ("json", "orjson") if orjson is not None else ("json",):
+        config = {"JSON_BACKEND": backend}
+        for name, metrics in endpoint_benchmarks(duration, config).items():
+            results[f"json.{backend}.{name}"] = metrics
+        provider = create_app(config).json
+        for rows, body in bodies.items():
+            results[f"json.{backend}.encode.{rows}"] = measure(lambda: provider.encode(body), duration, rows_per_call=rows)
+    return results
+
+
+def wsgi_benchmarks(duration, concurrency=8, config=None):
+    """Serves create_app() on a local threaded WSGI server and drives it from `concurrency` client threads."""
+    server = make_server("127.0.0.1", 0, create_app(config), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_port
+
+    targets = [("/api/kinematics/velocity", {"u": 0, "a": 9.8, "t": 10}),
+               ("/api/forces/gravitational", {"m1": 5.972e24, "m2": 7.348e22, "r": 384400000})]
+    results = {}
+    try:
+        for path, body in targets:
+            payload = json.dumps(body)
+            latencies = []
+            lock = threading.Lock()
+            deadline = time.perf_counter() + duration
+
+            def client():
+                local = []
+                connection = http.client.HTTPConnection("127.0.0.1", port)
+                while time.perf_counter() < deadline:
+                    begin = time.perf_counter()
+                    connection.request("POST", path, payload, {"Content-Type": "application/json"})
+                    connection.getresponse().read()
+                    local.append(time.perf_counter() - begin)
+                connection.close()
+                with lock:
+                    latencies.extend(local)
+
+            started = time.perf_counter()
+            clients = [threading.Thread(target=client) for _ in range(concurrency)]
+            for worker in clients:
+                worker.start()
+            for worker in clients:
+                worker.join()
+            results[f"wsgi{path.replace('/api', '').replace('/', '.')}"] = summarize(latencies, time.perf_counter() - started)
+    finally:
+        server.shutdown()
+    return results
+
+
+SUITES = {
+    "formulas": formula_benchmarks,
+    "endpoints": endpoint_benchmarks,
+    "json": json_benchmarks,
+    "wsgi": wsgi_benchmarks,
+}
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import pytest
+from app import create_app
+from app.asgi import create_asgi_app
+
+@pytest.fixture
+def asgi_app():
+    return create_asgi_app()
+
+async def request(app, method, path, body=b'', headers=(), query=b'', disconnect=False):
+    """Drives the ASGI app through one request; returns the messages it sent."""
+    # The body arrives in two messages, as it does from a real server
+    incoming = [{'type': 'http.request', 'body': body[:3], 'more_body': True},
+                {'type': 'http.request', 'body': body[3:]}]
+    sent = []
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        if disconnect:
+            return {'type': 'http.disconnect'}
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+             'headers': [(name.encode(), value.encode()) for name, value in headers], 'http_version': '1.1'}
+    await app(scope, receive, send)
+    return sent
+
+def call(app, method, path, body=b'', headers=(), query=b'', disconnect=False):
+    """Runs request() on a fresh event loop; returns (status, headers, body messages)."""
+    sent = asyncio.run(request(app, method, path, body, headers, query, disconnect))
+    start, messages = sent[0], sent[1:]
+    assert start['type'] == 'http.response.start'
+    return start['status'], dict(start['headers']), [message['body'] for message in messages]
+
+JSON = [('Content-Type', 'application/json')]
+
+ORBIT = {
+    'masses': [1.989e30, 5.97e24],
+    'positions': [[0, 0], [1.496e11, 0]],
+    'velocities': [[0, 0], [0, 29780]],
+    'dt': 3600,
+    'steps': 8760,
+    'stride': 2190,
+}
+
+# -------------------------------
+# Same routes and responses as the WSGI app
+# -------------------------------
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/kinematics/velocity', {'u': 1, 'a': 2, 't': 3}),
+    ('/api/kinematics/velocity/batch', {'u': [1, 2], 'a': 2, 't': 3}),
+    ('/api/forces/nbody', {'masses': [1, 1], 'positions': [[0, 0], [1, 0]]}),
+    ('/api/kinematics/velocity', {'u': 1}),
+])
+def test_matches_wsgi(asgi_app, path, body):
+    expected = create_app().test_client().post(path, json=body)
+    status, headers, chunks = call(asgi_app, 'POST', path, json.dumps(body).encode(), JSON)
+    assert status == expected.status_code
+    assert headers[b'content-type'] == expected.headers['Content-Type'].encode()
+    assert b''.join(chunks) == expected.data
+
+
+def test_headers_and_query_reach_the_app(asgi_app):
+    status, headers, chunks = call(asgi_app, 'POST', '/api/kinematics/velocity', b'{"u": 1, "a": 2, "t": 3}',
+                                   JSON + [('Accept', 'application/octet-stream')], query=b'return=minimal')
+    assert headers[b'preference-applied'] == b'return=minimal'
+    assert json.loads(b''.join(chunks)) == {'result': 7.0}
+
+
+def test_unknown_route(asgi_app):
+    status, _, _ = call(asgi_app, 'GET', '/api/nowhere')
+    assert status == 404
+
+
+def test_shared_cache_is_not_used_inline(asgi_app, tmp_path):
+    shared = create_asgi_app({'FORMULA_CACHE_ENABLED': True, 'SHARED_CACHE_PATH': str(tmp_path / 'cache')})
+    assert '/api/kinematics/velocity' in asgi_app.inline_paths
+    assert not shared.inline_paths
+    status, _, chunks = call(shared, 'POST', '/api/kinematics/velocity', b'{"u": 1, "a": 2, "t": 3}', JSON)
+    assert status == 200 and json.loads(b''.join(chunks))['result'] == 7.0
+
+# -------------------------------
+# Streaming through the thread pool
+# -------------------------------
+
+def test_simulation_streams_frame_by_frame(asgi_app):
+    status, headers, chunks = call(asgi_app, 'POST', '/api/simulation/run', json.dumps(ORBIT).encode(), JSON)
+    assert status == 200
+    assert headers[b'x-frame-count'] == b'5'
+    frames = [json.loads(chunk) for chunk in chunks if chunk]
+    assert [frame['step'] for frame in frames] == [0, 2190, 4380, 6570, 8760]
+    assert chunks[-1] == b''
+
+
+def test_stream_with_request_context(asgi_app):
+    """The file route keeps the request context across chunks served by different threads"""
+    status, _, chunks = call(asgi_app, 'POST', '/api/work_energy/kinetic/file', b'mass,velocity\n1,2\n',
+                             [('Content-Type', 'text/csv')])
+    assert status == 200
+    assert b''.join(chunks) == b'mass,velocity,result\n1,2,2.0\n'
+
+
+def test_streams_leave_request_threads_free(tmp_path):
+    """A job's event stream waits in a stream thread, so a single request thread still serves others"""
+    app = create_asgi_app({'ASGI_THREADS': 1, 'JOBS_DIR': str(tmp_path / 'jobs')})
+    client = app.wsgi_app.test_client()
+    long_run = dict(ORBIT, steps=1_000_000, stride=1_000_000)
+    job = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': long_run}).get_json()
+
+    async def run():
+        events = asyncio.create_task(request(app, 'GET', job['links']['events']))
+        await asyncio.sleep(0.5)  # The stream is now polling the job between events
+        batch = await asyncio.wait_for(request(app, 'POST', '/api/kinematics/velocity/batch',
+                                               b'{"u": [1, 2], "a": 2, "t": 3}', JSON), 10)
+        client.delete(f"/api/jobs/{job['id']}")
+        return batch, await asyncio.wait_for(events, 10)
+
+    batch, events = asyncio.run(run())
+    assert batch[0]['status'] == 200
+    assert b'event: end' in b''.join(message.get('body', b'') for message in events)
+
+
+def test_disconnect_stops_stream(asgi_app):
+    long_run = dict(ORBIT, steps=1_000_000, stride=1)
+    status, _, chunks = call(asgi_app, 'POST', '/api/simulation/run', json.dumps(long_run).encode(), JSON, disconnect=True)
+    assert status == 200
+    assert len(chunks) < 100
+
+# -------------------------------
+# Lifespan
+# -------------------------------
+
+def test_lifespan(asgi_app):
+    async def run():
+        incoming = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        await asgi_app({'type': 'lifespan'}, receive, send)
+        return sent
+
+    assert asyncio.run(run()) == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
@@ -0,0 +1,24 @@
+from benchmarks.harness import compare, measure, percentile
+
+# -------------------------------
+# Benchmark harness: percentiles and regression gate
+# -------------------------------
+
+def test_percentile():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50.5
+    assert round(percentile(samples, 99), 2) == 99.01
+
+
+def test_measure_reports_latency_and_throughput():
+    metrics = measure(lambda: sum(range(10)), duration=0.01, group=10)
+    assert metrics['calls'] > 0
+    assert metrics['p50_us'] > 0
+    assert metrics['per_second'] > 0
+
+
+def test_compare_flags_regressions_past_threshold():
+    baseline = {'fast': {'p50_us': 10.0}, 'slow': {'p50_us': 10.0}}
+    results = {'fast': {'p50_us': 11.0}, 'slow': {'p50_us': 15.0}, 'new': {'p50_us': 1.0}}
+    regressions = compare(results, baseline, threshold=0.25)
+    assert [name for name, *_ in regressions] == ['slow']
@@ -0,0 +1,130 @@
+import multiprocessing
+import pytest
+from app import create_app
+from app.formulas.forces import compute_normal_force
+from app.utils.cache import FormulaCache
+from app.utils.shared_cache import SharedResultStore
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+@pytest.fixture
+def app():
+    app = create_app({'FORMULA_CACHE_ENABLED': True, 'FORMULA_CACHE_SIZE': 2, 'ADMIN_TOKEN': 'secret'})
+    return app
+
+# -------------------------------
+# Repeated requests are served from the cache
+# -------------------------------
+
+def test_cache_hits(app):
+    with app.test_client() as client:
+        for _ in range(3):
+            response = client.post('/api/forces/gravitational', json={'m1': 5.97e24, 'm2': 7.35e22, 'r': 3.84e8})
+            assert response.status_code == 200
+        stats = client.get('/api/admin/cache', headers=ADMIN).get_json()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 1
+
+# -------------------------------
+# LRU eviction keeps the cache bounded
+# -------------------------------
+
+def test_cache_eviction(app):
+    with app.test_client() as client:
+        for u in (10, 20, 30):
+            client.post('/api/projectile/range', json={'u': u, 'angle': 45})
+        stats = client.get('/api/admin/cache', headers=ADMIN).get_json()
+        assert stats['size'] == 2
+        assert stats['evictions'] == 1
+
+        client.delete('/api/admin/cache', headers=ADMIN)
+        assert client.get('/api/admin/cache', headers=ADMIN).get_json()['size'] == 0
+
+# -------------------------------
+# Overridden defaults and errors are never confused with cached results
+# -------------------------------
+
+def test_cache_keys_include_defaults():
+    cache = FormulaCache(enabled=True)
+    assert cache.call(compute_normal_force, 10) == 98
+    assert cache.call(compute_normal_force, 10, g=1.62) == 10 * 1.62
+    assert cache.call(compute_normal_force, 10.0, 9.8) == 98
+    assert cache.stats()['hits'] == 1
+
+
+def test_cache_disabled_by_default():
+    app = create_app({'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        client.post('/api/forces/normal', json={'mass': 10})
+        assert client.get('/api/admin/cache', headers=ADMIN).get_json()['misses'] == 0
+
+
+def test_cache_belongs_to_its_app(app):
+    with app.test_client() as client:
+        client.post('/api/forces/normal', json={'mass': 10})
+        create_app({'ADMIN_TOKEN': 'secret'})  # Another app in the same process keeps its own cache
+        client.post('/api/forces/normal', json={'mass': 10})
+        stats = client.get('/api/admin/cache', headers=ADMIN).get_json()
+    assert stats['enabled'] and (stats['hits'], stats['misses']) == (1, 1)
+
+# -------------------------------
+# Admin token protects the stats endpoint
+# -------------------------------
+
+def test_admin_token():
+    app = create_app({'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        assert client.get('/api/admin/cache').status_code == 403
+        assert client.get('/api/admin/cache', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+        assert client.get('/api/admin/cache', headers={'X-Admin-Token': 'secret'}).status_code == 200
+
+def test_admin_closed_without_token():
+    with create_app().test_client() as client:
+        assert client.get('/api/admin/cache').status_code == 404
+        assert client.delete('/api/admin/cache').status_code == 404
+        assert client.post('/api/admin/profile').status_code == 404
+
+# -------------------------------
+# Shared store serves results across worker processes
+# -------------------------------
+
+def test_shared_store_across_processes(tmp_path):
+    path = str(tmp_path / 'cache')
+    store = SharedResultStore(path, slots=1024)
+    key = ('app.formulas.forces', 'compute_normal_force', (10.0, 9.8))
+
+    def worker():
+        SharedResultStore(path, slots=1024).put(key, 98.0)
+
+    process = multiprocessing.get_context('fork').Process(target=worker)
+    process.start()
+    process.join()
+
+    assert store.get(key) == 98.0
+    assert store.get(('other',)) is None
+    stats = store.stats()
+    assert stats['used'] == 1
+    assert stats['total']['stores'] == 1
+    assert stats['worker']['hits'] == 1
+    assert stats['worker']['misses'] == 1
+
+
+def test_shared_store_is_bounded(tmp_path):
+    store = SharedResultStore(str(tmp_path / 'cache'), slots=64, shards=4, ways=4)
+    for value in range(500):
+        store.put(('key', value), float(value))
+    stats = store.stats()
+    assert stats['used'] == 64
+    assert stats['total']['evictions'] == 500 - 64
+
+
+def test_shared_cache_through_app(tmp_path):
+    app = create_app({'FORMULA_CACHE_ENABLED': True, 'SHARED_CACHE_PATH': str(tmp_path / 'cache'), 'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        client.post('/api/forces/normal', json={'mass': 10})
+        cache = app.extensions['physicalc_formula_cache']
+        cache.configure(enabled=True, maxsize=16, shared=cache.shared)  # A fresh local tier
+        response = client.post('/api/forces/normal', json={'mass': 10})
+        assert response.get_json()['result'] == 98
+        stats = client.get('/api/admin/cache', headers=ADMIN).get_json()
+        assert stats['shared']['total']['hits'] == 1
@@ -131,4 +131,78 @@ def test_invalid_input_power(app):
     with app.test_client() as client:
         response = client.post('/api/electricity/power', json={'voltage': 'invalid', 'current': 5})
         assert response.status_code == 400
-        assert 'Invalid input' in response.get_json()['error']
\ No newline at end of file
+        assert 'Invalid input' in response.get_json()['error']
+# -------------------------------
+# DC Circuit (modified nodal analysis)
+# -------------------------------
+
+def test_circuit_voltage_divider(app):
+    with app.test_client() as client:
+        response = client.post('/api/electricity/circuit', json={"elements": [
+            {"type": "voltage_source", "nodes": ["1", "0"], "value": 12},
+            {"type": "resistor", "nodes": ["1", "2"], "value": 100},
+            {"type": "resistor", "name": "Rload", "nodes": ["2", "gnd"], "value": 200},
+        ]})
+        assert response.status_code == 200
+        result = response.json["result"]
+        assert result["node_voltages"] == pytest.approx({"1": 12.0, "2": 8.0})
+        elements = {element["name"]: element for element in result["elements"]}
+        assert elements["R1"]["current"] == pytest.approx(0.04)
+        assert elements["Rload"]["power"] == pytest.approx(0.32)
+        # The source delivers what the resistors absorb
+        assert elements["V1"]["power"] == pytest.approx(-0.48)
+        assert result["total_power"] == pytest.approx(0, abs=1e-12)
+
+def test_circuit_current_source(app):
+    with app.test_client() as client:
+        response = client.post('/api/electricity/circuit', json={"elements": [
+            {"type": "current_source", "nodes": [0, 1], "value": 2},
+            {"type": "resistor", "nodes": [1, 0], "value": 5},
+        ]})
+        assert response.status_code == 200
+        result = response.json["result"]
+        assert result["node_voltages"]["1"] == pytest.approx(10)
+        assert result["elements"][0]["power"] == pytest.approx(-20)
+
+def test_circuit_large_grid():
+    from app.formulas.circuit import solve_circuit
+    # 100 x 100 resistor grid driven corner to corner
+    n = 100
+    node = lambda i, j: f"{i},{j}"
+    elements = [{"type": "voltage_source", "nodes": [node(0, 0), "0"], "value": 1},
+                {"type": "resistor", "nodes": [node(n - 1, n - 1), "0"], "value": 1e-9}]
+    for i in range(n):
+        for j in range(n):
+            if i + 1 < n:
+                elements.append({"type": "resistor", "nodes": [node(i, j), node(i + 1, j)], "value": 1})
+            if j + 1 < n:
+                elements.append({"type": "resistor", "nodes": [node(i, j), node(i, j + 1)], "value": 1})
+    result = solve_circuit(elements)
+    assert len(result["node_voltages"]) == n * n
+    # Symmetry: the middle of the anti-diagonal sits at half the supply
+    assert result["node_voltages"][node(n - 1, 0)] == pytest.approx(0.5, rel=1e-6)
+    assert result["total_power"] == pytest.approx(0, abs=1e-9)
+
+@pytest.mark.parametrize("elements, message", [
+    ([{"type": "resistor", "nodes": ["1", "2"], "value": 1}], "ground"),
+    ([{"type": "resistor", "nodes": ["1", "0"], "value": 0}], "resistance must be positive"),
+    ([{"type": "capacitor", "nodes": ["1", "0"], "value": 1}], "type must be one of"),
+    ([{"type": "resistor", "nodes": ["1"], "value": 1}], "two node names"),
+    ([{"type": "resistor", "nodes": ["1", "0"], "value": "big"}], "finite number"),
+    ([{"type": "resistor", "nodes": ["1", "0"], "value": 1},
+      {"type": "resistor", "nodes": ["2", "3"], "value": 1}], "no unique solution"),
+    ([{"type": "voltage_source", "nodes": ["1", "0"], "value": 1},
+      {"type": "voltage_source", "nodes": ["1", "0"], "value": 2}], "no unique solution"),
+    ([], "non-empty list"),
+])
+def test_circuit_invalid(app, elements, message):
+    with app.test_client() as client:
+        response = client.post('/api/electricity/circuit', json={"elements": elements})
+        assert response.status_code == 400
+        assert message in response.json["error"]
+
+def test_circuit_missing_elements(app):
+    with app.test_client() as client:
+        response = client.post('/api/electricity/circuit', json={})
+        assert response.status_code == 400
+        assert "Missing required fields: elements" in response.json["error"]
@@ -0,0 +1,154 @@
+import msgpack
+import numpy as np
+import pytest
+from app import create_app
+
+@pytest.fixture
+def app():
+    app = create_app()
+    return app
+
+VELOCITY = {'u': 1, 'a': 2, 't': 3}
+
+# -------------------------------
+# Response encodings chosen by Accept
+# -------------------------------
+
+def test_json_stays_the_default(app):
+    with app.test_client() as client:
+        for accept in (None, '*/*', 'application/json, application/msgpack'):
+            headers = {'Accept': accept} if accept else {}
+            response = client.post('/api/kinematics/velocity', json=VELOCITY, headers=headers)
+            assert response.mimetype == 'application/json'
+            assert response.get_json()['result'] == 7.0
+            assert 'Accept' in response.headers['Vary']
+
+
+def test_msgpack_response(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity', json=VELOCITY, headers={'Accept': 'application/msgpack'})
+        assert response.mimetype == 'application/msgpack'
+        assert msgpack.unpackb(response.data) == {
+            'formula': 'v = u + a * t', 'inputs': {'u': 1.0, 'a': 2.0, 't': 3.0}, 'result': 7.0,
+        }
+
+
+def test_float64_batch_response(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity_squared/batch', json={'u': [0, 1], 'a': 9.8, 's': [10, -10]},
+                               headers={'Accept': 'application/octet-stream'})
+        assert response.mimetype == 'application/octet-stream'
+        assert response.headers['X-Columns'] == 'result,final_velocity'
+        assert response.headers['X-Count'] == '2'
+        rows = np.frombuffer(response.data, dtype='<f8').reshape(2, 2)
+        assert rows[0].tolist() == [196.0, 14.0]
+        assert rows[1, 0] == -195.0 and np.isnan(rows[1, 1])  # null becomes NaN
+
+
+def test_float64_points_become_coordinate_columns(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/nbody', json={'masses': [1, 1], 'positions': [[0, 0], [1, 0]]},
+                               headers={'Accept': 'application/octet-stream'})
+        assert response.headers['X-Columns'] == 'result[0],result[1]'
+        assert np.frombuffer(response.data, dtype='<f8').tolist() == [6.6743e-11, 0.0, -6.6743e-11, 0.0]
+
+
+def test_float64_falls_back_to_json(app):
+    """Scalar results and errors have no array to send as rows"""
+    with app.test_client() as client:
+        headers = {'Accept': 'application/octet-stream'}
+        response = client.post('/api/kinematics/velocity', json=VELOCITY, headers=headers)
+        assert response.mimetype == 'application/json'
+        response = client.post('/api/kinematics/velocity/batch', json={'u': [1]}, headers=headers)
+        assert response.status_code == 400
+        assert 'Missing required fields' in response.get_json()['error']
+
+
+def test_swagger_spec_is_not_negotiated(app):
+    with app.test_client() as client:
+        response = client.get('/apispec.json', headers={'Accept': 'application/msgpack'})
+        assert response.mimetype == 'application/json'
+
+# -------------------------------
+# Result-only mode
+# -------------------------------
+
+@pytest.mark.parametrize('url, headers', [
+    ('/api/kinematics/velocity', {'Prefer': 'return=minimal'}),
+    ('/api/kinematics/velocity', {'Prefer': 'respond-async, return=minimal'}),
+    ('/api/kinematics/velocity?return=minimal', {}),
+])
+def test_minimal_drops_echo(app, url, headers):
+    with app.test_client() as client:
+        response = client.post(url, json=VELOCITY, headers=headers)
+        assert response.get_json() == {'result': 7.0}
+        assert response.headers['Preference-Applied'] == 'return=minimal'
+
+
+def test_minimal_msgpack_batch(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity/batch', json={'u': [0, 1], 'a': 2, 't': 3},
+                               headers={'Prefer': 'return=minimal', 'Accept': 'application/msgpack'})
+        assert msgpack.unpackb(response.data) == {'count': 2, 'result': [6.0, 7.0]}
+
+# -------------------------------
+# Binary request bodies
+# -------------------------------
+
+def test_msgpack_request(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity', data=msgpack.packb(VELOCITY),
+                               content_type='application/msgpack')
+        assert response.get_json()['result'] == 7.0
+
+
+def test_float64_batch_request(app):
+    rows = np.array([[0, 9.8, 1], [1, 9.8, 2]], dtype='<f8')
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity/batch', data=rows.tobytes(), headers={
+            'Content-Type': 'application/octet-stream', 'X-Columns': 'u,a,t', 'Accept': 'application/octet-stream',
+        })
+        assert np.frombuffer(response.data, dtype='<f8').tolist() == pytest.approx([9.8, 20.6])
+
+
+@pytest.mark.parametrize('data, headers', [
+    (b'\xc1', {'Content-Type': 'application/msgpack'}),
+    (b'\x00' * 12, {'Content-Type': 'application/octet-stream', 'X-Columns': 'u,a,t'}),
+])
+def test_undecodable_body(app, data, headers):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity/batch', data=data, headers=headers)
+        assert response.status_code == 400
+
+# -------------------------------
+# JSON backends: orjson when installed, the stdlib otherwise
+# -------------------------------
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_non_finite_values_become_null(backend):
+    app = create_app({'JSON_BACKEND': backend})
+    assert app.json.backend == backend
+    body = {'a': float('inf'), 'b': [1.5, float('nan')], 'c': np.array([1.0, -np.inf]), 'd': np.float64(2.0)}
+    assert app.json.loads(app.json.dumps(body)) == {'a': None, 'b': [1.5, None], 'c': [1.0, None], 'd': 2.0}
+
+
+@pytest.mark.parametrize('backend', ['json', 'orjson'])
+def test_backends_answer_alike(backend):
+    with create_app({'JSON_BACKEND': backend}).test_client() as client:
+        response = client.post('/api/kinematics/time/batch', json={'v': [10, 10], 'u': 0, 'a': [2, 0]})
+        assert response.data == b'{"count":2,"formula":"t = (v - u) / a","result":[5.0,null]}\n'
+        response = client.post('/api/electricity/circuit', json={'elements': [
+            {'type': 'voltage_source', 'nodes': ['a', 0], 'value': 10},
+            {'type': 'resistor', 'nodes': ['a', 0], 'value': 5, 'name': 'RΩ'},
+        ]})
+        assert response.get_json()['result']['elements'][1]['name'] == 'RΩ'
+
+
+def test_orjson_falls_back_for_huge_integers(app):
+    assert app.json.dumps({'n': 2 ** 70}) == '{"n":1180591620717411303424}'
+    assert app.json.loads('{"n": 1180591620717411303424}') == {'n': 2 ** 70}
+
+
+def test_unknown_json_backend():
+    with pytest.raises(ValueError, match='JSON_BACKEND must be one of'):
+        create_app({'JSON_BACKEND': 'ujson'})
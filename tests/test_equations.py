@@ -0,0 +1,149 @@
+import pytest
+from app import create_app
+from app.formulas.equations import EQUATIONS
+from app.formulas.symbolic import solve_for
+
+@pytest.fixture
+def app():
+    app = create_app()
+    return app
+
+def examples(equation):
+    """The declared examples, with the first variable recomputed so the set satisfies the equation exactly."""
+    first, *rest = equation.variables
+    values = {variable.name: variable.example for variable in rest}
+    values[first.name] = solve_for(equation.group, equation.name, first.name)(*values.values())[0]
+    return values
+
+# -------------------------------
+# Every variable of every equation
+# -------------------------------
+
+@pytest.mark.parametrize('equation, unknown', [
+    (equation, variable.name) for equation in EQUATIONS for variable in equation.variables[1:]
+], ids=lambda value: getattr(value, 'name', value))
+def test_round_trip(app, equation, unknown):
+    values = examples(equation)
+    body = {name: value for name, value in values.items() if name != unknown}
+    with app.test_client() as client:
+        response = client.post(f'/api/equations/{equation.group}/{equation.name}', json=body)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['unknown'] == unknown
+    assert data['result'] == pytest.approx(values[unknown], rel=1e-9, abs=1e-12)
+    assert data['formula'].startswith(f'{unknown} = ')
+
+
+def test_matches_registry_formulas(app):
+    with app.test_client() as client:
+        solved = client.post('/api/equations/electricity/ohms_law', json={'voltage': 12, 'resistance': 4}).get_json()
+        direct = client.post('/api/electricity/current', json={'voltage': 12, 'resistance': 4}).get_json()
+        assert solved['result'] == direct['result'] == 3.0
+        solved = client.post('/api/equations/kinematics/velocity', json={'v': 50, 'u': 0, 'a': 10}).get_json()
+        direct = client.post('/api/kinematics/time', json={'v': 50, 'u': 0, 'a': 10}).get_json()
+        assert solved['result'] == direct['result'] == 5.0
+        assert solved['formula'] == 't = (-u + v)/a'
+        # Equations with g use the same value as the formulas
+        solved = client.post('/api/equations/projectile/range', json={'u': 20, 'angle': 30}).get_json()
+        direct = client.post('/api/projectile/range', json={'u': 20, 'angle': 30}).get_json()
+        assert solved['result'] == pytest.approx(direct['result'], rel=1e-12)
+
+# -------------------------------
+# Roots
+# -------------------------------
+
+def test_first_time_and_all_roots(app):
+    with app.test_client() as client:
+        # s = u*t + a*t^2/2 with u = 10, a = -2 reaches s = 16 at t = 2 (going up) and t = 8 (coming back)
+        data = client.post('/api/equations/kinematics/displacement', json={'s': 16, 'u': 10, 'a': -2}).get_json()
+        assert data['result'] == pytest.approx(2.0)
+        assert data['solutions'] == pytest.approx([2.0, 8.0])
+        # v may be negative, so both roots are listed; the result is the non-negative one
+        data = client.post('/api/equations/kinematics/velocity_squared', json={'u': 0, 'a': 9.8, 's': 10}).get_json()
+        assert data['result'] == pytest.approx(14.0)
+        assert data['solutions'] == pytest.approx([-14.0, 14.0])
+
+
+def test_zero_coefficient_case(app):
+    # With a = 0 the quadratic's general roots divide by zero; s = u*t still gives t = s/u
+    rows = [{'s': 10, 'u': 2, 'a': 0}, {'s': 16, 'u': 10, 'a': -2}, {'s': 10, 'u': 0, 'a': 0}]
+    with app.test_client() as client:
+        data = client.post('/api/equations/kinematics/displacement', json=rows[0]).get_json()
+        assert data['result'] == 5.0 and data['solutions'] == [5.0]
+        assert data['formula'].endswith('OR t = s/u if a = 0')
+        assert client.post('/api/equations/kinematics/displacement', json=rows[2]).status_code == 400
+        batch = client.post('/api/equations/kinematics/displacement/batch', json=rows).get_json()
+        assert batch['result'][:2] == pytest.approx([5.0, 2.0])
+        assert batch['result'][2] is None
+
+
+def test_no_real_solution(app):
+    with app.test_client() as client:
+        response = client.post('/api/equations/kinematics/velocity_squared', json={'u': 0, 'a': -9.8, 's': 10})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'No real solution for v with these inputs'
+        response = client.post('/api/equations/electricity/ohms_law', json={'voltage': 12, 'resistance': 0})
+        assert response.status_code == 400
+
+# -------------------------------
+# Batch
+# -------------------------------
+
+def test_batch_matches_scalar(app):
+    rows = [{'s': 16, 'u': 10, 'a': -2}, {'s': 490, 'u': 0, 'a': 9.8}, {'s': 30, 'u': 10, 'a': -2}]
+    with app.test_client() as client:
+        batch = client.post('/api/equations/kinematics/displacement/batch', json=rows).get_json()
+        assert batch['unknown'] == 't' and batch['count'] == 3
+        assert batch['result'][:2] == pytest.approx([
+            client.post('/api/equations/kinematics/displacement', json=row).get_json()['result'] for row in rows[:2]
+        ])
+        assert batch['result'][2] is None  # Never reaches s = 30
+
+
+def test_batch_columns_broadcast(app):
+    with app.test_client() as client:
+        data = client.post('/api/equations/electricity/ohms_law/batch',
+                           json={'voltage': [12, 6, 1], 'current': 3}).get_json()
+        assert data['unknown'] == 'resistance'
+        assert data['result'] == pytest.approx([4.0, 2.0, 1 / 3])
+
+# -------------------------------
+# Errors and caching
+# -------------------------------
+
+@pytest.mark.parametrize('body', [
+    {'v': 50, 'u': 0},
+    {'v': 50, 'u': 0, 'a': 9.8, 't': 1},
+])
+def test_exactly_one_unknown(app, body):
+    with app.test_client() as client:
+        for suffix in ('', '/batch'):
+            response = client.post(f'/api/equations/kinematics/velocity{suffix}', json=body)
+            assert response.status_code == 400
+            assert 'Give all but one of v, u, a, t' in response.get_json()['error']
+
+
+def test_invalid_value(app):
+    with app.test_client() as client:
+        response = client.post('/api/equations/kinematics/velocity', json={'v': 'fast', 'u': 0, 'a': 9.8})
+        assert response.status_code == 400
+        assert response.get_json()['invalid'] == ['v']
+
+
+def test_compiled_once(app):
+    solve_for('work_energy', 'power', 'time')
+    before = solve_for.cache_info()
+    with app.test_client() as client:
+        for _ in range(3):
+            client.post('/api/equations/work_energy/power', json={'power': 50, 'work': 500})
+    after = solve_for.cache_info()
+    assert after.hits - before.hits == 3
+    assert after.misses == before.misses
+
+
+def test_list(app):
+    with app.test_client() as client:
+        equations = client.get('/api/equations').get_json()['equations']
+    assert len(equations) == len(EQUATIONS)
+    assert equations[0]['url'] == '/api/equations/kinematics/velocity'
+    assert [variable['name'] for variable in equations[0]['variables']] == ['v', 'u', 'a', 't']
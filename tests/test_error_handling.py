@@ -1,6 +1,7 @@
 import pytest
 from flask import Flask
 from app import create_app
+from app.utils.validator import compile_schema, ValidationError
 
 @pytest.fixture
 def app():
@@ -58,3 +59,42 @@ def test_generic_error(app):
         # Trigger a generic error by posting to a non-existent route
         response = client.post('/api/non_existent_route', json={})
         assert response.status_code == 404  # Expect 404 for non-existent route
+
+# -------------------------------
+# Compiled validator: every error at once, no booleans or non-finite numbers
+# -------------------------------
+
+def test_all_errors_reported_at_once(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/gravitational', json={'m1': 'heavy', 'r': True})
+        data = response.get_json()
+        assert response.status_code == 400
+        assert data['missing'] == ['m2']
+        assert data['invalid'] == ['m1', 'r']
+        assert 'Missing required fields' in data['error']
+        assert 'Invalid input' in data['error']
+
+
+def test_booleans_and_non_finite_rejected(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/normal', json={'mass': True})
+        assert response.status_code == 400
+        response = client.post('/api/forces/normal', json={'mass': 'nan'})
+        assert response.status_code == 400
+        response = client.post('/api/forces/normal', json={'mass': '1e999'})
+        assert response.status_code == 400
+        response = client.post('/api/kinematics/velocity/batch', json={'u': [0, True], 'a': 1, 't': 1})
+        assert response.get_json()['invalid'] == ['u']
+
+
+def test_schema_parse_returns_floats():
+    schema = compile_schema(['u', 'a', 't'])
+    values = schema.parse({'u': 1, 'a': '9.8', 't': 2.5})
+    assert values == (1.0, 9.8, 2.5)
+    assert values.a == 9.8
+    assert all(type(value) is float for value in values)
+
+    with pytest.raises(ValidationError) as error:
+        schema.parse({'u': None, 'a': [], 't': float('inf')})
+    assert error.value.missing == ['u']
+    assert error.value.invalid == ['a', 't']
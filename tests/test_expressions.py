@@ -0,0 +1,223 @@
+import math
+import time
+
+import numpy as np
+import pytest
+from app import create_app
+from app.formulas.expression import ExpressionError, compile_expression
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'EXPRESSIONS_DIR': str(tmp_path / 'expressions'), 'EXPRESSIONS_CACHE_SIZE': 2})
+    return app
+
+ENERGY = {'expression': 'm*g*h + m*v^2/2', 'title': 'Mechanical energy', 'units': {'m': 'kg', 'v': 'm/s'}}
+
+
+def define(client, body):
+    response = client.post('/api/expressions', json=body)
+    assert response.status_code in (200, 201), response.get_json()
+    return response.get_json()['id']
+
+# -------------------------------
+# Parsing and compiling
+# -------------------------------
+
+@pytest.mark.parametrize("source, text", [
+    ('m * v ** 2 / 2', 'm * v^2 / 2'),
+    ('-x^2', '-x^2'),
+    ('(-x)^2', '(-x)^2'),
+    ('a-(b-c)', 'a - (b - c)'),
+    ('(a-b)-c', 'a - b - c'),
+    ('a^b^c', 'a^b^c'),
+    ('(a^b)^c', '(a^b)^c'),
+    ('2 * pi * r', '2 * pi * r'),
+    ('hypot(x, y) + atan2(y,x)', 'hypot(x, y) + atan2(y, x)'),
+])
+def test_normalized_text(source, text):
+    expression = compile_expression(source)
+    assert expression.text == text
+    assert compile_expression(text).text == text
+
+
+def test_precedence_and_functions():
+    assert compile_expression('-x^2').scalar(3.0) == -9.0
+    assert compile_expression('2^3^2 * x').scalar(1.0) == 512.0
+    assert compile_expression('a - b - c').scalar(10.0, 3.0, 2.0) == 5.0
+    assert compile_expression('sqrt(x) + min(x, 2) * 2 * pi').scalar(9.0) == pytest.approx(3 + 4 * math.pi)
+    assert compile_expression('v * t').variables == ('v', 't')
+
+
+def test_scalar_and_vector_agree():
+    expression = compile_expression('u * cos(radians(angle)) * t - k * t^2')
+    u, angle, t = np.array([10.0, 20.0]), np.array([30.0, 60.0]), np.array([1.0, 2.0])
+    vector = expression.vector(u, angle, t, 0.5)
+    scalar = [expression.scalar(*row, 0.5) for row in zip(u, angle, t)]
+    assert vector == pytest.approx(scalar)
+
+
+@pytest.mark.parametrize("source, message", [
+    ('', 'empty'),
+    ('x +', 'ends too early'),
+    ('x y', "Unexpected 'y' at position 3"),
+    ('x.y', "Unexpected character '.'"),
+    ('__import__(x)', 'Unknown function __import__'),
+    ('atan2(x)', 'takes 2 arguments'),
+    ('1 + 2', 'at least one variable'),
+    ('x + 1/0', 'Division by zero'),
+    ('(' * 60 + 'x' + ')' * 60, 'nested more than'),
+    ('x' + ' + x' * 600, 'longer than'),
+])
+def test_rejected_expressions(source, message):
+    with pytest.raises(ExpressionError, match=message):
+        compile_expression(source)
+
+
+def test_long_sums_compile():
+    # Left-deep trees must not turn into deeply nested parentheses in the generated code
+    assert compile_expression(' + '.join(['x'] * 400)).scalar(1.0) == 400.0
+
+# -------------------------------
+# Defining formulas
+# -------------------------------
+
+def test_define_and_describe(app):
+    with app.test_client() as client:
+        response = client.post('/api/expressions', json=ENERGY)
+        data = response.get_json()
+        assert response.status_code == 201
+        assert response.headers['Location'] == data['links']['self']
+        assert data['expression'] == 'm * g * h + m * v^2 / 2'
+        assert data['variables'] == [{'name': 'm', 'unit': 'kg'}, {'name': 'g', 'unit': ''},
+                                     {'name': 'h', 'unit': ''}, {'name': 'v', 'unit': 'm/s'}]
+        assert client.get(data['links']['self']).get_json()['title'] == 'Mechanical energy'
+        listed = client.get('/api/expressions').get_json()
+    assert [definition['id'] for definition in listed['expressions']] == [data['id']]
+    assert 'sqrt' in listed['functions']
+
+
+def test_same_formula_same_id(app):
+    with app.test_client() as client:
+        first = client.post('/api/expressions', json=ENERGY)
+        again = client.post('/api/expressions', json=dict(ENERGY, expression='m * g * h + m * v ** 2 / 2'))
+        retitled = client.post('/api/expressions', json=dict(ENERGY, title='Energy'))
+    assert again.status_code == 200 and again.get_json()['id'] == first.get_json()['id']
+    assert retitled.status_code == 201 and retitled.get_json()['id'] != first.get_json()['id']
+
+
+def test_invalid_definitions(app):
+    with app.test_client() as client:
+        missing = client.post('/api/expressions', json={'title': 'x'})
+        invalid = client.post('/api/expressions', json={'expression': 'sqrt(x'})
+        units = client.post('/api/expressions', json={'expression': 'x * y', 'units': {'z': 'm'}})
+        unknown = client.get('/api/expressions/0123abcd')
+    assert missing.status_code == 400 and 'expression' in missing.get_json()['error']
+    assert invalid.status_code == 400 and 'ends too early' in invalid.get_json()['error']
+    assert units.status_code == 400 and 'z' in units.get_json()['error']
+    assert unknown.status_code == 404
+
+
+def test_store_is_capped(tmp_path):
+    app = create_app({'EXPRESSIONS_DIR': str(tmp_path / 'expressions'), 'EXPRESSIONS_MAX': 2})
+    with app.test_client() as client:
+        define(client, {'expression': 'x * 1'})
+        define(client, {'expression': 'x * 2'})
+        full = client.post('/api/expressions', json={'expression': 'x * 3'})
+        again = client.post('/api/expressions', json={'expression': 'x * 1'})
+    assert full.status_code == 507 and 'At most 2' in full.get_json()['error']
+    assert again.status_code == 200
+
+
+def test_list_pages(app):
+    with app.test_client() as client:
+        ids = []
+        for n in range(1, 6):
+            ids.append(define(client, {'expression': f'x * {n}'}))
+            time.sleep(0.01)  # Listed in the order the files were written
+        first = client.get('/api/expressions?limit=2').get_json()
+        last = client.get('/api/expressions?offset=4&limit=2').get_json()
+        invalid = [client.get(f'/api/expressions?{query}').status_code
+                   for query in ('offset=-1', 'limit=0', 'limit=1001', 'limit=x')]
+    assert [definition['id'] for definition in first['expressions']] == ids[:2]
+    assert first['total'] == 5 and first['links']['next'] == '/api/expressions?offset=2&limit=2'
+    assert [definition['id'] for definition in last['expressions']] == ids[4:]
+    assert last['links'] == {}
+    assert invalid == [400] * 4
+
+# -------------------------------
+# Evaluating formulas
+# -------------------------------
+
+def test_scalar_evaluation(app):
+    with app.test_client() as client:
+        expression_id = define(client, ENERGY)
+        data = client.post(f'/api/expressions/{expression_id}', json={'m': 2, 'g': 9.8, 'h': 10, 'v': '3'}).get_json()
+    assert data['result'] == pytest.approx(205.0)
+    assert data['formula'] == 'm * g * h + m * v^2 / 2'
+    assert data['inputs'] == {'m': 2.0, 'g': 9.8, 'h': 10.0, 'v': 3.0}
+
+
+def test_scalar_errors(app):
+    with app.test_client() as client:
+        energy = define(client, ENERGY)
+        ratio = define(client, {'expression': 'sqrt(x) / y'})
+        invalid = client.post(f'/api/expressions/{energy}', json={'m': 2, 'g': True, 'h': 10})
+        zero = client.post(f'/api/expressions/{ratio}', json={'x': 1, 'y': 0})
+        negative = client.post(f'/api/expressions/{ratio}', json={'x': -1, 'y': 1})
+        unknown = client.post('/api/expressions/0123abcd', json={'x': 1})
+    assert invalid.status_code == 400
+    assert invalid.get_json()['missing'] == ['v'] and invalid.get_json()['invalid'] == ['g']
+    assert zero.status_code == 400 and zero.get_json()['error'] == 'Division by zero'
+    assert negative.status_code == 400 and 'No real result' in negative.get_json()['error']
+    assert unknown.status_code == 404
+
+
+def test_batch_evaluation(app):
+    with app.test_client() as client:
+        energy = define(client, ENERGY)
+        ratio = define(client, {'expression': 'sqrt(x) / y'})
+        columns = client.post(f'/api/expressions/{energy}/batch',
+                              json={'m': [1, 2, 3], 'g': 9.8, 'h': 10, 'v': [0, 1, 2]}).get_json()
+        rows = client.post(f'/api/expressions/{ratio}/batch',
+                           json=[{'x': 4, 'y': 2}, {'x': -1, 'y': 1}, {'x': 1, 'y': 0}]).get_json()
+        missing = client.post(f'/api/expressions/{ratio}/batch', json={'x': [1, 2]})
+    assert columns['count'] == 3
+    assert columns['result'] == pytest.approx([98.0, 197.0, 300.0])
+    assert rows['result'] == [1.0, None, None]
+    assert missing.status_code == 400
+
+
+def test_results_go_through_the_formula_cache(tmp_path):
+    app = create_app({'EXPRESSIONS_DIR': str(tmp_path / 'expressions'), 'FORMULA_CACHE_ENABLED': True})
+    with app.test_client() as client:
+        first = define(client, {'expression': 'x * 2'})
+        second = define(client, {'expression': 'x * 3'})
+        client.post(f'/api/expressions/{first}', json={'x': 5})
+        doubled = client.post(f'/api/expressions/{first}', json={'x': 5}).get_json()
+        tripled = client.post(f'/api/expressions/{second}', json={'x': 5}).get_json()
+    assert app.extensions['physicalc_formula_cache'].stats()['hits'] == 1
+    assert (doubled['result'], tripled['result']) == (10.0, 15.0)
+
+# -------------------------------
+# Compiled-formula cache
+# -------------------------------
+
+def test_evicted_formulas_are_recompiled(app):
+    with app.test_client() as client:
+        ids = [define(client, {'expression': f'x * {n}'}) for n in range(1, 4)]
+        results = [client.post(f'/api/expressions/{expression_id}', json={'x': 2}).get_json()['result']
+                   for expression_id in ids]
+        stats = client.get('/api/expressions').get_json()['cache']
+    assert results == [2.0, 4.0, 6.0]
+    assert stats['size'] == stats['maxsize'] == 2
+    assert stats['evictions'] >= 1 and stats['misses'] >= 1
+
+
+def test_formulas_are_shared_between_workers(tmp_path):
+    # Two apps over the same directory stand in for two workers
+    config = {'EXPRESSIONS_DIR': str(tmp_path / 'expressions')}
+    with create_app(config).test_client() as client:
+        expression_id = define(client, ENERGY)
+    with create_app(config).test_client() as client:
+        data = client.post(f'/api/expressions/{expression_id}', json={'m': 1, 'g': 10, 'h': 1, 'v': 0}).get_json()
+    assert data['result'] == 10.0
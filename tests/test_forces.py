@@ -119,4 +119,161 @@ def test_valid_electromagnetic(app):
 def test_missing_fields_electromagnetic(app):
     with app.test_client() as client:
         response = client.post('/api/forces/electromagnetic', json={'q1': 1e-6})
-        assert response.status_code == 400
\ No newline at end of file
+        assert response.status_code == 400
+# -------------------------------
+# N-body gravity
+# -------------------------------
+
+def test_nbody_two_bodies_match_pair_formula(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/nbody', json={
+            'masses': [5.97e24, 7.35e22], 'positions': [[0, 0, 0], [3.84e8, 0, 0]]})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['inputs']['method'] == 'exact'
+        pair = client.post('/api/forces/gravitational', json={'m1': 5.97e24, 'm2': 7.35e22, 'r': 3.84e8}).get_json()
+        assert data['result'][0] == pytest.approx([pair['result'], 0, 0])
+        assert data['result'][1] == pytest.approx([-pair['result'], 0, 0])
+
+def test_nbody_2d_positions(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/nbody', json={
+            'masses': [1, 1, 1], 'positions': [[0, 0], [1, 0], [0, 1]]})
+        assert response.status_code == 200
+        assert len(response.get_json()['result'][0]) == 2
+
+def test_nbody_barnes_hut_close_to_exact():
+    import numpy as np
+    from app.formulas.nbody import compute_nbody_forces
+    rng = np.random.default_rng(0)
+    masses = rng.uniform(1, 10, 3000)
+    positions = rng.normal(size=(3000, 3))
+    exact = compute_nbody_forces(masses, positions, method='exact')
+    tree = compute_nbody_forces(masses, positions, method='barnes_hut', theta=0.5)
+    error = np.linalg.norm(tree - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 1e-3
+    assert error.max() < 0.05
+    # Newton's third law: internal forces cancel
+    assert np.abs(exact.sum(axis=0)).max() < 1e-12 * np.abs(exact).max() * 3000
+
+def test_nbody_coincident_bodies_are_finite(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/nbody', json={
+            'masses': [1, 1, 1], 'positions': [[0, 0, 0], [0, 0, 0], [1, 0, 0]], 'method': 'barnes_hut'})
+        assert response.status_code == 200
+        assert None not in response.get_json()['result'][0]
+
+@pytest.mark.parametrize("body, message", [
+    ({'masses': [1, 2]}, 'Missing required fields: positions'),
+    ({'masses': [1, 2], 'positions': [[0, 0, 0]]}, 'one [x, y] or [x, y, z] point per mass'),
+    ({'masses': [1, -2], 'positions': [[0, 0, 0], [1, 0, 0]]}, 'Masses cannot be negative'),
+    ({'masses': [1, 'a'], 'positions': [[0, 0, 0], [1, 0, 0]]}, 'must be numbers'),
+    ({'masses': [1, 2], 'positions': [[0, 0, 0], [1, 0, 0]], 'theta': 2}, 'Theta'),
+    ({'masses': [1, 2], 'positions': [[0, 0, 0], [1, 0, 0]], 'method': 'fmm'}, 'method must be one of'),
+])
+def test_nbody_invalid(app, body, message):
+    with app.test_client() as client:
+        response = client.post('/api/forces/nbody', json=body)
+        assert response.status_code == 400
+        assert message in response.get_json()['error']
+
+# -------------------------------
+# Many point charges (Coulomb)
+# -------------------------------
+
+def test_coulomb_pair_matches_pair_formula(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/coulomb', json={
+            'charges': [1e-6, 1e-6], 'positions': [[0, 0, 0], [0.1, 0, 0]]})
+        data = response.get_json()
+        assert response.status_code == 200
+        pair = client.post('/api/forces/electromagnetic', json={'q1': 1e-6, 'q2': 1e-6, 'r': 0.1}).get_json()
+        # Like charges repel
+        assert data['result']['forces'][0] == pytest.approx([-pair['result'], 0, 0])
+        assert data['result']['forces'][1] == pytest.approx([pair['result'], 0, 0])
+        assert data['result']['energy'] == pytest.approx(pair['result'] * 0.1)
+        assert data['result']['pairs'] == 1
+
+def test_coulomb_cutoff_matches_exact_when_it_covers_everything():
+    import numpy as np
+    from app.formulas.coulomb import compute_coulomb_forces
+    rng = np.random.default_rng(0)
+    charges = rng.choice([-1e-9, 1e-9], 500)
+    positions = rng.uniform(0, 1, (500, 3))
+    exact = compute_coulomb_forces(charges, positions)
+    cut = compute_coulomb_forces(charges, positions, cutoff=2.0)
+    assert cut['pairs'] == exact['pairs'] == 500 * 499 // 2
+    assert cut['energy'] == pytest.approx(exact['energy'])
+    assert np.allclose(cut['forces'], exact['forces'], rtol=1e-9, atol=1e-12 * np.abs(exact['forces']).max())
+
+def test_coulomb_cutoff_drops_distant_pairs(app):
+    with app.test_client() as client:
+        response = client.post('/api/forces/coulomb', json={
+            'charges': [1e-6, 1e-6, 1e-6], 'positions': [[0, 0], [0.1, 0], [10, 0]], 'cutoff': 1})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['result']['pairs'] == 1
+        assert data['result']['forces'][2] == [0, 0]
+
+@pytest.mark.parametrize("body, message", [
+    ({'charges': [1, 2]}, 'Missing required fields: positions'),
+    ({'charges': [1, 1], 'positions': [[0, 0, 0], [0, 0, 0]]}, 'softening'),
+    ({'charges': [1, 1], 'positions': [[0, 0, 0], [1, 0, 0]], 'cutoff': -1}, 'Cutoff'),
+    ({'charges': [1, 1], 'positions': [[0, 0, 0], [1, 0, 0]], 'cutoff': 'far'}, 'cutoff must be a number'),
+])
+def test_coulomb_invalid(app, body, message):
+    with app.test_client() as client:
+        response = client.post('/api/forces/coulomb', json=body)
+        assert response.status_code == 400
+        assert message in response.get_json()['error']
+
+def test_nbody_size_limits(app, monkeypatch):
+    from app.formulas import nbody
+    with app.test_client() as client:
+        response = client.post('/api/forces/nbody', json={
+            'masses': [1] * 5001, 'positions': [[i, 0, 0] for i in range(5001)], 'method': 'exact'})
+        assert response.status_code == 400
+        assert 'exact takes at most 5000' in response.get_json()['error']
+        monkeypatch.setattr(nbody, 'MAX_BODIES', 50)
+        response = client.post('/api/forces/nbody', json={
+            'masses': [1] * 51, 'positions': [[i, 0, 0] for i in range(51)], 'method': 'barnes_hut'})
+        assert response.status_code == 400
+        assert 'Too many bodies' in response.get_json()['error']
+
+
+def test_nbody_clustered_bodies(app):
+    import numpy as np
+    from app.formulas.nbody import compute_nbody_forces
+    rng = np.random.default_rng(3)
+    # A cluster far smaller than the deepest octree cell, plus bodies spread around it
+    positions = np.vstack([rng.random((2500, 3)) * 1e-9, rng.random((500, 3)) * 10])
+    masses = rng.random(3000)
+    tree = compute_nbody_forces(masses, positions, 'barnes_hut', theta=0.3, softening=0.1)
+    exact = compute_nbody_forces(masses, positions, 'exact', softening=0.1)
+    assert np.abs(tree - exact).max() <= 1e-4 * np.abs(exact).max()
+    assert not compute_nbody_forces([1] * 3000, [[0, 0, 0]] * 3000, 'barnes_hut').any()
+
+    # Larger dense clusters would be O(N²) in one leaf: refused quickly instead
+    coincident = {'masses': [1] * 20000, 'positions': [[0, 0, 0]] * 20000, 'method': 'barnes_hut'}
+    clustered = {'masses': [1] * 10001, 'positions': (rng.random((10000, 3)) * 1e-9).tolist() + [[1e9, 0, 0]]}
+    with app.test_client() as client:
+        for body in (coincident, clustered):
+            response = client.post('/api/forces/nbody', json=body)
+            assert response.status_code == 400
+            assert 'too close together' in response.get_json()['error']
+
+def test_coulomb_size_limits(app, monkeypatch):
+    from app.formulas import coulomb
+    body = {'charges': [1e-9] * 5001, 'positions': [[i, 0, 0] for i in range(5001)]}
+    with app.test_client() as client:
+        response = client.post('/api/forces/coulomb', json=body)
+        assert response.status_code == 400
+        assert 'give a cutoff' in response.get_json()['error']
+        # Pairs are counted before they are built
+        monkeypatch.setattr(coulomb, 'MAX_PAIRS', 10000)
+        response = client.post('/api/forces/coulomb', json=dict(body, cutoff=1e9))
+        assert response.status_code == 400
+        assert 'smaller cutoff' in response.get_json()['error']
+        response = client.post('/api/forces/coulomb', json=dict(body, cutoff=1.5))
+        assert response.status_code == 200
+        assert response.get_json()['result']['pairs'] == 5000
@@ -0,0 +1,190 @@
+import json
+import os
+import time
+import pytest
+from app import create_app
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'JOBS_DIR': str(tmp_path / 'jobs'), 'JOBS_TTL': 3600})
+    return app
+
+ORBIT = {
+    'masses': [1.989e30, 5.97e24],
+    'positions': [[0, 0], [1.496e11, 0]],
+    'velocities': [[0, 0], [0, 29780]],
+    'dt': 3600,
+    'steps': 8760,
+    'stride': 2190,
+}
+
+def wait_for(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        if job['status'] not in ('queued', 'running'):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+# -------------------------------
+# Submitting and fetching results
+# -------------------------------
+
+def test_job_runs_endpoint_in_background(app):
+    client = app.test_client()
+    response = client.post('/api/jobs', json={
+        'endpoint': '/api/forces/nbody',
+        'body': {'masses': [1e10, 1e10], 'positions': [[0, 0, 0], [1, 0, 0]]},
+    })
+    assert response.status_code == 202
+    job = response.get_json()
+    assert job['status'] == 'queued'
+    assert response.headers['Location'] == job['links']['self']
+
+    finished = wait_for(client, job['id'])
+    assert finished['status'] == 'succeeded'
+    assert finished['progress'] == 1.0
+
+    result = client.get(job['links']['result'])
+    assert result.status_code == 200
+    assert result.mimetype == 'application/json'
+    direct = client.post('/api/forces/nbody', json={'masses': [1e10, 1e10], 'positions': [[0, 0, 0], [1, 0, 0]]})
+    assert result.get_json() == direct.get_json()
+
+def test_simulation_job_keeps_streamed_frames(app):
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': ORBIT}).get_json()
+    assert wait_for(client, job['id'])['status'] == 'succeeded'
+    result = client.get(job['links']['result'])
+    assert result.mimetype == 'application/x-ndjson'
+    frames = [json.loads(line) for line in result.get_data(as_text=True).splitlines()]
+    assert [frame['step'] for frame in frames] == [0, 2190, 4380, 6570, 8760]
+
+def test_invalid_body_fails_job_with_endpoint_error(app):
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/electricity/circuit', 'body': {}}).get_json()
+    finished = wait_for(client, job['id'])
+    assert finished['status'] == 'failed'
+    assert 'Missing required fields' in finished['error']
+    response = client.get(job['links']['result'])
+    assert response.status_code == 409
+    assert response.get_json()['status'] == 'failed'
+
+def test_listing_includes_submitted_jobs(app):
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/forces/coulomb', 'body': {
+        'charges': [1e-6, -1e-6], 'positions': [[0, 0], [1, 0]]}}).get_json()
+    wait_for(client, job['id'])
+    assert job['id'] in [listed['id'] for listed in client.get('/api/jobs').get_json()['jobs']]
+
+def test_events_stream_ends_when_job_finishes(app):
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': ORBIT}).get_json()
+    response = client.get(job['links']['events'])
+    assert response.mimetype == 'text/event-stream'
+    events = response.get_data(as_text=True).strip().split('\n\n')
+    assert events[-1].startswith('event: end')
+    last = json.loads(events[-2].split('data: ', 1)[1])
+    assert last['status'] == 'succeeded'
+
+# -------------------------------
+# Cancellation, limits and expiry
+# -------------------------------
+
+LONG_RUN = dict(ORBIT, steps=1_000_000, stride=1_000_000)
+
+def test_cancel_stops_running_job(app):
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': LONG_RUN}).get_json()
+    time.sleep(0.5)
+    response = client.delete(f"/api/jobs/{job['id']}")
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'cancelled'
+    assert client.get(f"/api/jobs/{job['id']}").get_json()['status'] == 'cancelled'
+    assert client.get(job['links']['result']).status_code == 409
+
+def test_cpu_limit_fails_job(tmp_path):
+    app = create_app({'JOBS_DIR': str(tmp_path / 'jobs'), 'JOBS_CPU_LIMIT': 1})
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': LONG_RUN}).get_json()
+    finished = wait_for(client, job['id'])
+    assert finished['status'] == 'failed'
+    assert 'CPU time limit' in finished['error']
+
+def test_job_inherits_app_config(tmp_path):
+    # A formula defined in this app's EXPRESSIONS_DIR must be visible to the job's own app
+    app = create_app({'JOBS_DIR': str(tmp_path / 'jobs'), 'EXPRESSIONS_DIR': str(tmp_path / 'expressions')})
+    client = app.test_client()
+    expression_id = client.post('/api/expressions', json={'expression': 'x * 2'}).get_json()['id']
+    job = client.post('/api/jobs', json={'endpoint': f'/api/expressions/{expression_id}', 'body': {'x': 4}}).get_json()
+    finished = wait_for(client, job['id'])
+    assert finished['status'] == 'succeeded', finished['error']
+    assert client.get(job['links']['result']).get_json()['result'] == 8.0
+
+def test_job_lifts_simulation_budget(tmp_path):
+    app = create_app({'JOBS_DIR': str(tmp_path / 'jobs'), 'SIMULATION_MAX_WORK': 1000})
+    client = app.test_client()
+    assert client.post('/api/simulation/run', json=ORBIT).status_code == 400
+    job = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': ORBIT}).get_json()
+    assert wait_for(client, job['id'])['status'] == 'succeeded'
+
+def test_job_that_never_starts_fails(app, monkeypatch):
+    from app.utils import jobs
+    store = jobs.JobStore(app.config['JOBS_DIR'])
+    job = store.create('/api/forces/nbody')  # Recorded, but no process ever reports its pid
+    assert store.get(job['id'])['status'] == 'queued'
+    monkeypatch.setattr(jobs, 'START_TIMEOUT', -1)
+    stuck = store.get(job['id'])
+    assert stuck['status'] == 'failed' and 'did not start' in stuck['error']
+
+def test_delete_removes_finished_job(app):
+    client = app.test_client()
+    job = client.post('/api/jobs', json={'endpoint': '/api/forces/nbody', 'body': {
+        'masses': [1, 1], 'positions': [[0, 0], [1, 0]]}}).get_json()
+    wait_for(client, job['id'])
+    assert client.delete(f"/api/jobs/{job['id']}").get_json() == {'deleted': job['id']}
+    assert client.get(f"/api/jobs/{job['id']}").status_code == 404
+
+def test_sweep_removes_stale_partial_files(tmp_path):
+    from app.utils.jobs import JobStore
+
+    store = JobStore(str(tmp_path / 'jobs'))
+    stale, fresh = tmp_path / 'jobs' / 'stale.tmp', tmp_path / 'jobs' / 'fresh.tmp'
+    stale.write_bytes(b'{"partial')
+    fresh.write_bytes(b'{"partial')
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+    store.sweep(3600)
+    assert not stale.exists() and fresh.exists()
+
+def test_pending_limit_returns_429(tmp_path):
+    app = create_app({'JOBS_DIR': str(tmp_path / 'jobs'), 'JOBS_MAX_PENDING': 1})
+    client = app.test_client()
+    first = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': LONG_RUN}).get_json()
+    response = client.post('/api/jobs', json={'endpoint': '/api/simulation/run', 'body': LONG_RUN})
+    assert response.status_code == 429
+    client.delete(f"/api/jobs/{first['id']}")
+
+# -------------------------------
+# Submission errors
+# -------------------------------
+
+@pytest.mark.parametrize('payload, message', [
+    ({}, 'Missing required fields: endpoint'),
+    ({'endpoint': '/api/nowhere'}, 'No POST endpoint at /api/nowhere'),
+    ({'endpoint': '/api/admin/cache'}, 'No POST endpoint at /api/admin/cache'),
+    ({'endpoint': '/api/jobs'}, '/api/jobs cannot be run as a job'),
+    ({'endpoint': 'http://example.com'}, 'endpoint must be an /api/ path, e.g. /api/forces/nbody'),
+    ({'endpoint': '/api/forces/nbody', 'body': 3}, 'body must be a JSON object'),
+])
+def test_invalid_submissions(app, payload, message):
+    response = app.test_client().post('/api/jobs', json=payload)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == message
+
+def test_unknown_job_is_404(app):
+    client = app.test_client()
+    assert client.get('/api/jobs/abc123').status_code == 404
+    assert client.get('/api/jobs/abc123/result').status_code == 404
+    assert client.delete('/api/jobs/abc123').status_code == 404
+    assert client.get('/api/jobs/..%2Fetc').status_code == 404
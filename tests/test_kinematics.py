@@ -48,4 +48,46 @@ def test_acceleration(app):
         response = client.post('/api/kinematics/acceleration', json={'v': 98, 'u': 0, 't': 10})
         data = response.get_json()
         assert response.status_code == 200
-        assert data['result'] == 9.8  # (98 - 0) / 10 = 9.8
\ No newline at end of file
+        assert data['result'] == 9.8  # (98 - 0) / 10 = 9.8
+
+# Test the batch endpoint with an object of arrays
+def test_velocity_batch_columns(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity/batch', json={'u': [0, 5, 10], 'a': 9.8, 't': [10, 10, 0]})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['count'] == 3
+        assert data['result'] == [98, 103, 10]
+
+# Test the batch endpoint with a list of input objects
+def test_displacement_batch_rows(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/displacement/batch', json=[{'u': 0, 'a': 9.8, 't': 10}, {'u': 2, 'a': 0, 't': 3}])
+        data = response.get_json()
+        assert response.status_code == 200
+        assert [round(value, 2) for value in data['result']] == [490.00, 6.00]
+
+# Division by zero inside a batch yields null instead of failing the whole request
+def test_time_batch_zero_acceleration(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/time/batch', json={'v': [98, 10], 'u': [0, 0], 'a': [9.8, 0]})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['result'] == [10, None]
+
+# Test batch validation errors
+def test_batch_errors(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/velocity/batch', json={'u': [0, 1], 'a': [1, 2]})
+        assert response.status_code == 400
+        assert 'Missing required fields' in response.get_json()['error']
+
+        response = client.post('/api/kinematics/velocity/batch', json={'u': [0, 1], 'a': [1, 2, 3], 't': [1, 2]})
+        assert response.status_code == 400
+
+        response = client.post('/api/kinematics/velocity/batch', json={'u': ['x'], 'a': [1], 't': [1]})
+        assert response.status_code == 400
+        assert 'Invalid input' in response.get_json()['error']
+
+        response = client.post('/api/kinematics/jerk/batch', json={})
+        assert response.status_code == 404
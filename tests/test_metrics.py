@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import pytest
+from app import create_app
+from app.utils.metrics import Registry, _encode
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+@pytest.fixture
+def app():
+    app = create_app({'ADMIN_TOKEN': 'secret'})
+    return app
+
+VELOCITY = {'u': 1, 'a': 2, 't': 3}
+
+def samples(text):
+    """The exposition lines as {'name{labels}': value}."""
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if line and not line.startswith('#')}
+
+# -------------------------------
+# Per-route counters and phase histograms
+# -------------------------------
+
+def test_requests_and_phases(app):
+    with app.test_client() as client:
+        for _ in range(3):
+            client.post('/api/kinematics/velocity', json=VELOCITY)
+        response = client.get('/metrics', headers=ADMIN)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        values = samples(response.text)
+    route = 'route="/api/kinematics/velocity"'
+    assert values[f'physicalc_requests_total{{{route},method="POST",status="200"}}'] == 3
+    assert values[f'physicalc_request_duration_seconds_count{{{route}}}'] == 3
+    assert values[f'physicalc_request_duration_seconds_bucket{{{route},le="+Inf"}}'] == 3
+    for phase in ('validate', 'compute', 'serialize'):
+        assert values[f'physicalc_request_phase_seconds_count{{{route},phase="{phase}"}}'] == 3
+    assert values['physicalc_cpu_seconds_total{blueprint="kinematics"}'] > 0
+
+
+def test_buckets_are_cumulative(app):
+    with app.test_client() as client:
+        client.post('/api/kinematics/velocity/batch', json={'u': [0, 1], 'a': 2, 't': 3})
+        text = client.get('/metrics', headers=ADMIN).text
+    counts = [float(line.rsplit(' ', 1)[1]) for line in text.splitlines()
+              if line.startswith('physicalc_request_duration_seconds_bucket{route="/api/kinematics/velocity/batch"')]
+    assert counts == sorted(counts) and counts[-1] == 1
+
+
+def test_errors_by_handler(app):
+    with app.test_client() as client:
+        client.post('/api/kinematics/velocity', json={'u': 1})
+        client.post('/api/kinematics/velocity/batch', json=[1, 2])
+        client.post('/api/kinematics/velocity/batch', json=[1, 2])
+        values = samples(client.get('/metrics', headers=ADMIN).text)
+    assert values['physicalc_errors_total{handler="handle_validation_error",route="/api/kinematics/velocity"}'] == 1
+    assert values['physicalc_errors_total{handler="handle_invalid_input_error",route="/api/kinematics/velocity/batch"}'] == 2
+    assert values['physicalc_requests_total{route="/api/kinematics/velocity",method="POST",status="400"}'] == 1
+
+
+def test_unknown_paths_share_a_label(app):
+    with app.test_client() as client:
+        client.get('/api/nowhere')
+        client.get('/api/elsewhere')
+        values = samples(client.get('/metrics', headers=ADMIN).text)
+    assert values['physicalc_requests_total{route="unmatched",method="GET",status="404"}'] == 2
+
+
+def test_requests_from_many_threads(app):
+    def post():
+        with app.test_client() as client:
+            for _ in range(10):
+                client.post('/api/kinematics/velocity', json=VELOCITY)
+
+    threads = [threading.Thread(target=post) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    values = samples(app.test_client().get('/metrics', headers=ADMIN).text)
+    assert values['physicalc_requests_total{route="/api/kinematics/velocity",method="POST",status="200"}'] == 40
+
+# -------------------------------
+# Access and configuration
+# -------------------------------
+
+def test_admin_token():
+    app = create_app({'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        assert client.get('/metrics').status_code == 403
+        assert client.get('/metrics', headers={'X-Admin-Token': 'secret'}).status_code == 200
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+
+
+def test_closed_without_token():
+    with create_app().test_client() as client:
+        assert client.get('/metrics').status_code == 404
+
+
+def test_disabled():
+    app = create_app({'METRICS_ENABLED': False, 'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        assert client.post('/api/kinematics/velocity', json=VELOCITY).get_json()['result'] == 7.0
+        assert client.get('/metrics', headers=ADMIN).status_code == 404
+
+# -------------------------------
+# Across worker processes
+# -------------------------------
+
+def test_workers_share_a_directory(tmp_path):
+    app = create_app({'METRICS_DIR': str(tmp_path), 'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        client.post('/api/kinematics/velocity', json=VELOCITY)
+
+    # Another live worker (this test's parent process stands in) and one that has exited
+    other = Registry()
+    other.count('physicalc_requests_total', (('route', '/api/kinematics/velocity'), ('method', 'POST'), ('status', '200')), 5)
+    with open(tmp_path / f'{os.getppid()}.json', 'w') as f:
+        json.dump(_encode(*other.collect()), f)
+    with open(tmp_path / '999999999.json', 'w') as f:
+        json.dump(_encode(*other.collect()), f)
+
+    key = 'physicalc_requests_total{route="/api/kinematics/velocity",method="POST",status="200"}'
+    assert samples(app.test_client().get('/metrics', headers=ADMIN).text)[key] == 11
+    # The exited worker's counts are folded into retired.json, so totals never go down
+    assert not (tmp_path / '999999999.json').exists()
+    assert (tmp_path / 'retired.json').exists()
+    assert samples(app.test_client().get('/metrics', headers=ADMIN).text)[key] == 11
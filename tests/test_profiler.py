@@ -0,0 +1,118 @@
+import threading
+import time
+import pytest
+from app import create_app
+
+ADMIN = {'X-Admin-Token': 'secret'}
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'PROFILE_DIR': str(tmp_path), 'PROFILE_COOLDOWN': 0, 'ADMIN_TOKEN': 'secret'})
+    return app
+
+DRAG = {'u': [20, 30, 40] * 5, 'angle': 45, 'k': 0.1}
+
+def wait_for(client, location, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = client.get(location, headers=ADMIN)
+        if response.status_code != 202:
+            return response
+        time.sleep(0.05)
+    raise AssertionError("profile did not finish")
+
+# -------------------------------
+# Sampling a busy worker
+# -------------------------------
+
+def test_profile_covers_routes_and_formulas(app):
+    stop = threading.Event()
+
+    def load():
+        with app.test_client() as client:
+            while not stop.is_set():
+                client.post('/api/projectile/drag/batch', json=DRAG)
+
+    worker = threading.Thread(target=load)
+    worker.start()
+    try:
+        with app.test_client() as client:
+            response = client.post('/api/admin/profile?seconds=0.5&interval=0.005', headers=ADMIN)
+            assert response.status_code == 202
+            assert response.get_json()['status'] == 'running'
+            result = wait_for(client, response.headers['Location'])
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result.status_code == 200
+    assert result.mimetype == 'text/plain'
+    assert int(result.headers['X-Samples']) > 10
+    lines = result.text.splitlines()
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('app.routes.projectile:drag_batch_route' in line for line in lines)
+    assert any('app.formulas.drag:simulate_drag' in line for line in lines)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) >= int(result.headers['X-Stacks'])
+
+
+def test_stack_cap(app):
+    with app.test_client() as client:
+        location = client.post('/api/admin/profile?seconds=0.1&scope=all&interval=0.01', headers=ADMIN).headers['Location']
+        app.config['PROFILE_MAX_STACKS'] = 0
+        result = wait_for(client, location)
+        assert result.status_code == 200
+    # Started before the cap changed
+    assert result.headers['X-Truncated'] == 'false'
+
+    with app.test_client() as client:
+        result = wait_for(client, client.post('/api/admin/profile?seconds=0.1&scope=all', headers=ADMIN).headers['Location'])
+    assert result.headers['X-Truncated'] == 'true'
+    assert result.text.splitlines() == [f"[truncated] {result.text.split()[-1]}"]
+
+# -------------------------------
+# Limits and access
+# -------------------------------
+
+def test_one_profile_at_a_time(app):
+    with app.test_client() as client:
+        location = client.post('/api/admin/profile?seconds=0.5', headers=ADMIN).headers['Location']
+        assert client.post('/api/admin/profile?seconds=0.5', headers=ADMIN).status_code == 409
+        wait_for(client, location)
+
+
+def test_cooldown(tmp_path):
+    app = create_app({'PROFILE_DIR': str(tmp_path), 'PROFILE_COOLDOWN': 3600, 'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        wait_for(client, client.post('/api/admin/profile?seconds=0.05', headers=ADMIN).headers['Location'])
+        response = client.post('/api/admin/profile?seconds=0.05', headers=ADMIN)
+        assert response.status_code == 429
+        assert 0 < int(response.headers['Retry-After']) <= 3600
+
+
+@pytest.mark.parametrize('query', ['seconds=0', 'seconds=61', 'seconds=x', 'interval=0.0001', 'scope=everything'])
+def test_invalid_settings(app, query):
+    with app.test_client() as client:
+        assert client.post(f'/api/admin/profile?{query}', headers=ADMIN).status_code == 400
+
+
+def test_unknown_profile(app):
+    with app.test_client() as client:
+        assert client.get('/api/admin/profile/0123abcd', headers=ADMIN).status_code == 404
+        assert client.get('/api/admin/profile/..', headers=ADMIN).status_code == 404
+
+
+def test_admin_token(tmp_path):
+    app = create_app({'PROFILE_DIR': str(tmp_path), 'ADMIN_TOKEN': 'secret'})
+    with app.test_client() as client:
+        assert client.post('/api/admin/profile?seconds=0.05').status_code == 403
+        assert client.post('/api/admin/profile?seconds=0.05', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+
+def test_old_profiles_are_pruned(app):
+    with app.test_client() as client:
+        old = client.post('/api/admin/profile?seconds=0.05', headers=ADMIN).headers['Location']
+        wait_for(client, old)
+        app.config['PROFILE_TTL'] = 0
+        new = client.post('/api/admin/profile?seconds=0.05', headers=ADMIN).headers['Location']
+        assert client.get(old, headers=ADMIN).status_code == 404
+        assert wait_for(client, new).status_code == 200
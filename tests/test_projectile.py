@@ -1,3 +1,5 @@
+import json
+import numpy as np
 import pytest
 from app import create_app
 
@@ -87,4 +89,125 @@ def test_invalid_input_height(app):
         response = client.post('/api/projectile/height', json={'u': 'high', 'angle': 90})
         assert response.status_code == 400
         # FIX: Expect the standard "Invalid input" from validator
-        assert 'Invalid input' in response.get_json()['error']
\ No newline at end of file
+        assert 'Invalid input' in response.get_json()['error']
+
+# -------------------------------
+# Test for Trajectory sampling
+# -------------------------------
+
+def test_trajectory_ndjson(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/trajectory', json={'u': 20, 'angle': 45, 'samples': 5})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        points = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert len(points) == 5
+        assert points[0] == {'t': 0.0, 'x': 0.0, 'y': 0.0, 'vx': points[0]['vx'], 'vy': points[0]['vy']}
+        assert round(points[-1]['x'], 2) == 40.82  # Lands at the horizontal range
+        assert abs(points[-1]['y']) < 1e-9
+        assert round(points[2]['y'], 2) == 10.20  # Apex at half the flight time
+
+
+def test_trajectory_binary(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/trajectory', json={'u': 20, 'angle': 45, 'samples': 1000, 'format': 'binary'})
+        assert response.status_code == 200
+        rows = np.frombuffer(response.get_data(), dtype='<f8').reshape(-1, 5)
+        assert rows.shape == (1000, 5)
+        assert response.headers['X-Columns'] == 't,x,y,vx,vy'
+
+
+def test_trajectory_sample_cap(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/trajectory', json={'u': 20, 'angle': 45, 'samples': 10_000_000})
+        assert response.status_code == 400
+        response = client.post('/api/projectile/trajectory', json={'u': 20, 'angle': 45, 'samples': 2.5})
+        assert response.status_code == 400
+
+
+@pytest.mark.parametrize('angle', [0, -30, 90.5, 180])
+def test_trajectory_angle_range(app, angle):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/trajectory', json={'u': 20, 'angle': angle})
+        assert response.status_code == 400
+        assert 'angle must be greater than 0 and at most 90' in response.get_json()['error']
+        assert client.post('/api/projectile/trajectory', json={'u': 20, 'angle': 90, 'samples': 3}).status_code == 200
+
+
+# -------------------------------
+# Test for Projectile with Air Drag
+# -------------------------------
+
+def test_drag_without_drag_matches_closed_form(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/drag', json={'u': 20, 'angle': 45, 'k': 0})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert round(data['result']['range'], 4) == 40.8163
+        assert round(data['result']['max_height'], 4) == 10.2041
+        assert round(data['result']['time_of_flight'], 4) == 2.8862
+
+
+def test_drag_shortens_flight(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/drag', json={'u': 20, 'angle': 45, 'k': 0.1, 'model': 'linear'})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['result']['range'] < 40.8163
+        assert data['result']['max_height'] < 10.2041
+
+
+def test_drag_batch(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/drag/batch', json={'u': [20, 20, 0], 'angle': [45, 30, 45], 'k': 0.01})
+        data = response.get_json()
+        assert response.status_code == 200
+        assert data['count'] == 3
+        single = client.post('/api/projectile/drag', json={'u': 20, 'angle': 30, 'k': 0.01}).get_json()
+        assert abs(data['result']['range'][1] - single['result']['range']) < 1e-6
+        assert data['result']['range'][2] == 0
+
+
+def test_drag_invalid_options(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/drag', json={'u': 20, 'angle': 45, 'k': 0.01, 'model': 'cubic'})
+        assert response.status_code == 400
+        response = client.post('/api/projectile/drag', json={'u': 20, 'angle': 45, 'k': -1})
+        assert response.status_code == 400
+        response = client.post('/api/projectile/drag', json={'u': 20, 'angle': 45})
+        assert 'Missing required fields' in response.get_json()['error']
+
+def test_drag_limits(app):
+    with app.test_client() as client:
+        response = client.post('/api/projectile/drag', json={'u': 20, 'angle': 45, 'k': 0.01, 'tol': 1e-300})
+        assert response.status_code == 400
+        assert 'at least 1e-12' in response.get_json()['error']
+        response = client.post('/api/projectile/drag/batch', json={'u': [20] * 10001, 'angle': 45, 'k': 0.01})
+        assert response.status_code == 400
+        assert 'Batch too large' in response.get_json()['error']
+        for body in ({'u': 1e200, 'angle': 45, 'k': 0.01}, {'u': 20, 'angle': 45, 'k': 1e10}):
+            response = client.post('/api/projectile/drag', json=body)
+            assert response.status_code == 400
+            assert 'at most' in response.get_json()['error']
+
+
+def test_drag_failed_rows_are_null(monkeypatch):
+    import warnings
+    from app.formulas import drag
+    # An overflowing launch stops at once instead of stepping until MAX_STEPS
+    monkeypatch.setattr(drag, 'MAX_SPEED', 1e300)
+    monkeypatch.setattr(drag, 'MAX_STEPS', 10 ** 9)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = drag.simulate_drag(np.array([20, 1e200]), 45, 0.01)
+    assert result['range'][0] == pytest.approx(drag.simulate_drag(20, 45, 0.01)['range'])
+    assert np.isnan(result['range'][1]) and np.isnan(result['time_of_flight'][1])
+    with pytest.raises(ValueError, match='did not converge'):
+        drag.simulate_drag(1e200, 45, 0.01)
+
+    # Running out of steps fails only the launches still in the air
+    monkeypatch.setattr(drag, 'MAX_SPEED', 1e4)
+    monkeypatch.setattr(drag, 'MAX_STEPS', 50)
+    with create_app().test_client() as client:
+        data = client.post('/api/projectile/drag/batch', json={'u': [20, 2000], 'angle': 45, 'k': 0.01}).get_json()
+    assert data['result']['range'][0] > 0 and data['result']['range'][1] is None
@@ -0,0 +1,81 @@
+import io
+import numpy as np
+import pytest
+from app import create_app
+from app.formulas.registry import FORMULAS
+
+@pytest.fixture
+def app():
+    app = create_app()
+    return app
+
+# -------------------------------
+# Every registered formula gets a scalar route, a batch route, a file route and Swagger docs
+# -------------------------------
+
+def test_swagger_lists_every_formula(app):
+    with app.test_client() as client:
+        paths = client.get('/apispec.json').get_json()['paths']
+        for formula in FORMULAS:
+            assert f'/api/{formula.group}/{formula.name}' in paths
+            assert f'/api/{formula.group}/{formula.name}/batch' in paths
+            assert f'/api/{formula.group}/{formula.name}/file' in paths
+
+
+@pytest.mark.parametrize('formula', FORMULAS, ids=lambda formula: f'{formula.group}.{formula.name}')
+def test_batch_matches_scalar(app, formula):
+    inputs = {field.name: field.example for field in formula.inputs if field.example is not None}
+    with app.test_client() as client:
+        scalar = client.post(f'/api/{formula.group}/{formula.name}', json=inputs)
+        batch = client.post(f'/api/{formula.group}/{formula.name}/batch', json=[inputs, inputs])
+        assert scalar.status_code == 200
+        assert batch.status_code == 200
+        assert batch.get_json()['result'] == [scalar.get_json()['result']] * 2
+        for extra in formula.extras:
+            assert batch.get_json()[extra.name] == [scalar.get_json()[extra.name]] * 2
+
+@pytest.mark.parametrize('formula', FORMULAS, ids=lambda formula: f'{formula.group}.{formula.name}')
+def test_file_matches_batch(app, formula):
+    inputs = {field.name: field.example for field in formula.inputs if field.example is not None}
+    names = list(inputs)
+    with app.test_client() as client:
+        batch = client.post(f'/api/{formula.group}/{formula.name}/batch', json=[inputs, inputs]).get_json()
+        outputs = ['result'] + [extra.name for extra in formula.extras]
+
+        csv = ",".join(names) + "\n" + (",".join(repr(float(inputs[name])) for name in names) + "\n") * 2
+        response = client.post(f'/api/{formula.group}/{formula.name}/file', data=csv, content_type='text/csv')
+        assert response.status_code == 200
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0].split(',') == names + outputs
+        for line in lines[1:]:
+            cells = line.split(',')[len(names):]
+            assert [float(cell) for cell in cells] == [batch[output][0] for output in outputs]
+
+        table = np.zeros(2, dtype=[(name, np.float64) for name in names])
+        for name in names:
+            table[name] = inputs[name]
+        buffer = io.BytesIO()
+        np.save(buffer, table)
+        response = client.post(f'/api/{formula.group}/{formula.name}/file', data=buffer.getvalue(),
+                               content_type='application/x-npy')
+        assert response.status_code == 200
+        results = np.load(io.BytesIO(response.data))
+        for output in outputs:
+            assert results[output].tolist() == batch[output]
+
+# -------------------------------
+# Errors raised by the formulas map to 400 responses
+# -------------------------------
+
+def test_formula_errors(app):
+    with app.test_client() as client:
+        response = client.post('/api/kinematics/time', json={'v': 10, 'u': 0, 'a': 0})
+        assert response.status_code == 400
+        assert 'Division by zero' in response.get_json()['error']
+
+        response = client.post('/api/work_energy/power', json={'work': 10, 'time': 0})
+        assert response.status_code == 400
+        assert 'Time cannot be zero' in response.get_json()['error']
+
+        response = client.post('/api/electricity/current/batch', json={'voltage': [12, 12], 'resistance': [4, 0]})
+        assert response.get_json()['result'] == [3, None]
@@ -0,0 +1,114 @@
+import json
+import pytest
+from app import create_app
+from app.formulas.simulation import Particles, energies, simulate
+
+@pytest.fixture
+def app():
+    app = create_app()
+    return app
+
+ORBIT = {
+    'masses': [1.989e30, 5.97e24],
+    'positions': [[0, 0], [1.496e11, 0]],
+    'velocities': [[0, 0], [0, 29780]],
+    'dt': 3600,
+    'steps': 8760,
+    'stride': 2190,
+}
+
+# -------------------------------
+# Velocity Verlet integration
+# -------------------------------
+
+def test_orbit_conserves_energy():
+    particles = Particles(ORBIT['masses'], ORBIT['positions'], ORBIT['velocities'])
+    frames = [
+        (frame['step'], frame['positions'][1].copy(), frame['kinetic'] + frame['potential'])
+        for frame in simulate(particles, ORBIT['dt'], ORBIT['steps'], ORBIT['stride'])
+    ]
+    assert [step for step, _, _ in frames] == [0, 2190, 4380, 6570, 8760]
+    energy = frames[0][2]
+    assert all(abs(total - energy) < 1e-9 * abs(energy) for _, _, total in frames)
+    # After a year the Earth is back near its starting point
+    assert abs(frames[-1][1][0] - 1.496e11) < 0.01 * 1.496e11
+
+def test_uniform_field_matches_kinematics():
+    particles = Particles([2], [[0, 0]], [[10, 10]])
+    last = list(simulate(particles, 0.1, 20, stride=20, laws=(), field=[0, -9.8]))[-1]
+    # s = u * t + 0.5 * a * t^2 at t = 2 s is exact under Verlet for constant acceleration
+    assert last['positions'][0] == pytest.approx([20, 10 * 2 - 0.5 * 9.8 * 4])
+    assert last['kinetic'] + last['potential'] == pytest.approx(0.5 * 2 * 200)
+
+def test_last_step_always_emitted():
+    particles = Particles([1, 1], [[0, 0], [1, 0]], [[0, 0], [0, 0]])
+    steps = [frame['step'] for frame in simulate(particles, 0.1, 5, stride=2, softening=0.1)]
+    assert steps == [0, 2, 4, 5]
+
+def test_frame_energies_match_energies():
+    charged = dict(charges=[1e-6, -2e-6, 3e-6])
+    particles = Particles([1, 2, 3], [[0, 0], [1, 0], [0, 2]], [[0, 1], [1, 0], [0, 0]], **charged)
+    for frame in simulate(particles, 0.01, 7, stride=3, laws=('gravity', 'coulomb'), softening=0.1, field=[0, -9.8]):
+        at_frame = Particles([1, 2, 3], frame['positions'], frame['velocities'], **charged)
+        expected = energies(at_frame, ('gravity', 'coulomb'), 0.1, [0, -9.8])
+        assert (frame['kinetic'], frame['potential']) == pytest.approx(expected, rel=1e-12)
+
+# -------------------------------
+# Streaming endpoint
+# -------------------------------
+
+def test_run_ndjson(app):
+    with app.test_client() as client:
+        response = client.post('/api/simulation/run', json=ORBIT)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.headers['X-Frame-Count'] == '5'
+        frames = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [frame['step'] for frame in frames] == [0, 2190, 4380, 6570, 8760]
+        assert frames[0]['positions'] == ORBIT['positions']
+
+def test_run_sse(app):
+    with app.test_client() as client:
+        response = client.post('/api/simulation/run', json=ORBIT, headers={'Accept': 'text/event-stream'})
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        events = response.get_data(as_text=True).strip().split('\n\n')
+        assert len(events) == 6
+        assert events[0].startswith('id: 0\nevent: frame\ndata: {')
+        assert events[-1] == 'event: end\ndata: {}'
+
+def test_run_coulomb_repels(app):
+    with app.test_client() as client:
+        response = client.post('/api/simulation/run', json={
+            'masses': [1e-3, 1e-3], 'charges': [1e-6, 1e-6], 'forces': ['coulomb'],
+            'positions': [[0, 0, 0], [0.1, 0, 0]], 'velocities': [[0, 0, 0], [0, 0, 0]],
+            'dt': 1e-4, 'steps': 100, 'stride': 100})
+        frames = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert frames[-1]['positions'][0][0] < 0 < 0.1 < frames[-1]['positions'][1][0]
+
+@pytest.mark.parametrize("changes, message", [
+    ({'steps': 10_000_000}, 'steps must be between'),
+    ({'steps': 2.5}, 'steps must be an integer'),
+    ({'dt': 0}, 'Time step must be positive'),
+    ({'dt': None}, 'dt must be a number'),
+    ({'forces': ['coulomb']}, 'Coulomb forces need charges'),
+    ({'forces': ['magnetism']}, 'forces must be a list'),
+    ({'velocities': [[0, 0]]}, 'velocities must have the same shape'),
+    ({'masses': [1, 0]}, 'Masses must be positive'),
+    ({'masses': [1] * 30000, 'positions': [[0, 0]] * 30000}, 'At most 1000 particles'),
+    ({'field': [0, 0, 1]}, 'field must be one'),
+    ({'format': 'xml'}, "format must be 'ndjson' or 'sse'"),
+    ({'masses': [1] * 1000, 'positions': [[i, 0] for i in range(1000)], 'velocities': [[0, 0]] * 1000,
+      'steps': 1000}, 'POST /api/jobs'),
+])
+def test_run_invalid(app, changes, message):
+    with app.test_client() as client:
+        response = client.post('/api/simulation/run', json={**ORBIT, **changes})
+        assert response.status_code == 400
+        assert message in response.get_json()['error']
+
+def test_run_missing_fields(app):
+    with app.test_client() as client:
+        response = client.post('/api/simulation/run', json={'masses': [1]})
+        assert response.status_code == 400
+        assert 'Missing required fields: positions, velocities, dt, steps' in response.get_json()['error']
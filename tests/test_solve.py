@@ -0,0 +1,114 @@
+import pytest
+from app import create_app
+from app.formulas.planner import plan
+
+@pytest.fixture
+def app():
+    app = create_app()
+    return app
+
+# A 10 kg block pushed with 50 N against friction (μ = 0.3), from rest, for 4 s
+BLOCK = {'mass': 10, 'mu': 0.3, 'applied_force': 50, 'u': 0, 't': 4}
+
+# -------------------------------
+# Chains across forces, kinematics and work & energy
+# -------------------------------
+
+def test_friction_to_displacement(app):
+    with app.test_client() as client:
+        data = client.post('/api/solve', json={'knowns': BLOCK, 'target': 's'}).get_json()
+    assert [step['quantity'] for step in data['steps']] == ['normal_force', 'friction', 'net_force', 'a', 's']
+    assert [step['equation'] for step in data['steps']] == [
+        'forces/normal', 'forces/friction', 'forces/net', 'forces/newton_second', 'kinematics/displacement']
+    assert data['values']['friction'] == pytest.approx(29.4)
+    assert data['values']['a'] == pytest.approx(2.06)
+    assert data['result'] == pytest.approx(0.5 * 2.06 * 16)
+    assert data['steps'][3]['formula'] == 'a = net_force/mass'
+    assert data['steps'][3]['inputs'] == {'net_force': pytest.approx(20.6), 'mass': 10.0}
+
+
+def test_balanced_forces_constant_velocity(app):
+    # Friction cancels the applied force, so a = 0 and s = u*t: 10 m at 2 m/s takes 5 s
+    knowns = {'mass': 10, 'mu': 0.5, 'applied_force': 49, 'u': 2, 's': 10}
+    with app.test_client() as client:
+        data = client.post('/api/solve', json={'knowns': knowns, 'target': 't'}).get_json()
+    assert data['values']['net_force'] == pytest.approx(0.0) and data['values']['a'] == pytest.approx(0.0)
+    assert data['steps'][-1]['equation'] == 'kinematics/displacement'
+    assert data['result'] == pytest.approx(5.0)
+
+
+def test_into_work_and_energy(app):
+    with app.test_client() as client:
+        work = client.post('/api/solve', json={'knowns': BLOCK, 'target': 'work'}).get_json()
+        energy = client.post('/api/solve', json={'knowns': BLOCK, 'target': 'kinetic_energy'}).get_json()
+    # Work by the net force equals the kinetic energy gained from rest
+    assert work['result'] == pytest.approx(energy['result'])
+    assert 'v' in energy['values'] and 'work' not in energy['values']
+
+
+def test_only_needed_steps(app):
+    with app.test_client() as client:
+        data = client.post('/api/solve', json={'knowns': {'mass': 10, 'a': 2}, 'target': 'net_force'}).get_json()
+    assert [step['equation'] for step in data['steps']] == ['forces/newton_second']
+    assert data['result'] == 20.0
+
+
+def test_target_already_known(app):
+    with app.test_client() as client:
+        data = client.post('/api/solve', json={'knowns': {'mass': 10}, 'target': 'mass'}).get_json()
+    assert data['result'] == 10.0 and data['steps'] == []
+
+# -------------------------------
+# Plan cache
+# -------------------------------
+
+def test_plan_cached_per_shape(app):
+    plan.cache_clear()
+    with app.test_client() as client:
+        for mass in (10, 20, 30):
+            client.post('/api/solve', json={'knowns': dict(BLOCK, mass=mass), 'target': 's'})
+        client.post('/api/solve', json={'knowns': BLOCK, 'target': 'v'})
+    info = plan.cache_info()
+    assert (info.misses, info.hits) == (2, 2)
+
+# -------------------------------
+# Errors
+# -------------------------------
+
+@pytest.mark.parametrize('body, message', [
+    ({'knowns': {'mass': 10}, 'target': 's'}, 'Cannot derive s from mass (derivable: normal_force, weight)'),
+    ({'knowns': {'mass': 10, 'height': 2}, 'target': 'warp'}, 'Unknown quantities: warp'),
+    ({'knowns': {'mass': 10, 'weight': 5}, 'target': 'weight'},
+     'Overdetermined: mass, weight can each be derived from the other knowns; leave some out'),
+    ({'knowns': dict(BLOCK, a=2), 'target': 's'},
+     'Overdetermined: a, applied_force, mu can each be derived from the other knowns; leave some out'),
+    ({'knowns': [10], 'target': 's'}, 'Invalid input: knowns must be an object and target a quantity name'),
+    ({'knowns': {'mass': 10}}, 'Missing required fields: target'),
+])
+def test_invalid_requests(app, body, message):
+    with app.test_client() as client:
+        response = client.post('/api/solve', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == message
+
+
+def test_invalid_values(app):
+    with app.test_client() as client:
+        response = client.post('/api/solve', json={'knowns': dict(BLOCK, mu='rough'), 'target': 's'})
+    assert response.status_code == 400
+    assert response.get_json()['invalid'] == ['mu']
+
+
+def test_step_without_solution(app):
+    with app.test_client() as client:
+        # Stopping distance: decelerating from 5 m/s at 1 m/s^2 never covers 20 m
+        response = client.post('/api/solve', json={'knowns': {'u': 5, 'a': -1, 's': 20}, 'target': 't'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'kinematics/displacement: No real solution for t with these inputs'
+
+
+def test_list_quantities(app):
+    with app.test_client() as client:
+        quantities = {item['name']: item for item in client.get('/api/solve').get_json()['quantities']}
+    assert quantities['net_force']['unit'] == 'N'
+    assert {'mass', 'a', 's', 'work', 'electric_power'} <= set(quantities)
@@ -0,0 +1,86 @@
+import json
+import subprocess
+import sys
+
+import pytest
+from app import create_app
+
+
+def test_startup_timings_reported():
+    app = create_app({"ADMIN_TOKEN": "secret"})
+    timings = app.config['STARTUP_TIMINGS']
+    # Only the first app of the process also reports "imports"
+    assert set(timings) - {"imports"} == {"config", "blueprints", "swagger", "total"}
+    assert timings["total"] >= timings["blueprints"]
+
+    response = app.test_client().get('/api/admin/startup', headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json["swagger_mode"] == "lazy"
+    assert response.json["timings_ms"] == timings
+
+
+def test_first_app_counts_imports_and_defers_flasgger():
+    script = (
+        "import json, sys\n"
+        "import app\n"
+        "numpy = 'numpy' in sys.modules\n"
+        "application = app.create_app()\n"
+        "flasgger = 'flasgger' in sys.modules\n"
+        "spec = application.test_client().get('/apispec.json').status_code\n"
+        "print(json.dumps([numpy, flasgger, spec, 'flasgger' in sys.modules, application.config['STARTUP_TIMINGS']]))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    numpy, flasgger, spec, loaded, timings = json.loads(output)
+    assert (numpy, flasgger, spec, loaded) == (False, False, 200, True)
+    assert timings["imports"] > 0
+    assert timings["total"] >= timings["imports"] + timings["blueprints"]
+
+
+def test_swagger_docs_page():
+    client = create_app().test_client()
+    assert client.get('/apidocs/').status_code == 200
+    assert client.get('/flasgger_static/swagger-ui-bundle.js').status_code == 200
+
+
+def test_swagger_off():
+    client = create_app({"SWAGGER_MODE": "off"}).test_client()
+    assert client.get('/apispec.json').status_code == 404
+    assert client.get('/apidocs/').status_code == 404
+    response = client.post('/api/kinematics/velocity', json={"u": 0, "a": 2, "t": 3})
+    assert response.json["result"] == 6
+
+
+def test_invalid_swagger_mode():
+    with pytest.raises(ValueError):
+        create_app({"SWAGGER_MODE": "eager"})
+
+
+def test_cached_spec_file(tmp_path):
+    path = tmp_path / "apispec.json"
+    runner = create_app().test_cli_runner()
+    result = runner.invoke(args=["build-apispec", str(path)])
+    assert result.exit_code == 0, result.output
+    spec = json.loads(path.read_text())
+    assert "/api/kinematics/velocity" in spec["paths"]
+
+    # The cached app serves the file as-is
+    spec["info"]["title"] = "From file"
+    path.write_text(json.dumps(spec))
+    client = create_app({"SWAGGER_MODE": "cached", "SWAGGER_SPEC_FILE": str(path)}).test_client()
+    assert client.get('/apispec.json').json["info"]["title"] == "From file"
+
+
+def test_cached_mode_without_file_builds_lazily(tmp_path):
+    app = create_app({"SWAGGER_MODE": "cached", "SWAGGER_SPEC_FILE": str(tmp_path / "missing.json")})
+    response = app.test_client().get('/apispec.json')
+    assert "/api/kinematics/velocity" in response.json["paths"]
+
+
+def test_blueprint_subset():
+    client = create_app({"BLUEPRINTS": "kinematics, admin"}).test_client()
+    assert client.post('/api/kinematics/velocity', json={"u": 0, "a": 2, "t": 3}).status_code == 200
+    assert client.post('/api/forces/normal', json={"m": 1}).status_code == 404
+    assert "/api/forces/normal" not in client.get('/apispec.json').json["paths"]
+
+    with pytest.raises(ValueError):
+        create_app({"BLUEPRINTS": ["kinematics", "optics"]})
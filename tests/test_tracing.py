@@ -0,0 +1,91 @@
+import os
+import time
+import pytest
+from app import create_app
+from app.utils.tracing import TraceWriter, read_trace
+
+POWER = {'voltage': 10, 'current': 2}
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({'TRACE_ENABLED': True, 'TRACE_SAMPLE_EVERY': 2, 'TRACE_DIR': str(tmp_path)})
+    return app
+
+def timings(response):
+    """Server-Timing as {name: milliseconds}."""
+    entries = (entry.split(';dur=') for entry in response.headers['Server-Timing'].split(', '))
+    return {name: float(duration) for name, duration in entries}
+
+# -------------------------------
+# Server-Timing
+# -------------------------------
+
+def test_server_timing_phases(app):
+    with app.test_client() as client:
+        response = client.post('/api/electricity/power', json=POWER)
+    assert response.get_json()['result'] == 20.0
+    phases = timings(response)
+    assert list(phases) == ['parse', 'validate', 'compute', 'serialize', 'total']
+    assert sum(duration for name, duration in phases.items() if name != 'total') <= phases['total']
+
+
+def test_batch_and_error_phases(app):
+    with app.test_client() as client:
+        assert list(timings(client.post('/api/electricity/power/batch', json={'voltage': [1, 2], 'current': 2}))) == [
+            'parse', 'validate', 'compute', 'serialize', 'total']
+        assert list(timings(client.post('/api/electricity/power', json={'voltage': 'x'}))) == [
+            'parse', 'serialize', 'total']
+
+
+def test_off_by_default():
+    with create_app().test_client() as client:
+        response = client.post('/api/electricity/power', json=POWER)
+    assert 'Server-Timing' not in response.headers
+
+# -------------------------------
+# Sampled trace files
+# -------------------------------
+
+def test_every_nth_request_is_written(app, tmp_path):
+    with app.test_client() as client:
+        for _ in range(4):
+            client.post('/api/electricity/power', json=POWER)
+    events = read_trace(tmp_path / f'trace-{os.getpid()}.json')
+    requests = [event for event in events if event['cat'] == 'request']
+    assert len(requests) == 2
+    assert requests[0]['name'] == '/api/electricity/power'
+    assert requests[0]['args'] == {'method': 'POST', 'path': '/api/electricity/power', 'status': 200}
+    # Phases nest inside their request on the timeline
+    request, *phases = events[:5]
+    assert [phase['name'] for phase in phases] == ['parse', 'validate', 'compute', 'serialize']
+    for phase in phases:
+        assert phase['ph'] == 'X' and phase['tid'] == request['tid']
+        assert request['ts'] <= phase['ts'] and phase['ts'] + phase['dur'] <= request['ts'] + request['dur']
+
+
+def test_headers_only(tmp_path):
+    app = create_app({'TRACE_ENABLED': True, 'TRACE_SAMPLE_EVERY': 0, 'TRACE_DIR': str(tmp_path)})
+    with app.test_client() as client:
+        assert 'Server-Timing' in client.post('/api/electricity/power', json=POWER).headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_trace_file_is_rotated(tmp_path):
+    writer = TraceWriter(str(tmp_path), max_bytes=1000)
+    for n in range(20):
+        writer.write('/api/electricity/power', n, n + 0.001, [('compute', n, n + 0.0005)], {'status': 200})
+    current, rotated = tmp_path / f'trace-{os.getpid()}.json', tmp_path / f'trace-{os.getpid()}.1.json'
+    assert sorted(os.listdir(tmp_path)) == sorted([current.name, rotated.name])
+    assert current.stat().st_size <= 1000 and rotated.stat().st_size <= 1000
+    # Both files load, and the newest events are in the current one
+    assert read_trace(current)[-1]['ts'] == 19e6 and read_trace(rotated)[0]['cat'] == 'request'
+
+
+def test_stale_trace_files_are_deleted(tmp_path):
+    stale = tmp_path / 'trace-1.json'
+    stale.write_text('[\n')
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+    app = create_app({'TRACE_ENABLED': True, 'TRACE_SAMPLE_EVERY': 1, 'TRACE_DIR': str(tmp_path), 'TRACE_TTL': 3600})
+    with app.test_client() as client:
+        client.post('/api/electricity/power', json=POWER)
+    assert os.listdir(tmp_path) == [f'trace-{os.getpid()}.json']
@@ -0,0 +1,72 @@
+import math
+import numpy as np
+import pytest
+from app.formulas.electricity import compute_current, compute_power as compute_electric_power
+from app.formulas.forces import compute_gravitational_force
+from app.formulas.kinematics import compute_acceleration, compute_time, compute_velocity_squared
+from app.formulas.projectile import compute_range, compute_time_of_flight, compute_max_height
+from app.formulas.work_energy import compute_power
+
+# -------------------------------
+# Scalars keep returning plain Python floats
+# -------------------------------
+
+def test_scalar_results_unchanged():
+    assert compute_range(20, 45) == (20 ** 2) * math.sin(2 * math.radians(45)) / 9.8
+    assert type(compute_time_of_flight(20.0, 30.0)) is float
+    assert compute_current(12, 4) == 3
+    with pytest.raises(ValueError, match="Resistance cannot be zero"):
+        compute_current(12, 0)
+
+# -------------------------------
+# Arrays broadcast and agree with the scalar path
+# -------------------------------
+
+def test_arrays_broadcast():
+    u = np.array([10.0, 20.0, 30.0])
+    angles = np.array([[15.0], [45.0]])
+    result = compute_max_height(u, angles)
+    assert result.shape == (2, 3)
+    assert np.allclose(result[1], [compute_max_height(value, 45.0) for value in u])
+    assert np.allclose(compute_gravitational_force(np.array([1.0, 2.0]), 1.0, 1.0), [6.67430e-11, 2 * 6.67430e-11])
+    assert np.array_equal(compute_velocity_squared(np.array([0.0]), np.array([9.8]), np.array([19.6])), [384.16])
+
+# -------------------------------
+# Element-wise zero policies
+# -------------------------------
+
+def test_zero_policy_raise():
+    with pytest.raises(ValueError, match="Time cannot be zero"):
+        compute_power(np.array([10.0, 20.0]), np.array([2.0, 0.0]))
+
+
+def test_zero_policy_nan():
+    result = compute_power(np.array([10.0, 20.0]), np.array([2.0, 0.0]), on_zero="nan")
+    assert result[0] == 5
+    assert np.isnan(result[1])
+    assert math.isnan(compute_current(1.0, 0.0, on_zero="nan"))
+
+
+def test_zero_policy_mask():
+    result = compute_electric_power(voltage=np.array([10.0, 20.0]), resistance=np.array([0.0, 4.0]), on_zero="mask")
+    assert result.mask.tolist() == [True, False]
+    assert result[1] == 100
+
+
+def test_zero_policy_kinematics():
+    v, u = np.array([98.0, 10.0]), np.array([0.0, 0.0])
+    with pytest.raises(ZeroDivisionError, match="Acceleration cannot be zero"):
+        compute_time(v, u, np.array([9.8, 0.0]))
+    assert np.isnan(compute_time(v, u, np.array([9.8, 0.0]), on_zero="nan")).tolist() == [False, True]
+    assert compute_acceleration(v, u, np.array([0.0, 5.0]), on_zero="mask").mask.tolist() == [True, False]
+    # Scalar calls keep raising ZeroDivisionError, as (v - u) / a did before the policy existed
+    with pytest.raises(ZeroDivisionError, match="Time cannot be zero") as raised:
+        compute_acceleration(1.0, 0.0, 0.0)
+    assert type(raised.value) is ZeroDivisionError
+    with pytest.raises(ZeroDivisionError):
+        compute_time(10, 0, 0)
+
+
+def test_unknown_zero_policy():
+    with pytest.raises(ValueError):
+        compute_current(1.0, 2.0, on_zero="ignore")
@@ -1,3 +1,5 @@
+import io
+import numpy as np
 import pytest
 from flask import Flask
 from app import create_app
@@ -161,3 +163,91 @@ def test_zero_values_potential(app):
         data = response.get_json()
         assert response.status_code == 200
         assert data['result'] == 0  # 10 * 0 = 0
+
+
+# -------------------------------
+# File upload: CSV and .npy, evaluated in chunks
+# -------------------------------
+
+def test_kinetic_file_csv_keeps_rows(app):
+    """Result column appended to every row; other columns pass through untouched"""
+    with app.test_client() as client:
+        csv = "id,mass,speed\n\"a, b\",2,3\nc,4,0.5\n"
+        response = client.post('/api/work_energy/kinetic/file?velocity=speed', data=csv, content_type='text/csv')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'kinetic.csv' in response.headers['Content-Disposition']
+        assert response.get_data(as_text=True) == 'id,mass,speed,result\n"a, b",2,3,9.0\nc,4,0.5,0.5\n'
+
+
+def test_potential_file_bad_cells_are_empty(app):
+    """Unreadable or missing cells give an empty result for that row only"""
+    with app.test_client() as client:
+        csv = "mass,height\n10,5\nten,5\n10,\n10,inf\n"
+        response = client.post('/api/work_energy/potential/file', data=csv, content_type='text/csv')
+        assert response.get_data(as_text=True).splitlines()[1:] == ['10,5,490.0', 'ten,5,', '10,,', '10,inf,']
+
+
+def test_power_file_zero_time(app):
+    with app.test_client() as client:
+        csv = "work,time\n10,0\n10,2\n"
+        response = client.post('/api/work_energy/power/file', data=csv, content_type='text/csv')
+        assert response.get_data(as_text=True).splitlines()[1:] == ['10,0,', '10,2,5.0']
+
+
+def test_kinetic_file_spans_chunks(app, monkeypatch):
+    monkeypatch.setattr('app.utils.ingest.CHUNK_ROWS', 7)
+    mass = np.arange(20.0)
+    with app.test_client() as client:
+        csv = "mass,velocity\n" + "".join(f"{m},2\n" for m in mass)
+        lines = client.post('/api/work_energy/kinetic/file', data=csv, content_type='text/csv').get_data(as_text=True)
+        assert [float(line.split(',')[2]) for line in lines.splitlines()[1:]] == (2 * mass).tolist()
+
+        buffer = io.BytesIO()
+        np.save(buffer, np.column_stack([mass, np.full(20, 2.0)]))
+        response = client.post('/api/work_energy/kinetic/file?columns=mass,velocity',
+                               data={'file': (io.BytesIO(buffer.getvalue()), 'rows.npy')},
+                               content_type='multipart/form-data')
+        assert np.load(io.BytesIO(response.data))['result'].tolist() == (2 * mass).tolist()
+
+
+def test_kinetic_file_multipart_csv(app):
+    with app.test_client() as client:
+        response = client.post('/api/work_energy/kinetic/file',
+                               data={'file': (io.BytesIO(b"mass,velocity\n1,2\n"), 'rows.csv')},
+                               content_type='multipart/form-data')
+        assert response.get_data(as_text=True) == 'mass,velocity,result\n1,2,2.0\n'
+
+
+@pytest.mark.parametrize('url, data, content_type, message', [
+    ('/api/work_energy/kinetic/file', 'mass\n1\n', 'text/csv', 'Missing columns: velocity'),
+    ('/api/work_energy/kinetic/file?velocity=v', 'mass\n1\n', 'text/csv', 'Missing columns: v'),
+    ('/api/work_energy/kinetic/file', '', 'text/csv', 'CSV file is empty; the first row must name the columns'),
+    ('/api/work_energy/kinetic/file', b'\xff\xfe', 'text/csv', 'CSV files must be UTF-8 text'),
+    ('/api/work_energy/kinetic/file', b'not numpy', 'application/x-npy', 'Not a valid .npy file'),
+    ('/api/work_energy/kinetic/file', 'mass,' + 'v' * 200_000 + '\n1,2\n', 'text/csv', 'Not a valid CSV file: field larger'),
+])
+def test_kinetic_file_errors(app, url, data, content_type, message):
+    with app.test_client() as client:
+        response = client.post(url, data=data, content_type=content_type)
+        assert response.status_code == 400
+        assert response.get_json()['error'].startswith(message)
+
+
+def test_kinetic_file_bad_row_ends_with_error_line(app):
+    with app.test_client() as client:
+        csv = "mass,velocity\n1,2\n3," + "4" * 200_000 + "\n5,6\n"
+        response = client.post('/api/work_energy/kinetic/file', data=csv, content_type='text/csv')
+        lines = response.get_data(as_text=True).splitlines()
+        assert response.status_code == 200
+        assert lines[0] == 'mass,velocity,result'
+        assert lines[-1].startswith('# Error: Not a valid CSV file: field larger than field limit')
+
+
+def test_kinetic_file_npy_needs_column_names(app):
+    buffer = io.BytesIO()
+    np.save(buffer, np.ones((3, 2)))
+    with app.test_client() as client:
+        response = client.post('/api/work_energy/kinetic/file', data=buffer.getvalue(), content_type='application/x-npy')
+        assert response.status_code == 400
+        assert response.get_json()['error'] == "Name the 2 columns of the array with the columns parameter"